@@ -7,12 +7,12 @@ a = Analysis(
     ['research_screener.py'],
     pathex=[],
     binaries=[],
-    datas=[('scholar_results.json', '.')],
+    datas=[('scholar_results.json', '.'), ('assets', 'assets')],
     hiddenimports=['dash', 'dash_bootstrap_components', 'pandas'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['tkinter', 'matplotlib', 'IPython', 'streamlit', 'pytest'],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -0,0 +1,73 @@
+"""
+Abstract enrichment benchmark against the local stand-in metadata server.
+
+Resolves a synthetic corpus cold at several concurrency limits, then again from
+the warm on-disk cache, and checks that background prefetch fills the cache
+ahead of the reviewer.
+
+Usage: python benchmarks/bench_abstracts.py --records 500 --latency 0.05 --concurrency 1 4 8 16
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from screening_core import normalize_paper
+from screening_core.abstracts import PREFETCH_AHEAD, AbstractCache, AbstractResolver, cache_key
+from metadata_server import start_server
+from synthetic import generate_papers
+
+
+def make_resolver(endpoint, cache_path, concurrency):
+    return AbstractResolver(endpoint, cache=AbstractCache(cache_path), concurrency=concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    server = start_server(latency=args.latency)
+    records = [normalize_paper(paper) for paper in generate_papers(args.records, 'nested')]
+    keys = {cache_key(record) for record in records} - {None}
+    print(f"{len(records):,} records, {len(keys):,} distinct lookups, {args.latency * 1000:.0f} ms per request\n")
+    print(f"{'concurrency':>11}  {'cold (s)':>9}  {'lookups/s':>10}  {'warm (ms)':>10}  {'found':>6}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for concurrency in args.concurrency:
+            cache_path = os.path.join(directory, f"cache_{concurrency}.sqlite3")
+            resolver = make_resolver(server.endpoint, cache_path, concurrency)
+            start = time.perf_counter()
+            found = resolver.resolve_many(records)
+            cold = time.perf_counter() - start
+            resolver.close()
+
+            # A fresh resolver on the same file: everything should come from disk
+            resolver = make_resolver(server.endpoint, cache_path, concurrency)
+            requests_before = server.request_count
+            start = time.perf_counter()
+            warm_found = resolver.resolve_many(records)
+            warm = time.perf_counter() - start
+            resolver.close()
+            assert warm_found == found and server.request_count == requests_before, "warm pass hit the network"
+            hits = sum(1 for abstract in found.values() if abstract)
+            print(f"{concurrency:>11}  {cold:>9.2f}  {len(keys) / cold:>10.0f}  {warm * 1000:>10.1f}  {hits:>6}")
+
+        # Prefetch: the next PREFETCH_AHEAD cards should be cached before the reviewer reaches them
+        resolver = make_resolver(server.endpoint, os.path.join(directory, 'prefetch.sqlite3'), max(args.concurrency))
+        resolver.prefetch(records[:1 + PREFETCH_AHEAD])
+        time.sleep(args.latency * 3 + 0.2)
+        ready = sum(1 for record in records[1:1 + PREFETCH_AHEAD] if resolver.cached(record) is not None
+                    or resolver.cache.get(cache_key(record)) == '')
+        resolver.close()
+        print(f"\nPrefetch: {ready}/{PREFETCH_AHEAD} upcoming cards resolved after one request round-trip")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Cold-start benchmark: time from process launch until the Dash app has served its
+page and layout (time-to-first-paint as far as the browser is concerned).
+
+Usage:
+    python benchmarks/bench_startup.py                 # script, fast-start vs debug mode
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --exe dist/ResearchScreener/ResearchScreener.exe
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_first_paint(port, timeout):
+    """Polls until both the index page and the layout are served; returns False on timeout."""
+    deadline = time.perf_counter() + timeout
+    pending = [f"http://127.0.0.1:{port}/", f"http://127.0.0.1:{port}/_dash-layout"]
+    while pending and time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(pending[0], timeout=1) as response:
+                if response.status == 200:
+                    pending.pop(0)
+                    continue
+        except OSError:
+            pass
+        time.sleep(0.02)
+    return not pending
+
+
+def time_launch(command, port, timeout):
+    start = time.perf_counter()
+    process = subprocess.Popen(command + ['--port', str(port)], cwd=REPO_ROOT,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_for_first_paint(port, timeout):
+            raise RuntimeError(f"{' '.join(command)} did not serve the app within {timeout}s")
+        return time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+
+
+def time_import(runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, '-c', 'import research_screener'], cwd=REPO_ROOT,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(label, samples):
+    print(f"  {label:<36} median {statistics.median(samples) * 1000:8.0f} ms   "
+          f"min {min(samples) * 1000:8.0f} ms   max {max(samples) * 1000:8.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--exe', help="Packaged executable to time instead of the script")
+    parser.add_argument('--timeout', type=float, default=120)
+    args = parser.parse_args()
+
+    if args.exe:
+        modes = {'executable': [os.path.abspath(args.exe)]}
+    else:
+        script = [sys.executable, 'research_screener.py']
+        modes = {'script --fast-start': script + ['--fast-start'], 'script (debug reloader)': script}
+
+    # Launches run in the repo root; keep their project catalog out of it
+    os.environ.setdefault('SCREENER_CATALOG', os.path.join(tempfile.mkdtemp(prefix='screener-startup-'), 'catalog.sqlite3'))
+
+    print(f"Cold start over {args.runs} runs")
+    if not args.exe:
+        report('import research_screener', time_import(args.runs))
+    for label, command in modes.items():
+        report(f"{label} first paint", [time_launch(command, free_port(), args.timeout) for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+End-to-end performance benchmarks for the screeners' hot paths on synthetic corpora.
+
+Covers ingestion (Dash parse_contents and screening_core.load_records, which
+replaced the Streamlit parse_serpapi_paper loop, serially and on the process
+pool for large corpora), per-card rendering
+(render_paper_card and the full update_paper_display round trip), extract_source,
+export_decisions and re-importing those exports (import_decisions), plus the
+terminal screener (opening the corpus file lazily, reading and drawing one card).
+Reports time, throughput and peak traced memory.
+
+Usage:
+    python benchmarks/bench_suite.py                        # 1k and 10k records, nested + flattened
+    python benchmarks/bench_suite.py --sizes 1000 100000 1000000
+    python benchmarks/bench_suite.py --save-baseline        # write benchmarks/baseline.json
+    python benchmarks/bench_suite.py --compare              # exit 1 if slower than the baseline
+"""
+import argparse
+import base64
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from screening_core import DecisionStore, SimilarityIndex, export_bytes, extract_source, import_decisions, load_records, tally, write_exports
+from screening_core.corpusfile import CorpusFile
+from screening_core.pipeline import PARALLEL_THRESHOLD
+from screening_core.records import corpus_key
+from screening_core.schema import SCHEMA_FLATTENED, SCHEMA_NESTED
+from synthetic import corpus_bytes
+from dash_client import DashCallbackClient, prop
+
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+# The full Dash round trip ships the whole corpus in every request, so it is only run up to this size
+MAX_ROUND_TRIP_RECORDS = 10_000
+RENDER_SAMPLE = 200
+ROUND_TRIP_CLICKS = 10
+WORKERS = os.cpu_count() or 1
+# Cases that time a warm cache: run once untimed first, so even --repeats 1 measures hits
+WARMED_CASES = {'render_paper_card[cached]'}
+
+
+def measure(func, repeats, trace_memory):
+    """Returns (best wall-clock seconds over `repeats`, peak traced bytes of one extra run or None)."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return best, peak
+
+
+def build_cases(rs, terminal, schema, n):
+    """Returns [(case name, items processed per call, callable)] for one corpus."""
+    raw = corpus_bytes(n, schema)
+    contents = 'data:application/json;base64,' + base64.b64encode(raw).decode('ascii')
+    store = load_records(raw)
+    links = [record['link'] for record in store]
+    decisions = DecisionStore({i: 'keep' if i % 3 else 'discard' for i in range(0, n, 2)})
+    sample = range(0, n, max(1, n // RENDER_SAMPLE))
+    export_dir = tempfile.mkdtemp(prefix='screener-bench-')
+    index = SimilarityIndex.build(store.records)
+    corpus_path = os.path.join(export_dir, 'corpus.json')
+    with open(corpus_path, 'wb') as f:
+        f.write(raw)
+    corpus_file = CorpusFile([corpus_path])
+    key = corpus_key(store.records)
+    counts = tally(decisions, n)
+    exports = list(zip(('screening_decisions_bench.csv', 'kept_papers_bench.json'), export_bytes(store, decisions)))
+
+    cases = [
+        ('parse_contents', n, lambda: rs.parse_contents(contents, 'corpus.json')),
+        ('load_records', n, lambda: load_records(raw, workers=1)),
+        ('extract_source', n, lambda: [extract_source(link) for link in links]),
+        ('render_paper_card', len(sample), lambda: [rs.render_paper_card(store[i], i, n, decisions.get(i)) for i in sample]),
+        # The revisit cost: run() fills the card cache before timing this case
+        ('render_paper_card[cached]', len(sample), lambda: [rs.CARDS.get(*rs.card_job(store[i], i, n, decisions.get(i), corpus=key)) for i in sample]),
+        ('export_decisions', len(decisions), lambda: write_exports(store, decisions, directory=export_dir, timestamp='bench')),
+        ('import_decisions', len(decisions), lambda: import_decisions(store.records, exports)),
+        ('open_corpus_file', n, lambda: CorpusFile([corpus_path]).close()),
+        ('terminal_card', len(sample), lambda: [terminal.render_card(corpus_file[i], i, n, decisions.get(i), counts) for i in sample]),
+        ('similarity_build', n, lambda: SimilarityIndex.build(store.records)),
+        ('similar_papers', len(sample), lambda: [index.neighbours(i, rs.SIMILAR_PAPERS) for i in sample]),
+    ]
+    if n >= PARALLEL_THRESHOLD and WORKERS > 1:
+        cases.append((f"load_records[{WORKERS}proc]", n, lambda: load_records(raw, workers=WORKERS)))
+    if n <= MAX_ROUND_TRIP_RECORDS:
+        client = DashCallbackClient.for_test_client(rs.app.server.test_client())
+        records, queue = store.records, list(range(n))
+
+        def keep_clicks():
+            state = {}
+            for position in range(ROUND_TRIP_CLICKS):
+                inputs = [prop('current-index', 'children', position), prop('keep-btn', 'n_clicks', position + 1),
+                          prop('discard-btn', 'n_clicks', None), prop('prev-btn', 'n_clicks', None),
+                          prop('next-btn', 'n_clicks', None), prop('queue-store', 'data', queue),
+                          [], []]  # similar-papers buttons (pattern-matching inputs, none rendered yet)
+                response = client.call('paper-display.children', inputs,
+                                       [prop('stored-data', 'data', records), prop('decision-store', 'data', state),
+                                        prop('corpus-key', 'data', key)],
+                                       changed=['keep-btn.n_clicks'])
+                state = response['decision-store']['data']
+        cases.append(('update_paper_display', ROUND_TRIP_CLICKS, keep_clicks))
+    return cases
+
+
+def run(sizes, schemas, repeats, trace_memory):
+    logging.disable(logging.WARNING)
+    # Keep benchmark corpora and clicks out of the real project catalog
+    os.environ.setdefault('SCREENER_CATALOG', os.path.join(tempfile.mkdtemp(prefix='screener-bench-'), 'catalog.sqlite3'))
+    import research_screener as rs
+    import research_screener_terminal as terminal
+
+    results = {}
+    print(f"{'case':<27}{'schema':<11}{'records':>9}{'time ms':>12}{'items/s':>14}{'peak MB':>10}")
+    for n in sizes:
+        for schema in schemas:
+            for name, items, func in build_cases(rs, terminal, schema, n):
+                if name in WARMED_CASES:
+                    func()
+                seconds, peak = measure(func, repeats, trace_memory)
+                results[f"{name}/{schema}/{n}"] = {'seconds': seconds, 'items_per_second': items / seconds, 'peak_bytes': peak}
+                peak_label = f"{peak / 2**20:10.1f}" if peak is not None else f"{'-':>10}"
+                print(f"{name:<27}{schema:<11}{n:>9}{seconds * 1000:12.2f}{items / seconds:14,.0f}{peak_label}")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Prints every case slower than baseline * (1 + tolerance); returns the number of regressions."""
+    regressions = 0
+    for key, result in results.items():
+        if key not in baseline['results']:
+            continue
+        ratio = result['seconds'] / baseline['results'][key]['seconds']
+        if ratio > 1 + tolerance:
+            regressions += 1
+            print(f"REGRESSION {key}: {ratio:.2f}x baseline")
+    print(f"{regressions} regression(s) against baseline from {baseline['recorded']} ({baseline['machine']})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screener performance benchmarks")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--schemas', nargs='+', default=[SCHEMA_NESTED, SCHEMA_FLATTENED])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc peak-memory run")
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown before --compare fails")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.schemas, args.repeats, not args.no_memory)
+
+    if args.save_baseline:
+        baseline = {
+            'recorded': time.strftime('%Y-%m-%d'),
+            'machine': f"{platform.system()} {platform.machine()}, Python {platform.python_version()}",
+            'results': results,
+        }
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {BASELINE_PATH}")
+    if args.compare:
+        with open(BASELINE_PATH, encoding='utf-8') as f:
+            baseline = json.load(f)
+        sys.exit(1 if compare(results, baseline, args.tolerance) else 0)
+
+
+if __name__ == "__main__":
+    main()
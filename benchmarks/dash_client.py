@@ -0,0 +1,73 @@
+"""
+Helpers for driving the Dash app's real callback endpoint (_dash-update-component)
+without a browser, either in-process through Flask's test client or over HTTP.
+"""
+import json
+import urllib.request
+
+
+def prop(component_id, prop_name, value):
+    """One entry of a callback request's `inputs` or `state` list."""
+    return {'id': component_id, 'property': prop_name, 'value': value}
+
+
+def callback_body(dependency, inputs, state, changed):
+    """Builds the JSON body the dash renderer would send for `dependency` (an entry of /_dash-dependencies)."""
+    output = dependency['output']
+    parts = output[2:-2].split('...') if output.startswith('..') else [output]
+    outputs = [dict(zip(('id', 'property'), part.rsplit('.', 1))) for part in parts]
+    return {
+        'output': output,
+        'outputs': outputs if len(outputs) > 1 else outputs[0],
+        'inputs': inputs,
+        'state': state,
+        'changedPropIds': changed,
+    }
+
+
+class DashCallbackClient:
+    """Finds callbacks by output id and posts requests to them."""
+
+    def __init__(self, dependencies, post):
+        self.dependencies = dependencies
+        self._post = post
+
+    @classmethod
+    def for_test_client(cls, client):
+        """In-process client over flask.Flask.test_client()."""
+        def post(body):
+            response = client.post('/_dash-update-component', json=body)
+            if response.status_code == 204:
+                return None
+            response_body = response.get_json()
+            if response.status_code != 200:
+                raise RuntimeError(f"Callback {body['output']} failed with HTTP {response.status_code}")
+            return response_body['response']
+        return cls(client.get('/_dash-dependencies').get_json(), post)
+
+    @classmethod
+    def for_url(cls, base_url, timeout=60):
+        """HTTP client for a running server, e.g. http://127.0.0.1:8050."""
+        def post(body):
+            request = urllib.request.Request(f"{base_url}/_dash-update-component", data=json.dumps(body).encode('utf-8'),
+                                             headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                if response.status == 204:
+                    return None
+                return json.loads(response.read())['response']
+        with urllib.request.urlopen(f"{base_url}/_dash-dependencies", timeout=timeout) as response:
+            dependencies = json.loads(response.read())
+        return cls(dependencies, post)
+
+    def find(self, output_fragment):
+        """The callback whose output is exactly `output_fragment`, else the first one containing it."""
+        for dep in self.dependencies:
+            if dep['output'] == output_fragment:
+                return dep
+        return next(dep for dep in self.dependencies if output_fragment in dep['output'])
+
+    def call(self, output_fragment, inputs, state=(), changed=None):
+        """Posts to the callback whose output contains `output_fragment`; returns {component_id: {prop: value}}."""
+        dependency = self.find(output_fragment)
+        changed = changed or [f"{inputs[0]['id']}.{inputs[0]['property']}"]
+        return self._post(callback_body(dependency, list(inputs), list(state), changed))
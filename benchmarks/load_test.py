@@ -0,0 +1,248 @@
+"""
+Load test: how many concurrent reviewers can one Dash server handle?
+
+Starts research_screener.py on localhost (or targets one already running there
+with --url), then simulates N reviewers against a synthetic corpus, driving the
+real /_dash-update-component endpoint exactly as the browser would:
+
+    handle_upload -> update_queue -> update_paper_display (keep/discard clicks
+    with randomized think time) -> export_decisions
+
+Every request carries the whole corpus, as it does from the browser. Reports
+throughput, client-side latency percentiles per callback and the server's peak
+resident memory for each corpus size x reviewer count.
+
+Usage:
+    python benchmarks/load_test.py                                   # 1k/10k records x 1/4/16 reviewers
+    python benchmarks/load_test.py --sizes 10000 --reviewers 8 32 --clicks 50 --think 2
+    python benchmarks/load_test.py --url http://127.0.0.1:8050 --reviewers 4
+"""
+import argparse
+import base64
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from screening_core.metrics import percentile
+from dash_client import DashCallbackClient, callback_body, prop
+from synthetic import corpus_bytes
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+STORED_DATA_PLACEHOLDER = '"__stored_data__"'
+
+UPLOAD = 'handle_upload'
+QUEUE = 'update_queue'
+CLICK = 'update_paper_display'
+EXPORT = 'export_decisions'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, workdir, timeout=120):
+    """Launches the app in fast-start mode with its exports and catalog in `workdir`; returns the process."""
+    env = dict(os.environ, SCREENER_CATALOG=os.path.join(workdir, 'catalog.sqlite3'))
+    env.pop('SCREENER_METADATA_ENDPOINT', None)
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, 'research_screener.py'), '--fast-start', '--port', str(port)],
+                               cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_dash-layout", timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"The server did not start within {timeout}s")
+
+
+def resident_mb(pid):
+    """Resident set size of `pid` in MB, from /proc (Linux) or psutil if installed; None if neither is available."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / 2 ** 20
+    except (ImportError, OSError):
+        return None
+
+
+class MemorySampler(threading.Thread):
+    """Polls a process's RSS and keeps the peak."""
+
+    def __init__(self, pid, interval=0.2):
+        super().__init__(daemon=True)
+        self.pid, self.interval = pid, interval
+        self.peak = None
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            rss = resident_mb(self.pid)
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        return self.peak
+
+
+class Reviewer(threading.Thread):
+    """One simulated screener: uploads the corpus, screens `clicks` papers, then exports."""
+
+    def __init__(self, base_url, client, contents, clicks, think, seed, results):
+        super().__init__(daemon=True)
+        self.base_url, self.client = base_url, client
+        self.contents, self.clicks, self.think = contents, clicks, think
+        self.rng = random.Random(seed)
+        self.results = results
+
+    def post(self, name, output, inputs, state=(), changed=None, stored_data=None):
+        """Posts one callback request and records its latency under `name`; returns the parsed response."""
+        changed = changed or [f"{inputs[0]['id']}.{inputs[0]['property']}"]
+        body = json.dumps(callback_body(self.client.find(output), inputs, list(state), changed))
+        if stored_data is not None:
+            # The corpus is serialized once per reviewer and spliced in, so the client stays cheap
+            body = body.replace(STORED_DATA_PLACEHOLDER, stored_data, 1)
+        request = urllib.request.Request(f"{self.base_url}/_dash-update-component", data=body.encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=300) as response:
+                payload = response.read()
+        except OSError:
+            self.results['errors'].append(name)
+            raise
+        self.results[name].append(time.perf_counter() - start)
+        return json.loads(payload)['response'] if payload else None
+
+    def pause(self):
+        if self.think:
+            time.sleep(self.rng.expovariate(1 / self.think))
+
+    def run(self):
+        try:
+            self.pause()
+            response = self.post(UPLOAD, 'stored-data.data', [prop('load-token', 'data', f"reviewer-{id(self)}")],
+                                 [prop('upload-data', 'contents', [self.contents]), prop('upload-data', 'filename', ['corpus.json'])])
+            records = response['stored-data']['data']
+            decisions = response['decision-store']['data']
+            corpus = prop('corpus-key', 'data', response['corpus-key']['data'])
+            stored_data = json.dumps(records)
+            stored = prop('stored-data', 'data', json.loads(STORED_DATA_PLACEHOLDER))
+
+            response = self.post(QUEUE, 'queue-store.data', [stored, prop('queue-order', 'value', 'file'),
+                                                              prop('min-cited-by', 'value', 0)],
+                                 changed=['stored-data.data'], stored_data=stored_data)
+            queue = response['queue-store']['data']
+
+            position, keeps, discards = 0, 0, 0
+            for _ in range(min(self.clicks, len(queue))):
+                self.pause()
+                keep = self.rng.random() < 0.3
+                keeps, discards = keeps + keep, discards + (not keep)
+                button = 'keep-btn' if keep else 'discard-btn'
+                inputs = [prop('current-index', 'children', position), prop('keep-btn', 'n_clicks', keeps or None),
+                          prop('discard-btn', 'n_clicks', discards or None), prop('prev-btn', 'n_clicks', None),
+                          prop('next-btn', 'n_clicks', None), prop('queue-store', 'data', queue), [], []]
+                response = self.post(CLICK, 'paper-display.children', inputs,
+                                     [stored, prop('decision-store', 'data', decisions), corpus],
+                                     changed=[f"{button}.n_clicks"], stored_data=stored_data)
+                position = response['current-index']['children']
+                decisions = response['decision-store']['data']
+
+            self.pause()
+            self.post(EXPORT, 'export-status.children', [prop('export-btn', 'n_clicks', 1)],
+                      [prop('decision-store', 'data', decisions), stored], stored_data=stored_data)
+        except Exception as error:  # a failed reviewer is reported, not fatal to the run
+            self.results['failures'].append(repr(error))
+
+
+def run_scenario(base_url, n_records, n_reviewers, clicks, think, pid=None):
+    """Runs one corpus size x reviewer count; returns (results by callback, wall seconds, peak RSS MB or None)."""
+    raw = corpus_bytes(n_records, 'nested')
+    contents = 'data:application/json;base64,' + base64.b64encode(raw).decode('ascii')
+    client = DashCallbackClient.for_url(base_url)
+    results = defaultdict(list)
+    sampler = MemorySampler(pid) if pid else None
+    if sampler:
+        sampler.start()
+    start = time.perf_counter()
+    reviewers = [Reviewer(base_url, client, contents, clicks, think, seed, results) for seed in range(n_reviewers)]
+    for reviewer in reviewers:
+        reviewer.start()
+    for reviewer in reviewers:
+        reviewer.join()
+    seconds = time.perf_counter() - start
+    return results, seconds, sampler.stop() if sampler else None
+
+
+def report_row(n_records, n_reviewers, results, seconds, peak):
+    requests = sum(len(results[name]) for name in (UPLOAD, QUEUE, CLICK, EXPORT))
+    clicks = sorted(results[CLICK])
+    def ms(samples, q):
+        return f"{percentile(samples, q) * 1000:8.0f}" if samples else f"{'-':>8}"
+    peak_label = f"{peak:8.0f}" if peak else f"{'-':>8}"
+    print(f"{n_records:>8} {n_reviewers:>9} {requests:>8} {requests / seconds:>8.1f} {len(clicks) / seconds:>9.1f}"
+          f" {ms(clicks, 50)} {ms(clicks, 95)} {ms(clicks, 99)} {ms(sorted(results[UPLOAD]), 95)} {ms(sorted(results[EXPORT]), 95)}"
+          f" {len(results['errors']) + len(results['failures']):>6} {peak_label}")
+    for failure in sorted(set(results['failures']))[:3]:
+        print(f"{'':>8} failure: {failure}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help="Corpus sizes (records)")
+    parser.add_argument('--reviewers', type=int, nargs='+', default=[1, 4, 16], help="Concurrent reviewer counts")
+    parser.add_argument('--clicks', type=int, default=20, help="Keep/discard decisions per reviewer")
+    parser.add_argument('--think', type=float, default=1.0, help="Mean seconds between a reviewer's actions (0 = flat out)")
+    parser.add_argument('--url', help="Use an already-running server on this machine instead of starting one")
+    args = parser.parse_args()
+
+    if args.url and urllib.parse.urlsplit(args.url).hostname not in LOOPBACK_HOSTS:
+        parser.error("--url must point at this machine (127.0.0.1 / localhost)")
+
+    print(f"{args.clicks} clicks per reviewer, {args.think:.1f} s mean think time; latencies in ms (client side)\n")
+    print(f"{'records':>8} {'reviewers':>9} {'requests':>8} {'req/s':>8} {'clicks/s':>9} {'click50':>8} {'click95':>8}"
+          f" {'click99':>8} {'upload95':>8} {'export95':>8} {'errors':>6} {'peak MB':>8}")
+    for n_records in args.sizes:
+        for n_reviewers in args.reviewers:
+            if args.url:
+                report_row(n_records, n_reviewers, *run_scenario(args.url.rstrip('/'), n_records, n_reviewers, args.clicks, args.think))
+                continue
+            # A fresh server per scenario, so peak memory is attributable to it
+            with tempfile.TemporaryDirectory(prefix='screener-load-') as workdir:
+                port = free_port()
+                server = start_server(port, workdir)
+                try:
+                    report_row(n_records, n_reviewers, *run_scenario(f"http://127.0.0.1:{port}", n_records, n_reviewers,
+                                                                     args.clicks, args.think, pid=server.pid))
+                finally:
+                    server.kill()
+                    server.wait()
+
+
+if __name__ == '__main__':
+    main()
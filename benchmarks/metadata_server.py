@@ -0,0 +1,75 @@
+"""
+Local stand-in for the metadata service used by screening_core.abstracts.
+
+Answers Crossref-shaped GET /works/<doi> requests with a generated JATS abstract
+after a configurable delay, so enrichment can be exercised and timed without
+touching the network. DOIs ending in a digit that is a multiple of --missing-every
+return 404 to exercise the "no abstract" path.
+
+Usage:
+    python benchmarks/metadata_server.py --port 8765 --latency 0.05
+    SCREENER_METADATA_ENDPOINT=http://127.0.0.1:8765/works/{doi} python research_screener.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+
+def make_handler(latency, missing_every):
+    class MetadataHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like the real services
+        disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.server.request_count += 1
+            doi = unquote(self.path.partition('/works/')[2])
+            if not doi or (missing_every and sum(map(ord, doi)) % missing_every == 0):
+                body = json.dumps({'status': 'error', 'message': 'Resource not found.'}).encode()
+                status = 404
+            else:
+                abstract = (f"<jats:title>Abstract</jats:title><jats:p>Full abstract for {doi}. "
+                            f"This stand-in text is longer than a search snippet.</jats:p>")
+                body = json.dumps({'status': 'ok', 'message': {'DOI': doi, 'abstract': abstract}}).encode()
+                status = 200
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetadataHandler
+
+
+def start_server(port=0, latency=0.05, missing_every=10):
+    """Starts the server on a daemon thread; returns it (its URL template is server.endpoint)."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(latency, missing_every))
+    server.daemon_threads = True
+    server.request_count = 0
+    server.endpoint = f"http://127.0.0.1:{server.server_address[1]}/works/{{doi}}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds to wait before each response")
+    parser.add_argument('--missing-every', type=int, default=10, help="Roughly 1 in N DOIs returns 404 (0 disables)")
+    args = parser.parse_args()
+    server = start_server(args.port, args.latency, args.missing_every)
+    print(f"Serving {server.endpoint} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
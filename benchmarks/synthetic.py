@@ -0,0 +1,156 @@
+"""
+Generator for synthetic SerpApi-shaped Google Scholar corpora.
+
+Records mimic the real harvests: nested SerpApi results, the flattened dotted-key
+export the R scripts write, or the simplified authors/year/abstract shape.
+
+Usage: python benchmarks/synthetic.py --records 100000 --schema flattened -o corpus.json
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from screening_core.schema import SCHEMA_FLATTENED, SCHEMA_NESTED, SCHEMA_SIMPLIFIED, flatten
+
+SCHEMAS = (SCHEMA_NESTED, SCHEMA_FLATTENED, SCHEMA_SIMPLIFIED)
+
+TOPIC_WORDS = [
+    'financial', 'incentive', 'scholarship', 'bursary', 'loan', 'forgiveness', 'stipend', 'medical',
+    'nursing', 'education', 'recruitment', 'retention', 'rural', 'physicians', 'students', 'workforce',
+    'enrollment', 'primary', 'care', 'health', 'programs', 'tuition', 'reimbursement', 'allied',
+    'residency', 'career', 'choice', 'outcomes', 'survey', 'review', 'policy', 'community', 'training',
+]
+TITLE_TEMPLATES = [
+    'A comparative assessment of {a} {b} programs for {c} {d}',
+    'The impact of {a} {b} on {c} {d}: a systematic review',
+    '{A} and {b} among {c} {d}',
+    'Does {a} {b} improve {c} {d}? Evidence from a national survey',
+    '{A} {b} in {c} {d}: scope, characteristics, and perceptions',
+]
+SURNAMES = ['Jackson', 'Shannon', 'Pathman', 'Boex', 'Kirson', 'Lin', 'He', 'Whang', 'Kristo', 'Smith', 'Patel', 'Nguyen']
+JOURNALS = ['The Journal of Rural Health', 'Academic Medicine', 'Medical Education', 'Nurse Education Today',
+            'Health Affairs', 'BMC Medical Education', 'The American Journal of Surgery']
+HOSTS = ['onlinelibrary.wiley.com', 'journals.lww.com', 'www.sciencedirect.com', 'link.springer.com',
+         'www.tandfonline.com', 'journals.sagepub.com', 'www.ncbi.nlm.nih.gov', 'www.mdpi.com', 'www.jstor.org']
+PUBLISHERS = ['Wiley Online Library', 'journals.lww.com', 'Elsevier', 'Springer', 'Taylor & Francis', 'SAGE', 'ncbi.nlm.nih.gov']
+QUERIES = [
+    '("financial incentive" OR scholarship OR bursary) AND ("medical education" OR "nursing education") AND recruitment',
+    '("loan forgiveness" OR "loan repayment") AND ("health profession" OR "medical school") AND (recruitment OR enrollment)',
+    'impact of scholarships on enrollment AND ("medical students" OR "nursing students")',
+]
+
+
+def _result_id(rng):
+    return ''.join(rng.choices(string.ascii_letters + string.digits + '-_', k=12))
+
+
+def _title(rng):
+    a, b, c, d = rng.sample(TOPIC_WORDS, 4)
+    return rng.choice(TITLE_TEMPLATES).format(a=a, b=b, c=c, d=d, A=a.capitalize())
+
+
+def nested_paper(rng, position):
+    """One record in the nested SerpApi shape."""
+    result_id = _result_id(rng)
+    cluster_id = str(rng.getrandbits(63))
+    year = rng.randint(1975, 2025)
+    authors = [f"{rng.choice(string.ascii_uppercase)}{rng.choice(string.ascii_uppercase)} {rng.choice(SURNAMES)}"
+               for _ in range(rng.randint(1, 4))]
+    summary = f"{', '.join(authors[:3])}{'…' if len(authors) > 3 else ''} - {rng.choice(JOURNALS)}, {year} - {rng.choice(PUBLISHERS)}"
+    snippet = ' '.join(rng.choices(TOPIC_WORDS, k=rng.randint(20, 40)))
+    paper = {
+        'position': position % 20 + 1,
+        'title': _title(rng),
+        'result_id': result_id,
+        'link': f"https://{rng.choice(HOSTS)}/doi/10.{rng.randint(1000, 9999)}/{result_id.lower()}",
+        'snippet': f"… {snippet} …",
+        'resources': [],
+        'publication_info': {
+            'summary': summary,
+            'authors': [
+                {'name': name, 'link': f"https://scholar.google.com/citations?user={_result_id(rng)}", 'author_id': _result_id(rng)}
+                for name in authors if rng.random() < 0.5
+            ],
+        },
+        'inline_links': {
+            'serpapi_cite_link': f"https://serpapi.com/search.json?engine=google_scholar_cite&hl=en&q={result_id}",
+            'cited_by': {
+                'total': int(rng.paretovariate(1.2)) - 1,
+                'link': f"https://scholar.google.com/scholar?cites={cluster_id}",
+                'cites_id': cluster_id,
+            },
+            'versions': {
+                'total': rng.randint(1, 12),
+                'link': f"https://scholar.google.com/scholar?cluster={cluster_id}",
+                'cluster_id': cluster_id,
+            },
+        },
+        'protocol_id': rng.randint(1, len(QUERIES)),
+        'page_number': position // 20 + 1,
+    }
+    paper['source_query'] = QUERIES[paper['protocol_id'] - 1]
+    if not paper['publication_info']['authors']:
+        paper['publication_info']['authors'] = {}
+    return paper
+
+
+def simplified_paper(paper):
+    """Projects a nested record onto the simplified authors/year/abstract shape."""
+    summary = paper['publication_info']['summary']
+    return {
+        'title': paper['title'],
+        'authors': summary.split(' - ')[0].split(', '),
+        'year': summary.split(', ')[-1].split(' - ')[0],
+        'abstract': paper['snippet'],
+        'link': paper['link'],
+    }
+
+
+def generate_papers(n, schema=SCHEMA_NESTED, seed=0):
+    """Yields `n` synthetic records in the requested schema; the same seed gives the same corpus."""
+    rng = random.Random(seed)
+    for position in range(n):
+        paper = nested_paper(rng, position)
+        if schema == SCHEMA_FLATTENED:
+            paper = flatten(paper)
+        elif schema == SCHEMA_SIMPLIFIED:
+            paper = simplified_paper(paper)
+        yield paper
+
+
+def corpus_bytes(n, schema=SCHEMA_NESTED, seed=0):
+    """The corpus as the UTF-8 JSON bytes an upload would deliver."""
+    return json.dumps(list(generate_papers(n, schema, seed))).encode('utf-8')
+
+
+def write_corpus(path, n, schema=SCHEMA_NESTED, seed=0):
+    """Streams the corpus to `path` one record at a time, so 1M-record files do not need to fit in memory."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for i, paper in enumerate(generate_papers(n, schema, seed)):
+            if i:
+                f.write(',\n')
+            json.dump(paper, f)
+        f.write(']')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic SerpApi-shaped corpus")
+    parser.add_argument('--records', type=int, default=1000)
+    parser.add_argument('--schema', choices=SCHEMAS, default=SCHEMA_NESTED)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default=None)
+    args = parser.parse_args()
+
+    output = args.output or f"synthetic_{args.schema}_{args.records}.json"
+    write_corpus(output, args.records, args.schema, args.seed)
+    print(f"Wrote {args.records} {args.schema} records to {output}")
+
+
+if __name__ == "__main__":
+    main()
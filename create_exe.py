@@ -1,17 +1,13 @@
 """
 Script to create a standalone executable for the Research Screener
+
+    python create_exe.py            single ResearchScreener.exe
+    python create_exe.py --onedir   dist/ResearchScreener/ folder; starts faster
 """
-import os
 import sys
 import subprocess
 
-def create_executable():
-    # Install PyInstaller if not already installed
-    print("Installing/updating PyInstaller...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "--upgrade", "pyinstaller"])
-    
-    # Create a spec file first for better control
-    spec_content = '''
+SPEC_HEADER = '''
 # -*- mode: python ; coding: utf-8 -*-
 
 block_cipher = None
@@ -20,19 +16,22 @@ a = Analysis(
     ['research_screener.py'],
     pathex=[],
     binaries=[],
-    datas=[('scholar_results.json', '.')],
+    datas=[('scholar_results.json', '.'), ('assets', 'assets')],
     hiddenimports=['dash', 'dash_bootstrap_components', 'pandas'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['tkinter', 'matplotlib', 'IPython', 'streamlit', 'pytest'],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
     noarchive=False,
 )
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+'''
 
+# Single self-extracting file: simple to share, but unpacks everything to a temp folder on every launch
+ONEFILE_SPEC = SPEC_HEADER + '''
 exe = EXE(
     pyz,
     a.scripts,
@@ -54,6 +53,45 @@ exe = EXE(
     entitlements_file=None,
 )
 '''
+
+# Folder bundle: everything is unpacked once at build time, so launches skip extraction.
+# UPX is off because decompressing every DLL on start-up costs more than it saves on disk.
+ONEDIR_SPEC = SPEC_HEADER + '''
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='ResearchScreener',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=True,
+    disable_windowed_traceback=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='ResearchScreener',
+)
+'''
+
+def create_executable(onedir=False):
+    # Install PyInstaller if not already installed
+    print("Installing/updating PyInstaller...")
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "--upgrade", "pyinstaller"])
+    
+    # Create a spec file first for better control
+    spec_content = ONEDIR_SPEC if onedir else ONEFILE_SPEC
     
     # Write spec file
     with open('ResearchScreener.spec', 'w') as f:
@@ -62,15 +100,16 @@ exe = EXE(
     print("\nCreating executable...")
     
     # Run PyInstaller with the spec file
-    subprocess.check_call([sys.executable, "-m", "PyInstaller", "ResearchScreener.spec"])
+    subprocess.check_call([sys.executable, "-m", "PyInstaller", "--noconfirm", "ResearchScreener.spec"])
     
+    exe_path = "dist\\ResearchScreener\\ResearchScreener.exe" if onedir else "dist\\ResearchScreener.exe"
     print("\nExecutable created successfully!")
-    print("Look for 'ResearchScreener.exe' in the 'dist' folder")
+    print(f"Look for '{exe_path}'")
     
     # Create a simple batch file to run it
-    batch_content = '''@echo off
+    batch_content = f'''@echo off
 cd /d "%~dp0"
-start "" "dist\\ResearchScreener.exe"
+start "" "{exe_path}"
 '''
     with open('Run_ResearchScreener.bat', 'w') as f:
         f.write(batch_content)
@@ -79,7 +118,8 @@ start "" "dist\\ResearchScreener.exe"
 
 if __name__ == "__main__":
     try:
-        create_executable()
+        # --onedir builds the fast-start folder bundle instead of a single file
+        create_executable(onedir="--onedir" in sys.argv[1:])
     except Exception as e:
         print(f"\nError: {e}")
         print("\nTrying alternative method...")
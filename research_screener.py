@@ -1,62 +1,61 @@
-import json
-import pandas as pd
+import base64
+import functools
+import os
+import threading
+from collections import Counter
+from datetime import datetime
 import dash
-from dash import dcc, html, Input, Output, State, callback_context
+import flask
+from dash import dcc, html, Input, Output, State, ALL, callback_context
 import dash_bootstrap_components as dbc
-from datetime import datetime
-import tldextract
-import base64
-import io
-import re  # Added for regular expression matching
+
+from screening_core.abstracts import PREFETCH_AHEAD, resolver_from_env
+from screening_core.cardcache import WARM_AHEAD, CardCache, card_key
+from screening_core.catalog import catalog_from_env
+from screening_core.decisions import MAYBE
+from screening_core.importer import MAX_REPORTED
+from screening_core.metrics import REGISTRY
+from screening_core.records import corpus_key
+from screening_core.similarity import IndexCache
+from screening_core import QUEUE_ORDERS, DecisionStore, RecordStore, describe_load, import_decisions, load_many, tally, write_exports
 
 # --- The app now starts without loading any data initially ---
 
-# Initialize the app
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP, dbc.icons.FONT_AWESOME])
+# Shared services, opened on first use: importing this file (tests, benchmarks, spawned
+# workers) must not create the catalog or abstract cache files
+SERVICES = {}
+SERVICES_LOCK = threading.Lock()
 
-# --- REVISED SECTION from original code (No changes needed here) ---
-
-# A map for custom, clean names of common publishers.
-SOURCE_MAP = {
-    'taylorfrancis': 'Taylor & Francis',
-    'springer': 'Springer',
-    'wiley': 'Wiley',
-    'sagepub': 'SAGE Publications',
-    'cambridge': 'Cambridge University Press',
-    'mdpi': 'MDPI',
-    'ncbi': 'PubMed Central',
-    'jstor': 'JSTOR',
-    'proquest': 'ProQuest',
-    'csiro': 'CSIRO Publishing',
-    'lww': 'Lippincott Williams & Wilkins',
-    'healio': 'Healio',
-    'degruyterbrill': 'De Gruyter Brill',
-    'sciencedirect': 'ScienceDirect',
-    'elsevier': 'Elsevier',
-    'informit': 'Informit',
-    'jamanetwork': 'JAMA Network',
-    'healthaffairs': 'Health Affairs',
-    'academicradiology': 'Academic Radiology',
-    'researchgate': 'ResearchGate'
-}
-
-def extract_source(link):
-    if pd.isna(link) or link == 'N/A' or link == '#':
-        return 'Source unknown'
-    try:
-        extracted = tldextract.extract(link)
-        domain = extracted.domain
-        if domain in SOURCE_MAP:
-            return SOURCE_MAP[domain]
-        return domain.title()
-    except Exception:
-        try:
-            domain_part = link.split('/')[2]
-            return domain_part.replace('www.', '').title()
-        except IndexError:
-            return 'Invalid link'
+def get_service(name, factory):
+    with SERVICES_LOCK:
+        if name not in SERVICES:
+            SERVICES[name] = factory()
+        return SERVICES[name]
 
-# --- End of previously revised section ---
+def get_abstract_resolver():
+    """Full-abstract lookups; None unless SCREENER_METADATA_ENDPOINT is set."""
+    return get_service('abstracts', resolver_from_env)
+
+def get_catalog():
+    """Project catalog of corpora and decisions across sessions; None if SCREENER_CATALOG is set empty."""
+    return get_service('catalog', catalog_from_env)
+
+# Rendered cards, serialized to component JSON, for Previous/Next revisits
+CARDS = CardCache()
+CARD_THEME = 'light'  # the Dash app has a single theme
+
+# "More like this" indexes, built in the background once per uploaded corpus
+SIMILARITY = IndexCache()
+SIMILAR_PAPERS = 5
+
+# /metrics is unauthenticated, so it is only served by the debug server or when SCREENER_METRICS is set
+EXPOSE_METRICS = bool(os.environ.get('SCREENER_METRICS'))
+
+# Badge icon per decision ('maybe' decisions arrive through imports and the terminal screener)
+DECISION_ICONS = {'keep': "fas fa-check", 'discard': "fas fa-times", 'maybe': "fas fa-question"}
+
+# Initialize the app
+app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP, dbc.icons.FONT_AWESOME])
 
 
 # Custom CSS for DHSC aesthetics (with added styles for upload component)
@@ -73,6 +72,7 @@ app.index_string = '''
                 --dhsc-teal: #00ad93;
                 --dhsc-forest-green: #006652;
                 --dhsc-red: #cc092f;
+                --dhsc-amber: #b86e00;
                 --dhsc-black: #0b0c0c;
                 --dhsc-grey-1: #f3f2f1;
                 --dhsc-grey-2: #dee0e2;
@@ -189,6 +189,7 @@ app.index_string = '''
             
             #kept-counter { color: var(--dhsc-forest-green); }
             #discarded-counter { color: var(--dhsc-red); }
+            #maybe-counter { color: var(--dhsc-amber); }
             
             .progress {
                 height: 10px;
@@ -318,6 +319,28 @@ app.index_string = '''
                 color: var(--dhsc-red);
             }
             
+            .badge-maybe {
+                background: #fdf0dc;
+                color: var(--dhsc-amber);
+            }
+            
+            .similar-panel {
+                margin-top: 25px;
+                border-top: 1px solid var(--dhsc-grey-2);
+                padding-top: 15px;
+            }
+            
+            .similar-item {
+                display: flex;
+                align-items: center;
+                gap: 10px;
+                padding: 8px 0;
+                border-bottom: 1px solid var(--dhsc-grey-1);
+            }
+            
+            .similar-title { flex: 1; font-size: 0.9rem; }
+            .similar-meta { color: #505a5f; font-size: 0.8rem; }
+            
             .export-section {
                 text-align: center;
                 margin-top: 40px;
@@ -345,6 +368,20 @@ app.index_string = '''
                 color: var(--dhsc-forest-green);
                 margin-bottom: 20px;
             }
+            
+            .queue-controls {
+                display: flex;
+                gap: 20px;
+                margin-bottom: 20px;
+            }
+            
+            .queue-control { flex: 1; }
+            
+            .queue-control label {
+                font-weight: 700;
+                font-size: 0.9rem;
+                margin-bottom: 5px;
+            }
         </style>
     </head>
     <body>
@@ -362,7 +399,10 @@ app.index_string = '''
 app.layout = html.Div([
     # Data stores for holding state in the user's browser
     dcc.Store(id='stored-data'),  # Will hold the list of paper dictionaries
-    dcc.Store(id='decision-store'), # Will hold the dictionary of decisions {index: 'decision'}
+    dcc.Store(id='decision-store'), # Will hold the packed decisions, base64-encoded (see DecisionStore.encode)
+    dcc.Store(id='queue-store'),  # Will hold the record indices in screening order
+    dcc.Store(id='load-token'),  # Will hold a per-upload token that keys its progress on the server
+    dcc.Store(id='corpus-key'),  # Will hold the uploaded corpus's key (records.corpus_key), computed once per upload
 
     dbc.Container([
         # Header (always visible)
@@ -381,16 +421,31 @@ app.layout = html.Div([
                 className='upload-container',
                 children=html.Div([
                     html.I(className="fas fa-upload upload-icon"),
-                    html.P("Drag and Drop or Click to Select a JSON File", className='upload-text'),
-                    html.P("The file should be a JSON array of research paper objects.", className='upload-hint')
+                    html.P("Drag and Drop or Click to Select JSON Files", className='upload-text'),
+                    html.P("Each file should be a JSON array of research paper objects. Several harvests are merged in order.", className='upload-hint')
                 ]),
-                multiple=False # Allow only a single file to be uploaded
+                multiple=True # Several harvests can be merged into one corpus
             ),
+            html.Div(id='upload-progress', className="mt-3"), # Live progress while a large upload is normalized
+            dcc.Interval(id='load-progress-interval', interval=500, disabled=True),
             html.Div(id='upload-status') # To show error messages
         ], id='upload-container'),
 
         # Main content (hidden until data is loaded)
         html.Div([
+            # Queue ordering and filtering
+            html.Div([
+                html.Div([
+                    html.Label("Queue order"),
+                    dcc.Dropdown(id='queue-order', options=[{'label': label, 'value': value} for value, label in QUEUE_ORDERS.items()],
+                                 value='file', clearable=False)
+                ], className="queue-control"),
+                html.Div([
+                    html.Label("Minimum citations"),
+                    dcc.Input(id='min-cited-by', type='number', min=0, step=1, value=0, debounce=True, className="form-control")
+                ], className="queue-control"),
+            ], className="queue-controls"),
+
             # Progress and Stats
             html.Div([
                 html.Div([
@@ -405,6 +460,10 @@ app.layout = html.Div([
                     html.P("Papers Discarded"),
                     html.H3(id="discarded-counter", children="0")
                 ], className="progress-stat"),
+                html.Div([
+                    html.P("Marked Maybe"),
+                    html.H3(id="maybe-counter", children="0")
+                ], className="progress-stat"),
             ], className="progress-grid"),
             dbc.Progress(id="progress-bar", value=0, className="mb-4"),
 
@@ -430,50 +489,156 @@ app.layout = html.Div([
                 html.Div(id="export-status", className="mt-3")
             ], id='export-section-div', className="export-section"),
 
+            # Import of decisions from earlier sessions' exports
+            html.Div([
+                dcc.Upload(
+                    id='import-data',
+                    children=html.Button([html.I(className="fas fa-file-import me-2"), "Import Previous Decisions"],
+                                         className="btn btn-outline-secondary btn-sm"),
+                    multiple=True
+                ),
+                html.Small("screening_decisions_*.csv and kept_papers_*.json from earlier sessions", className="text-muted"),
+                html.Div(id="import-status", className="mt-3")
+            ], className="import-section mt-3"),
+
             # Hidden div to store current index
             html.Div(id="current-index", style={"display": "none"}, children=0)
-        ], id='main-content', style={'display': 'none'}) # Starts hidden
+        ], id='main-content', style={'display': 'none'}), # Starts hidden
+
+        # Project catalog: cross-project lookups and PRISMA-style counts
+        html.Details([
+            html.Summary("Project catalog"),
+            html.Div([
+                dcc.Input(id="catalog-search", type="text", placeholder="Paper title, link or ID", debounce=True,
+                          className="form-control form-control-sm"),
+                html.Button("Look up", id="catalog-search-btn", className="btn btn-outline-secondary btn-sm"),
+            ], className="d-flex gap-2 mt-2"),
+            html.Div(id="catalog-panel", className="mt-2")
+        ], className="catalog-panel mt-4"),
+
+        # Performance debug panel (same data as the /metrics endpoint)
+        html.Details([
+            html.Summary("Performance"),
+            html.Button("Refresh", id="metrics-refresh-btn", className="btn btn-outline-secondary btn-sm mt-2"),
+            html.Div(id="metrics-panel", className="mt-2")
+        ], className="metrics-panel mt-4")
         
     ], className="dhsc-container")
 ])
 
-def parse_contents(contents, filename):
-    """Parses the uploaded file content and returns the data."""
-    content_type, content_string = contents.split(',')
-    decoded = base64.b64decode(content_string)
+# Progress of each upload being normalized, keyed by its load token and polled by show_load_progress
+LOAD_PROGRESS = {}
+
+def load_progress_reporter(token):
+    """Returns a progress(done, total) callback that records into LOAD_PROGRESS[token]."""
+    def report(done, total):
+        LOAD_PROGRESS[token] = (done, total)
+    return report
+
+def parse_contents(contents, filename, progress=None):
+    """Parses the uploaded file content (or a list of them, merged in order) and returns the normalized records."""
+    contents = contents if isinstance(contents, list) else [contents]
+    filenames = filename if isinstance(filename, list) else [filename]
+    for name in filenames:
+        if 'json' not in name:
+            return None, dbc.Alert(f"Invalid file type for '{name}'. Please upload a .json file.", color="danger")
     try:
-        if 'json' in filename:
-            # Assume a JSON file
-            data = json.loads(decoded.decode('utf-8'))
-            return data, None
-        else:
-            return None, dbc.Alert(f"Invalid file type for '{filename}'. Please upload a .json file.", color="danger")
+        decoded = [base64.b64decode(content.split(',')[1]) for content in contents]
+        return load_many(decoded, progress=progress), None
     except Exception as e:
         print(e)
         return None, dbc.Alert(f"There was an error processing the file: {e}", color="danger")
 
+# --- INSTRUMENTATION ---
+
+def instrumented(func):
+    """Records the callback's run time, and tags the request so its payload sizes are recorded too."""
+    timed_func = REGISTRY.timed(func.__name__)(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        flask.g.metrics_callback = func.__name__
+        return timed_func(*args, **kwargs)
+    return wrapper
+
+@app.server.after_request
+def record_payload_size(response):
+    name = flask.g.pop('metrics_callback', None)
+    if name:
+        REGISTRY.record_payload(name, flask.request.content_length or 0, response.calculate_content_length() or 0)
+    return response
+
+@app.server.route('/metrics')
+def metrics_endpoint():
+    if not (app.server.debug or EXPOSE_METRICS):
+        flask.abort(404)
+    return flask.jsonify(REGISTRY.summary())
+
 # --- NEW CALLBACKS ---
 
 # Callback to handle file upload and store data
 @app.callback(
     Output('stored-data', 'data'),
     Output('decision-store', 'data'),
+    Output('corpus-key', 'data'),
     Output('upload-status', 'children'),
-    Output('current-index', 'children', allow_duplicate=True),
-    Input('upload-data', 'contents'),
+    Output('upload-progress', 'children', allow_duplicate=True),
+    Output('load-progress-interval', 'disabled', allow_duplicate=True),
+    Input('load-token', 'data'),
+    State('upload-data', 'contents'),
     State('upload-data', 'filename'),
     prevent_initial_call=True
 )
-def handle_upload(contents, filename):
+@instrumented
+def handle_upload(token, contents, filename):
     if contents is not None:
-        data, error_msg = parse_contents(contents, filename)
-        if data is not None:
-            # On successful upload, store data, reset decisions and index
-            return data, {}, dbc.Alert(f"Successfully loaded {len(data)} papers from '{filename}'.", color="success"), 0
+        try:
+            store, error_msg = parse_contents(contents, filename, progress=load_progress_reporter(token))
+        finally:
+            LOAD_PROGRESS.pop(token, None)
+        if store is not None:
+            # On successful upload, store normalized records and reset decisions (the new queue resets the index)
+            filenames = filename if isinstance(filename, list) else [filename]
+            names = ', '.join(f"'{name}'" for name in filenames)
+            status = dbc.Alert([
+                html.Div(f"Successfully loaded {len(store)} papers from {names}."),
+                html.Small(describe_load(store.report), className="text-muted")
+            ], color="success")
+            key = corpus_key(store.records)
+            SIMILARITY.get(store.records, key)  # start building the similarity index while the first card renders
+            catalog = get_catalog()
+            if catalog:
+                catalog.submit(catalog.record_corpus, store.records, ', '.join(filenames))
+            return store.records, DecisionStore().encode(), key, status, None, True
         else:
             # If parsing fails, show an error and don't change stored data
-            return dash.no_update, dash.no_update, error_msg, dash.no_update
-    return dash.no_update, dash.no_update, None, dash.no_update
+            return dash.no_update, dash.no_update, dash.no_update, error_msg, None, True
+    return dash.no_update, dash.no_update, dash.no_update, None, None, True
+
+# As soon as files are dropped, and without a server round trip: a fresh load token, which
+# starts handle_upload, and polling for that upload's progress
+app.clientside_callback(
+    """function(contents) {
+        return [Date.now().toString(36) + Math.random().toString(36).slice(2), false];
+    }""",
+    Output('load-token', 'data'),
+    Output('load-progress-interval', 'disabled'),
+    Input('upload-data', 'contents'),
+    prevent_initial_call=True
+)
+
+# Callback to show normalization progress while handle_upload is still running
+@app.callback(
+    Output('upload-progress', 'children'),
+    Input('load-progress-interval', 'n_intervals'),
+    State('load-token', 'data'),
+    prevent_initial_call=True
+)
+def show_load_progress(n_intervals, token):
+    done, total = LOAD_PROGRESS.get(token, (0, 0))
+    if not total:
+        return html.Small("Reading files...", className="text-muted")
+    return dbc.Progress(value=done / total * 100, label=f"{done:,} / {total:,} papers", className="mb-2")
 
 # Callback to control UI visibility
 @app.callback(
@@ -482,6 +647,7 @@ def handle_upload(contents, filename):
     Output('total-counter', 'children'),
     Input('stored-data', 'data')
 )
+@instrumented
 def toggle_main_content(data):
     if data:
         # If data exists, show main content and hide upload
@@ -490,9 +656,94 @@ def toggle_main_content(data):
         # Otherwise, hide main content and show upload
         return {'display': 'none'}, {'display': 'block'}, '0'
 
+# Callback to rebuild the screening queue when the data, order or citation filter changes
+@app.callback(
+    Output('queue-store', 'data'),
+    Input('stored-data', 'data'),
+    Input('queue-order', 'value'),
+    Input('min-cited-by', 'value'),
+    prevent_initial_call=True
+)
+@instrumented
+def update_queue(papers, order, min_cited_by):
+    if not papers:
+        raise dash.exceptions.PreventUpdate
+    return RecordStore(papers).queue(order or 'file', int(min_cited_by or 0))
+
 # --- REFACTORED AND UPDATED CALLBACKS ---
 
-# Callback to display current paper (UPDATED FOR NEW JSON STRUCTURE)
+def render_paper_card(record, current_index, total_papers, decision=None, abstract=None):
+    """Builds the card for a single normalized record; `abstract` replaces the snippet when a full one was found."""
+    link = record['link']
+    paper_content = [
+        html.Div(f"Paper {current_index + 1} of {total_papers}", className="paper-number"),
+        html.H2(record['title'], className="paper-title"),
+        html.Div([
+            html.Div([html.Span("Authors", className="meta-label"), html.Span(record['authors'], className="meta-value")], className="meta-item"),
+            html.Div([html.Span("Year", className="meta-label"), html.Span(record['year'], className="meta-value")], className="meta-item"),
+            html.Div([html.Span("Source", className="meta-label"), html.Span(record['source'], className="meta-value")], className="meta-item"),
+            html.Div([html.Span("Cited by", className="meta-label"), html.Span(f"{record.get('cited_by', 0):,}", className="meta-value")], className="meta-item"),
+            html.Div([html.Span("Versions", className="meta-label"), html.Span(f"{record.get('versions', 0):,}", className="meta-value")], className="meta-item"),
+        ], className="paper-meta"),
+        html.Div([
+            html.Span("Abstract", className="abstract-label"),
+            html.P(abstract or record['abstract'], className="abstract-text")
+        ]),
+    ]
+    
+    if link and link not in ['N/A', '#']:
+        paper_content.append(html.A([html.I(className="fas fa-external-link-alt me-2"), "View Full Text"], href=link, target="_blank", className="btn btn-outline-secondary btn-sm mt-3"))
+    
+    if decision:
+        badge_class = f"badge-{decision}"
+        icon_class = DECISION_ICONS[decision]
+        paper_content.insert(0, html.Div([html.I(className=f"{icon_class} me-2"), f"Previously marked as: {decision.upper()}"], className=f"decision-badge {badge_class}"))
+    
+    return html.Div(paper_content)
+
+def render_similar_panel(record_index, queue, papers, decisions, corpus):
+    """Lists the nearest neighbours of the current paper that are in the queue, with jump and decide buttons."""
+    index = SIMILARITY.get(papers, corpus)
+    if index is None:
+        return html.Div(html.Small("Finding similar papers...", className="text-muted"), className="similar-panel")
+
+    items = []
+    for neighbour, score in index.neighbours(record_index, SIMILAR_PAPERS, allowed=queue):
+        paper = papers[neighbour]
+        decision = decisions.get(neighbour)
+        items.append(html.Div([
+            html.Div([
+                html.Div(paper['title']),
+                html.Div(f"{paper['year']} · {paper['source']} · {score:.0%} similar"
+                         + (f" · {decision.upper()}" if decision else ''), className="similar-meta"),
+            ], className="similar-title"),
+            html.Button("Open", id={'type': 'similar-open', 'index': neighbour}, className="btn btn-outline-secondary btn-sm"),
+            html.Button(html.I(className="fas fa-times"), id={'type': 'similar-decide', 'index': neighbour, 'decision': 'discard'},
+                        className="btn btn-outline-danger btn-sm", title="Discard"),
+            html.Button(html.I(className="fas fa-check"), id={'type': 'similar-decide', 'index': neighbour, 'decision': 'keep'},
+                        className="btn btn-outline-success btn-sm", title="Keep"),
+        ], className="similar-item"))
+
+    if not items:
+        return html.Div(html.Small("No similar papers in this queue.", className="text-muted"), className="similar-panel")
+    return html.Div([html.Span("Similar papers", className="abstract-label")] + items, className="similar-panel")
+
+def component_json(value):
+    """A component tree as the plain dicts and lists Dash sends to the browser (which it accepts back as children)."""
+    if hasattr(value, 'to_plotly_json'):
+        value = value.to_plotly_json()
+    if isinstance(value, dict):
+        return {key: component_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [component_json(item) for item in value]
+    return value
+
+def card_job(record, position, total_papers, decision=None, abstract=None, corpus=None):
+    """(card cache key, renderer) for one card; the renderer returns the card as component JSON."""
+    key = card_key(record, decision, CARD_THEME, position, total_papers, abstract, corpus)
+    return key, lambda: component_json(render_paper_card(record, position, total_papers, decision, abstract))
+
+# Callback to display current paper
 @app.callback(
     Output("paper-display", "children"),
     Output("current-index", "children"),
@@ -506,137 +757,115 @@ def toggle_main_content(data):
     Input("discard-btn", "n_clicks"),
     Input("prev-btn", "n_clicks"),
     Input("next-btn", "n_clicks"),
+    Input('queue-store', 'data'),      # Screening order (record indices)
+    Input({'type': 'similar-open', 'index': ALL}, 'n_clicks'),
+    Input({'type': 'similar-decide', 'index': ALL, 'decision': ALL}, 'n_clicks'),
     State('stored-data', 'data'),      # Get paper data from store
     State('decision-store', 'data'), # Get/update decision data from store
+    State('corpus-key', 'data'),
     prevent_initial_call=True
 )
-def update_paper_display(current_idx_str, keep_clicks, discard_clicks, prev_clicks, next_clicks, papers, decisions):
-    if not papers:
+@instrumented
+def update_paper_display(current_idx_str, keep_clicks, discard_clicks, prev_clicks, next_clicks, queue, open_clicks, decide_clicks, papers, decisions, corpus):
+    if not papers or queue is None:
         raise dash.exceptions.PreventUpdate
 
+    # current_index is a position in the queue; decisions are keyed by record index
     current_index = int(current_idx_str)
-    total_papers = len(papers)
+    total_papers = len(queue)
     
-    decisions = decisions or {}
+    decisions = DecisionStore.decode(decisions)
 
     ctx = callback_context
     triggered_id = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered else 'current-index'
-    
-    str_current_index = str(current_index)
 
-    if triggered_id in ["keep-btn", "discard-btn"]:
+    decided = None
+    if triggered_id.startswith('{'):
+        # A similar-papers button; re-rendering the panel adds fresh buttons with no clicks, which is not an action
+        if not ctx.triggered[0]['value']:
+            raise dash.exceptions.PreventUpdate
+        button = ctx.triggered_id
+        if button['type'] == 'similar-open':
+            current_index = queue.index(button['index'])
+        else:
+            decisions.set(button['index'], button['decision'])
+            decided = (button['index'], button['decision'])
+    elif triggered_id == 'queue-store':
+        current_index = 0
+    elif triggered_id in ["keep-btn", "discard-btn"]:
         decision = 'keep' if triggered_id == "keep-btn" else 'discard'
         if current_index < total_papers:
-            decisions[str_current_index] = decision
-        if current_index < total_papers - 1:
-            current_index += 1
-        else:
-            current_index += 1
+            decisions.set(queue[current_index], decision)
+            decided = (queue[current_index], decision)
+        current_index += 1
 
     elif triggered_id == "prev-btn" and current_index > 0:
         current_index -= 1
     elif triggered_id == "next-btn" and current_index < total_papers:
         current_index += 1
     
+    catalog = get_catalog() if decided else None
+    if catalog:
+        catalog.submit(catalog.record_paper_decision, papers, *decided)
+
+    if not queue:
+        empty_queue = html.P("No papers match the current citation filter.", className="text-muted")
+        return empty_queue, 0, decisions.encode(), True, True, {'display': 'none'}, {'display': 'block'}
+
     if current_index >= total_papers:
-        kept_count = sum(1 for d in decisions.values() if d == 'keep')
-        discarded_count = sum(1 for d in decisions.values() if d == 'discard')
+        # Only the queued papers: the citation filter may leave decided papers out of this queue
+        queued = Counter(decisions.get(idx) for idx in queue)
         
         completion_content = html.Div([
             html.I(className="fas fa-check-circle completion-icon"),
             html.H2("All Papers Reviewed", className="mb-3"),
-            html.P(f"You have reviewed all {total_papers} papers: {kept_count} kept, {discarded_count} discarded."),
+            html.P(f"You have reviewed all {total_papers} papers: {queued['keep']} kept, {queued['discard']} discarded"
+                   f"{f', {queued[MAYBE]} maybe' if queued[MAYBE] else ''}."),
             html.P("Click the export button to download your results.", className="text-muted")
         ], className="completion-screen")
         
-        return completion_content, total_papers, decisions, True, True, {'display': 'none'}, {'display': 'block'}
+        return completion_content, total_papers, decisions.encode(), True, True, {'display': 'none'}, {'display': 'block'}
     
-    paper = papers[current_index]
-    str_current_index = str(current_index)
-    
-    # --- Data Extraction Logic for New JSON Structure ---
-    title = paper.get('title', 'No title')
-    
-    pub_info = paper.get('publication_info', {})
-    
-    authors_list = pub_info.get('authors')
-    authors_str = ''
-    if authors_list and isinstance(authors_list, list):
-        author_names = [author.get('name') for author in authors_list if author.get('name')]
-        if author_names:
-            authors_str = ', '.join(author_names)
-
-    if not authors_str:
-        summary = pub_info.get('summary', '')
-        if summary:
-            # Heuristic: extract the part before the first ' - '
-            authors_part = summary.split(' - ')[0]
-            authors_str = authors_part.replace('…', '').strip()
-        else:
-            authors_str = 'No authors listed'
-            
-    summary_for_year = pub_info.get('summary', '')
-    year_match = re.search(r'\b(19|20)\d{2}\b', summary_for_year)
-    year = year_match.group(0) if year_match else 'N/A'
-    
-    abstract = paper.get('snippet', 'No snippet available')
-    link = paper.get('link')
-    source = extract_source(link)
-    # --- End of Data Extraction Logic ---
-    
-    paper_content = [
-        html.Div(f"Paper {current_index + 1} of {total_papers}", className="paper-number"),
-        html.H2(title, className="paper-title"),
-        html.Div([
-            html.Div([html.Span("Authors", className="meta-label"), html.Span(authors_str, className="meta-value")], className="meta-item"),
-            html.Div([html.Span("Year", className="meta-label"), html.Span(year, className="meta-value")], className="meta-item"),
-            html.Div([html.Span("Source", className="meta-label"), html.Span(source, className="meta-value")], className="meta-item"),
-        ], className="paper-meta"),
-        html.Div([
-            html.Span("Abstract", className="abstract-label"),
-            html.P(abstract, className="abstract-text")
-        ]),
-    ]
-    
-    if link and link not in ['N/A', '#']:
-        paper_content.append(html.A([html.I(className="fas fa-external-link-alt me-2"), "View Full Text"], href=link, target="_blank", className="btn btn-outline-secondary btn-sm mt-3"))
-    
-    if str_current_index in decisions:
-        decision = decisions[str_current_index]
-        badge_class = "badge-keep" if decision == 'keep' else "badge-discard"
-        icon_class = "fas fa-check" if decision == 'keep' else "fas fa-times"
-        paper_content.insert(0, html.Div([html.I(className=f"{icon_class} me-2"), f"Previously marked as: {decision.upper()}"], className=f"decision-badge {badge_class}"))
-    
-    paper_display = html.Div(paper_content)
+    record_index = queue[current_index]
+    abstracts = get_abstract_resolver()
+    # Only ever read abstracts from the cache here; the current and next few papers are fetched in the background
+    cached_abstract = abstracts.cached if abstracts else lambda paper: None
+    if abstracts:
+        abstracts.prefetch([papers[i] for i in queue[current_index:current_index + 1 + PREFETCH_AHEAD]])
+    # Cards are cached as serialized JSON; the next few are rendered in the background for Next, keyed
+    # with the abstract they would be shown with now
+    upcoming = range(current_index + 1, min(current_index + 1 + WARM_AHEAD, total_papers))
+    CARDS.warm([card_job(papers[queue[p]], p, total_papers, decisions.get(queue[p]), cached_abstract(papers[queue[p]]), corpus)
+                for p in upcoming])
+    record = papers[record_index]
+    paper_display = html.Div([
+        CARDS.get(*card_job(record, current_index, total_papers, decisions.get(record_index), cached_abstract(record), corpus)),
+        render_similar_panel(record_index, queue, papers, decisions, corpus),
+    ])
     
     prev_disabled = current_index == 0
     next_disabled = current_index >= total_papers - 1
 
-    return paper_display, current_index, decisions, prev_disabled, next_disabled, {'display': 'flex'}, {'display': 'block'}
+    return paper_display, current_index, decisions.encode(), prev_disabled, next_disabled, {'display': 'flex'}, {'display': 'block'}
 
 # Callback to update counters and progress (now uses dcc.Store)
 @app.callback(
     Output("kept-counter", "children"),
     Output("discarded-counter", "children"),
+    Output("maybe-counter", "children"),
     Output("progress-bar", "value"),
     Input("decision-store", "data"), # Triggered by changes in decisions
     State("stored-data", "data")   # Gets total count from stored papers
 )
+@instrumented
 def update_counters(decisions, papers):
     if not papers:
-        return "0", "0", 0
+        return "0", "0", "0", 0
 
-    decisions = decisions or {}
-    total_papers = len(papers)
-    reviewed_count = len(decisions)
-    
-    kept = sum(1 for d in decisions.values() if d == 'keep')
-    discarded = sum(1 for d in decisions.values() if d == 'discard')
-    progress = (reviewed_count / total_papers) * 100 if total_papers > 0 else 0
-    
-    return str(kept), str(discarded), progress
+    counts = tally(DecisionStore.decode(decisions), len(papers))
+    return str(counts.kept), str(counts.discarded), str(counts.maybe), counts.progress
 
-# Callback to export decisions (UPDATED FOR NEW JSON STRUCTURE)
+# Callback to export decisions
 @app.callback(
     Output("export-status", "children"),
     Input("export-btn", "n_clicks"),
@@ -644,65 +873,127 @@ def update_counters(decisions, papers):
     State("stored-data", "data"),
     prevent_initial_call=True
 )
+@instrumented
 def export_decisions(n_clicks, decisions, papers):
     if n_clicks and decisions and papers:
-        flat_export_data = []
-        kept_papers_original = []
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        for str_idx, decision in decisions.items():
-            idx = int(str_idx)
-            if idx < len(papers):
-                paper = papers[idx]
-
-                # --- Data Extraction for CSV ---
-                pub_info = paper.get('publication_info', {})
-                authors_list = pub_info.get('authors')
-                authors_str = ''
-                if authors_list and isinstance(authors_list, list):
-                    author_names = [author.get('name') for author in authors_list if author.get('name')]
-                    if author_names:
-                        authors_str = ', '.join(author_names)
-                if not authors_str:
-                    summary = pub_info.get('summary', '')
-                    authors_str = summary.split(' - ')[0].replace('…', '').strip() if summary else 'No authors listed'
-                
-                summary_for_year = pub_info.get('summary', '')
-                year_match = re.search(r'\b(19|20)\d{2}\b', summary_for_year)
-                year = year_match.group(0) if year_match else 'N/A'
-                link = paper.get('link')
-                
-                flat_paper_data = {
-                    'index': idx,
-                    'decision': decision,
-                    'title': paper.get('title', 'N/A'),
-                    'authors': authors_str,
-                    'year': year,
-                    'source': extract_source(link),
-                    'link': link or 'N/A',
-                    'snippet': paper.get('snippet', 'N/A'),
-                }
-                flat_export_data.append(flat_paper_data)
-                # --- End Data Extraction ---
-
-                if decision == 'keep':
-                    paper_copy = paper.copy()
-                    paper_copy['decision'] = decision
-                    kept_papers_original.append(paper_copy)
-
-        # Export flattened data to CSV
-        df = pd.DataFrame(flat_export_data)
-        csv_filename = f"screening_decisions_{timestamp}.csv"
-        df.to_csv(csv_filename, index=False, encoding='utf-8')
-        
-        # Export kept papers with original structure to JSON
-        json_filename = f"kept_papers_{timestamp}.json"
-        with open(json_filename, 'w', encoding='utf-8') as f:
-            json.dump(kept_papers_original, f, indent=4)
-            
+        csv_filename, json_filename = write_exports(RecordStore(papers), DecisionStore.decode(decisions))
         return dbc.Alert(f"Successfully exported to {csv_filename} and {json_filename}", color="success", dismissable=True, duration=5000)
     return ""
 
+def render_import_report(report):
+    """The import summary, with the conflicting and unmatched rows."""
+    children = [html.Div(report.summary())]
+    if report.conflicts:
+        children.append(html.Details([
+            html.Summary(f"{len(report.conflicts)} conflicts"),
+            html.Ul([html.Li(f"{title}: {kept.upper()} (not {other.upper()}, from {name})")
+                     for _, title, kept, other, name in report.conflicts[:MAX_REPORTED]])
+        ]))
+    if report.unmatched_titles:
+        children.append(html.Details([
+            html.Summary(f"{report.unmatched} rows not in this corpus"),
+            html.Ul([html.Li(f"{title} ({name})") for name, title in report.unmatched_titles])
+        ]))
+    color = "warning" if report.conflicts or report.unmatched else "success"
+    return dbc.Alert(children, color=color, dismissable=True)
+
+# Callback to merge decisions from earlier exports into this session
+@app.callback(
+    Output("decision-store", "data", allow_duplicate=True),
+    Output("import-status", "children"),
+    Input("import-data", "contents"),
+    State("import-data", "filename"),
+    State("decision-store", "data"),
+    State("stored-data", "data"),
+    prevent_initial_call=True
+)
+@instrumented
+def import_previous_decisions(contents, filenames, decisions, papers):
+    if not contents or not papers:
+        raise dash.exceptions.PreventUpdate
+    for name in filenames:
+        if not name.lower().endswith(('.csv', '.json')):
+            return dash.no_update, dbc.Alert(f"Invalid file type for '{name}'. Please upload .csv or .json exports.", color="danger")
+    current = DecisionStore.decode(decisions)
+    try:
+        files = [(name, base64.b64decode(content.split(',')[1])) for name, content in zip(filenames, contents)]
+        merged, report = import_decisions(papers, files, current)
+    except Exception as e:
+        return dash.no_update, dbc.Alert(f"There was an error importing the decisions: {e}", color="danger")
+    changes = current.diff(merged)
+    catalog = get_catalog() if changes else None
+    if catalog:
+        catalog.submit(catalog.record_corpus_decisions, papers, changes)
+    return merged.encode(), render_import_report(report)
+
+# Callback to show the rolling p50/p95 timings in the debug panel
+@app.callback(
+    Output("metrics-panel", "children"),
+    Input("metrics-refresh-btn", "n_clicks")
+)
+def render_metrics_panel(n_clicks):
+    summary = REGISTRY.summary()
+    if not summary:
+        return html.P("No callbacks recorded yet.", className="text-muted")
+    header = html.Tr([html.Th(label) for label in ["Callback", "Calls", "p50 ms", "p95 ms", "Max ms", "Response p95 KB"]])
+    rows = [
+        html.Tr([html.Td(name), html.Td(entry['calls']), html.Td(entry['p50_ms']), html.Td(entry['p95_ms']), html.Td(entry['max_ms']),
+                 html.Td(f"{entry.get('response_p95_bytes', 0) / 1024:.1f}")])
+        for name, entry in summary.items()
+    ]
+    return html.Table([html.Thead(header), html.Tbody(rows)], className="table table-sm")
+
+# Callback for the project catalog panel: looks a paper up across projects and shows PRISMA-style counts
+@app.callback(
+    Output("catalog-panel", "children"),
+    Input("catalog-search-btn", "n_clicks"),
+    Input("catalog-search", "value"),
+    State("stored-data", "data"),
+    prevent_initial_call=True
+)
+@instrumented
+def render_catalog_panel(n_clicks, search, papers):
+    catalog = get_catalog()
+    if not catalog:
+        return html.P("The project catalog is turned off (SCREENER_CATALOG is empty).", className="text-muted")
+
+    content = []
+    if search and search.strip():
+        hits = catalog.lookup(search)
+        if hits:
+            header = html.Tr([html.Th(label) for label in ["Corpus", "Harvest query", "Decision", "Decided"]])
+            rows = [html.Tr([html.Td(hit.corpus), html.Td(hit.query or '-'), html.Td((hit.decision or 'not screened').upper()),
+                             html.Td(datetime.fromtimestamp(hit.decided_at).strftime('%Y-%m-%d %H:%M') if hit.decided_at else '-')])
+                    for hit in hits]
+            content += [html.P(hits[0].title, className="fw-bold mb-1"),
+                        html.Table([html.Thead(header), html.Tbody(rows)], className="table table-sm")]
+        else:
+            content.append(html.P("This paper is not in any catalogued corpus.", className="text-muted"))
+
+    corpus_id = catalog.corpus_id(papers) if papers else None
+    columns = [("All projects", catalog.prisma())] + ([("This corpus", catalog.prisma(corpus_id))] if corpus_id else [])
+    labels = [("Records identified", 'identified'), ("Duplicates removed", 'duplicates_removed'), ("Screened", 'screened'),
+              ("Included (kept)", 'included'), ("Excluded (discarded)", 'excluded'), ("Maybe", 'maybe')]
+    header = html.Tr([html.Th("PRISMA")] + [html.Th(name) for name, _ in columns])
+    rows = [html.Tr([html.Td(label)] + [html.Td(f"{getattr(counts, field):,}") for _, counts in columns]) for label, field in labels]
+    content.append(html.Table([html.Thead(header), html.Tbody(rows)], className="table table-sm"))
+    return content
+
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    import argparse
+    import multiprocessing
+    import sys
+    from screening_core.startup import preload_in_background
+
+    # Must run first: in the packaged executable, normalization workers re-enter here
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="Research Screening Tool")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--fast-start", action="store_true",
+                        help="Run without the debug reloader and dev tools (always on in the packaged executable).")
+    args = parser.parse_args()
+
+    fast_start = args.fast_start or getattr(sys, 'frozen', False)
+    preload_in_background()
+    app.run(debug=not fast_start, port=args.port)
@@ -1,11 +1,18 @@
-import json
-import pandas as pd
 import streamlit as st
+import time
+from collections import Counter
 from datetime import datetime
-import io
-import re
 import html # <--- 1. IMPORT PYTHON'S STANDARD HTML MODULE
 
+from screening_core.abstracts import PREFETCH_AHEAD, resolver_from_env
+from screening_core.cardcache import WARM_AHEAD, CardCache, card_key
+from screening_core.catalog import catalog_from_env
+from screening_core.importer import MAX_REPORTED
+from screening_core.metrics import REGISTRY
+from screening_core import QUEUE_ORDERS, DecisionStore, describe_load, import_decisions, load_records, tally, export_bytes
+
+RUN_STARTED = time.perf_counter()
+
 # --- Page Configuration ---
 st.set_page_config(
     page_title="DHSC Research Screener",
@@ -13,44 +20,18 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# --- Data Parsing for the Specific JSON Structure ---
-def parse_serpapi_paper(paper: dict) -> dict:
-    """
-    Parses a single paper object from the SerpApi JSON structure
-    and returns a standardized, clean dictionary.
-    """
-    authors_list = paper.get('publication_info.authors', [])
-    if isinstance(authors_list, list) and authors_list:
-        authors = ", ".join([author.get('name', 'N/A') for author in authors_list])
-    else:
-        authors_summary = paper.get('publication_info.summary', '').split(' - ')[0]
-        authors = authors_summary
-
-    summary = paper.get('publication_info.summary', '')
-    year_match = re.search(r'\b(19|20)\d{2}\b', summary)
-    year = year_match.group(0) if year_match else "N/A"
-
-    return {
-        "title": paper.get('title', 'No Title Provided'),
-        "authors": authors,
-        "year": year,
-        "abstract": paper.get('snippet', 'No abstract or snippet available.'),
-        "link": paper.get('link', '#'),
-        "original_data": paper
-    }
-
 # --- Dynamic, Themed CSS ---
 def get_themed_css(theme):
     if theme == "Dark":
-        bg_color, text_color, card_bg_color, card_border_color, meta_text_color, badge_keep_bg, badge_discard_bg = (
-            "#212328", "#f1f1f1", "#2b2d31", "#404246", "#a0a3a8", "rgba(0, 173, 147, 0.2)", "rgba(204, 9, 47, 0.2)")
+        bg_color, text_color, card_bg_color, card_border_color, meta_text_color, badge_keep_bg, badge_discard_bg, badge_maybe_bg = (
+            "#212328", "#f1f1f1", "#2b2d31", "#404246", "#a0a3a8", "rgba(0, 173, 147, 0.2)", "rgba(204, 9, 47, 0.2)", "rgba(230, 150, 20, 0.2)")
     else:
-        bg_color, text_color, card_bg_color, card_border_color, meta_text_color, badge_keep_bg, badge_discard_bg = (
-            "#f3f2f1", "#0b0c0c", "#ffffff", "#dee0e2", "#505a5f", "#e5f0ed", "#fae6e9")
+        bg_color, text_color, card_bg_color, card_border_color, meta_text_color, badge_keep_bg, badge_discard_bg, badge_maybe_bg = (
+            "#f3f2f1", "#0b0c0c", "#ffffff", "#dee0e2", "#505a5f", "#e5f0ed", "#fae6e9", "#fdf0dc")
 
     css = f"""
     <style>
-        :root {{ --dhsc-teal: #00ad93; --dhsc-forest-green: #006652; --dhsc-red: #cc092f; }}
+        :root {{ --dhsc-teal: #00ad93; --dhsc-forest-green: #006652; --dhsc-red: #cc092f; --dhsc-amber: #b86e00; }}
         html, body, [class*="st-"] {{ font-family: Arial, sans-serif; }}
         .stApp {{ background-color: {bg_color}; }}
         .app-header {{ display: flex; align-items: center; border-bottom: 1px solid {card_border_color}; padding-bottom: 20px; margin-bottom: 20px; }}
@@ -66,20 +47,137 @@ def get_themed_css(theme):
         .decision-badge {{ padding: 8px 15px; border-radius: 5px; font-weight: 700; margin-bottom: 15px; font-size: 0.9rem; display: inline-block; }}
         .badge-keep {{ background: {badge_keep_bg}; color: var(--dhsc-forest-green); }}
         .badge-discard {{ background: {badge_discard_bg}; color: var(--dhsc-red); }}
+        .badge-maybe {{ background: {badge_maybe_bg}; color: var(--dhsc-amber); }}
     </style>
     """
     st.markdown(css, unsafe_allow_html=True)
 
+# --- Instrumentation ---
+def rerun():
+    """Records how long this script run took before handing over to st.rerun()."""
+    REGISTRY.record('streamlit_rerun', time.perf_counter() - RUN_STARTED)
+    st.rerun()
+
+def show_metrics_panel():
+    with st.sidebar.expander("Performance"):
+        summary = REGISTRY.summary()
+        if summary:
+            st.table([{"metric": name, **entry} for name, entry in summary.items()])
+        else:
+            st.caption("No reruns recorded yet.")
+
+# --- Full-Abstract Enrichment ---
+@st.cache_resource
+def get_abstract_resolver():
+    """One resolver (connection pool + cache) shared by all sessions; None unless an endpoint is configured."""
+    return resolver_from_env()
+
+# --- Project Catalog ---
+@st.cache_resource
+def get_catalog():
+    """The project catalog shared by all sessions; None if SCREENER_CATALOG is set empty."""
+    return catalog_from_env()
+
+def decide(idx, decision):
+    """Records a decision in the session and, in the background, in the project catalog."""
+    st.session_state.decisions.set(idx, decision)
+    catalog = get_catalog()
+    if catalog:
+        catalog.submit(catalog.record_paper_decision, st.session_state.papers.records, idx, decision)
+
+def show_catalog_panel():
+    """Sidebar lookups across projects and PRISMA-style counts."""
+    catalog = get_catalog()
+    if not catalog:
+        return
+    with st.sidebar.expander("Project catalog"):
+        search = st.text_input("Look up a paper", placeholder="Title, link or paper ID")
+        if search.strip():
+            hits = catalog.lookup(search)
+            if not hits:
+                st.caption("This paper is not in any catalogued corpus.")
+            for hit in hits:
+                decided = datetime.fromtimestamp(hit.decided_at).strftime('%Y-%m-%d') if hit.decided_at else ''
+                st.markdown(f"**{html.escape(hit.corpus)}**: {(hit.decision or 'not screened').upper()} {decided}")
+        papers = st.session_state.get('papers')
+        corpus_id = catalog.corpus_id(papers.records) if papers is not None else None
+        counts = catalog.prisma(corpus_id) if corpus_id else catalog.prisma()
+        st.caption("This corpus" if corpus_id else "All projects")
+        st.table({"PRISMA": ["Records identified", "Duplicates removed", "Screened", "Included", "Excluded", "Maybe"],
+                  "Papers": [counts.identified, counts.duplicates_removed, counts.screened, counts.included, counts.excluded, counts.maybe]})
+
+# --- Import of Earlier Sessions ---
+def import_previous_decisions(files):
+    """Merges the decisions from earlier exports into the session (session decisions win) and keeps the report."""
+    for file in files:
+        file.seek(0)
+    decisions, report = import_decisions(st.session_state.papers.records, [(file.name, file) for file in files], st.session_state.decisions)
+    changes = st.session_state.decisions.diff(decisions)
+    st.session_state.decisions = decisions
+    st.session_state.import_report = report
+    catalog = get_catalog()
+    if catalog and changes:
+        catalog.submit(catalog.record_corpus_decisions, st.session_state.papers.records, changes)
+
+def show_import_report():
+    report = st.session_state.get('import_report')
+    if report is None:
+        return
+    with st.sidebar.expander("Import report", expanded=bool(report.conflicts or report.unmatched)):
+        st.caption(report.summary())
+        if report.conflicts:
+            st.markdown("**Conflicts**")
+            st.table([{"paper": title, "decision": kept, "other decision": other, "file": name}
+                      for _, title, kept, other, name in report.conflicts[:MAX_REPORTED]])
+        if report.unmatched_titles:
+            st.markdown("**Not in this corpus**")
+            st.table([{"title": title, "file": name} for name, title in report.unmatched_titles])
+
+# --- Paper Card ---
+def render_card_html(paper, position, queue_length, decision=None, abstract=None):
+    """Builds the entire paper card as one HTML string."""
+    html_parts = ['<div class="paper-card">']
+
+    if decision:
+        badge_class = f"badge-{decision}"
+        html_parts.append(f'<div class="decision-badge {badge_class}">Previously marked as: {decision.upper()}</div>')
+
+    html_parts.append(f'<p><strong>Paper {position + 1} of {queue_length}</strong></p>')
+    html_parts.append(f'<p class="paper-title">{html.escape(paper["title"])}</p>')
+    html_parts.append(f'<div class="paper-meta"><strong>Authors:</strong> {html.escape(paper["authors"])}<br><strong>Year:</strong> {html.escape(str(paper["year"]))}'
+                      f'<br><strong>Cited by:</strong> {paper["cited_by"]:,} &middot; <strong>Versions:</strong> {paper["versions"]:,}</div>')
+    html_parts.append(f'<p><strong>{"Abstract" if abstract else "Abstract / Snippet"}</strong></p>')
+    html_parts.append(f'<p class="abstract-text">{html.escape(abstract or paper["abstract"])}</p>')
+    html_parts.append('</div>')
+    return "".join(html_parts)
+
+def card_job(paper, position, queue_length, theme, decision=None, abstract=None):
+    """(card cache key, renderer) for one card."""
+    return (card_key(paper, decision, theme, position, queue_length, abstract),
+            lambda: render_card_html(paper, position, queue_length, decision, abstract))
+
 # --- State Management ---
+@REGISTRY.timed('streamlit_load')
 def reset_state_with_new_file(uploaded_file):
     try:
-        raw_json_data = json.load(io.StringIO(uploaded_file.getvalue().decode("utf-8")))
-        st.session_state.papers = [parse_serpapi_paper(p) for p in raw_json_data]
+        progress_bar = st.progress(0.0, text="Reading file...")
+        st.session_state.papers = load_records(
+            uploaded_file.getvalue(),
+            progress=lambda done, total: progress_bar.progress(done / total, text=f"Normalized {done:,} of {total:,} papers"))
+        progress_bar.empty()
         st.session_state.total_papers = len(st.session_state.papers)
         st.session_state.current_index = 0
-        st.session_state.decisions = {}
+        st.session_state.decisions = DecisionStore()
+        st.session_state.pop('queue_key', None)
+        st.session_state.card_cache = CardCache()
+        st.session_state.pop('import_key', None)
+        st.session_state.pop('import_report', None)
         st.session_state.uploaded_file_name = uploaded_file.name
+        catalog = get_catalog()
+        if catalog:
+            catalog.submit(catalog.record_corpus, st.session_state.papers.records, uploaded_file.name)
         st.success(f"Successfully loaded and parsed '{uploaded_file.name}' with {st.session_state.total_papers} papers.")
+        st.caption(describe_load(st.session_state.papers.report))
     except Exception as e:
         st.error(f"Failed to process file. Please ensure it's a valid JSON from the expected source. Error: {e}")
         st.session_state.papers = None
@@ -91,6 +189,11 @@ with st.sidebar:
     selected_theme = st.radio("Choose App Theme", ("Light", "Dark"), key="theme", horizontal=True)
     st.markdown("---")
     uploaded_file = st.file_uploader("Upload Research Data", type=['json'], help="Upload a JSON file from SerpApi.")
+    previous_exports = st.file_uploader("Import previous decisions", type=['csv', 'json'], accept_multiple_files=True,
+                                        help="screening_decisions_*.csv and kept_papers_*.json from earlier sessions.")
+    st.markdown("---")
+    queue_order = st.selectbox("Queue order", list(QUEUE_ORDERS), format_func=QUEUE_ORDERS.get)
+    min_cited_by = st.number_input("Minimum citations", min_value=0, step=1, value=0)
 
 get_themed_css(selected_theme)
 
@@ -102,83 +205,84 @@ st.markdown("""
 if uploaded_file and ('papers' not in st.session_state or st.session_state.get('uploaded_file_name') != uploaded_file.name):
     reset_state_with_new_file(uploaded_file)
 
+if previous_exports and st.session_state.get('papers') is not None:
+    import_key = tuple((file.name, file.size) for file in previous_exports)
+    if st.session_state.get('import_key') != import_key:
+        import_previous_decisions(previous_exports)
+        st.session_state.import_key = import_key
+
 if 'papers' in st.session_state and st.session_state.papers is not None:
-    reviewed_count = len(st.session_state.decisions)
-    kept_count = list(st.session_state.decisions.values()).count('keep')
-    discarded_count = list(st.session_state.decisions.values()).count('discard')
     total_papers = st.session_state.total_papers
+    counts = tally(st.session_state.decisions, total_papers)
+    reviewed_count, kept_count, discarded_count = counts.reviewed, counts.kept, counts.discarded
+
+    # The queue holds record indices in screening order; current_index is a position in it
+    queue_key = (queue_order, int(min_cited_by))
+    if st.session_state.get('queue_key') != queue_key:
+        st.session_state.queue = st.session_state.papers.queue(*queue_key)
+        st.session_state.queue_key = queue_key
+        st.session_state.current_index = 0
+    queue = st.session_state.queue
+    queue_length = len(queue)
 
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     col1.metric("Reviewed", f"{reviewed_count}/{total_papers}")
     col2.metric("Kept", kept_count)
     col3.metric("Discarded", discarded_count)
+    col4.metric("Maybe", counts.maybe)
     st.progress((reviewed_count / total_papers) if total_papers > 0 else 0)
     st.markdown("<hr>", unsafe_allow_html=True)
 
-    is_screening_complete = (reviewed_count == total_papers)
+    is_screening_complete = all(i in st.session_state.decisions for i in queue)
     col1, col2, col3, col4 = st.columns(4)
 
     if col1.button("⬅️ Previous", disabled=(st.session_state.current_index == 0)):
-        st.session_state.current_index -= 1; st.rerun()
+        st.session_state.current_index -= 1; rerun()
     if col2.button("❌ Discard", disabled=is_screening_complete):
-        st.session_state.decisions[st.session_state.current_index] = 'discard'
-        if st.session_state.current_index < total_papers - 1: st.session_state.current_index += 1
-        st.rerun()
+        decide(queue[st.session_state.current_index], 'discard')
+        if st.session_state.current_index < queue_length - 1: st.session_state.current_index += 1
+        rerun()
     if col3.button("✅ Keep", disabled=is_screening_complete):
-        st.session_state.decisions[st.session_state.current_index] = 'keep'
-        if st.session_state.current_index < total_papers - 1: st.session_state.current_index += 1
-        st.rerun()
-    if col4.button("Next ➡️", disabled=(st.session_state.current_index >= total_papers - 1)):
-        st.session_state.current_index += 1; st.rerun()
+        decide(queue[st.session_state.current_index], 'keep')
+        if st.session_state.current_index < queue_length - 1: st.session_state.current_index += 1
+        rerun()
+    if col4.button("Next ➡️", disabled=(st.session_state.current_index >= queue_length - 1)):
+        st.session_state.current_index += 1; rerun()
         
-    if is_screening_complete and total_papers > 0:
+    if not queue:
+        st.info("No papers match the current citation filter.")
+    elif is_screening_complete:
         st.success("🎉 All papers have been reviewed!")
-        st.markdown(f"**Final Tally:** You kept **{kept_count}** and discarded **{discarded_count}** papers.")
+        queued = Counter(st.session_state.decisions.get(idx) for idx in queue)
+        st.markdown(f"**Final Tally:** You kept **{queued['keep']}** and discarded **{queued['discard']}** of the {queue_length} queued papers.")
         st.balloons()
     else:
-        idx = st.session_state.current_index
+        position = st.session_state.current_index
+        idx = queue[position]
         paper = st.session_state.papers[idx]
         
-        # Build the entire paper card as one HTML string
-        html_parts = ['<div class="paper-card">']
-
-        if idx in st.session_state.decisions:
-            decision = st.session_state.decisions[idx]
-            badge_class = "badge-keep" if decision == 'keep' else "badge-discard"
-            html_parts.append(f'<div class="decision-badge {badge_class}">Previously marked as: {decision.upper()}</div>')
-
-        html_parts.append(f'<p><strong>Paper {idx + 1} of {total_papers}</strong></p>')
-        
-        # --- 2. REPLACE THE BROKEN FUNCTION CALLS ---
-        html_parts.append(f'<p class="paper-title">{html.escape(paper["title"])}</p>')
-        html_parts.append(f'<div class="paper-meta"><strong>Authors:</strong> {html.escape(paper["authors"])}<br><strong>Year:</strong> {paper["year"]}</div>')
-        
         # Use Streamlit's button for the link, placed just before the card
-        if paper["link"] and paper["link"] != '#':
+        if paper["link"] not in ('N/A', '#'):
             st.link_button("View Full Text ↗️", paper["link"])
-        
-        html_parts.append('<p><strong>Abstract / Snippet</strong></p>')
-        html_parts.append(f'<p class="abstract-text">{html.escape(paper["abstract"])}</p>')
-        html_parts.append('</div>')
-        
-        final_html = "".join(html_parts)
-        st.markdown(final_html, unsafe_allow_html=True)
+
+        resolver = get_abstract_resolver()
+        cached_abstract = resolver.cached if resolver else lambda record: None
+        if resolver:
+            resolver.prefetch([st.session_state.papers[i] for i in queue[position:position + 1 + PREFETCH_AHEAD]])
+
+        # Cards are cached per paper, decision, theme, position and abstract; the next few are rendered in the
+        # background. The cache is per session and replaced on every upload, so it needs no corpus key
+        decisions = st.session_state.decisions
+        card_cache = st.session_state.setdefault('card_cache', CardCache())
+        st.markdown(card_cache.get(*card_job(paper, position, queue_length, selected_theme, decisions.get(idx), cached_abstract(paper))), unsafe_allow_html=True)
+        card_cache.warm([card_job(st.session_state.papers[queue[p]], p, queue_length, selected_theme, decisions.get(queue[p]),
+                                  cached_abstract(st.session_state.papers[queue[p]]))
+                         for p in range(position + 1, min(position + 1 + WARM_AHEAD, queue_length))])
 
     if reviewed_count > 0:
         st.markdown("<hr>", unsafe_allow_html=True)
         st.subheader("Export Decisions")
-        export_list = [dict(p, decision=st.session_state.decisions.get(i)) for i, p in enumerate(st.session_state.papers) if i in st.session_state.decisions]
-        
-        clean_export_list = [
-            {
-                "decision": p['decision'], "title": p['title'], "authors": p['authors'], "year": p['year'],
-                "link": p['link'], "abstract": p['abstract']
-            } for p in export_list
-        ]
-        
-        df = pd.DataFrame(clean_export_list)
-        csv_bytes = df.to_csv(index=False, encoding='utf-8').encode('utf-8')
-        json_bytes = df[df['decision'] == 'keep'].to_json(orient='records', indent=2).encode('utf-8')
+        csv_bytes, json_bytes = export_bytes(st.session_state.papers, st.session_state.decisions)
 
         d_col1, d_col2 = st.columns(2)
         d_col1.download_button("📥 Download All Decisions (CSV)", csv_bytes, f"screening_decisions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv", "text/csv", use_container_width=True)
@@ -186,3 +290,8 @@ if 'papers' in st.session_state and st.session_state.papers is not None:
 
 else:
     st.info("Upload a JSON file using the sidebar to begin screening.")
+
+show_import_report()
+show_catalog_panel()
+REGISTRY.record('streamlit_rerun', time.perf_counter() - RUN_STARTED)
+show_metrics_panel()
@@ -0,0 +1,274 @@
+"""
+Keyboard-only terminal screener for fast first-pass screens.
+
+Reads the same harvest files as the web screeners, but lazily from disk
+(screening_core.corpusfile), and draws each card as plain text with no round trip.
+Every decision is appended to a durable log next to the corpus before the next
+card is shown, so a session can be closed and resumed at any point. The E key
+writes the same screening_decisions_<ts>.csv / kept_papers_<ts>.json as the Dash
+Export button; exports from either screener can be brought in with --import,
+so a screen can move between the terminal and the browser.
+
+Keys:
+    2 / k   keep               1 / d   discard
+    → / n   next paper         ← / p   previous paper
+    u       undo last decision o       open the link in a browser
+    e       export             q       quit
+
+Usage:
+    python research_screener_terminal.py scholar_results.json
+    python research_screener_terminal.py harvest1.json harvest2.json --order cited_by --min-cited-by 5
+    python research_screener_terminal.py scholar_results.json --import screening_decisions_20250805_143707.csv
+"""
+import argparse
+import os
+import shutil
+import sys
+import textwrap
+import time
+import webbrowser
+
+from screening_core import QUEUE_ORDERS, import_decisions, tally, write_exports
+from screening_core.corpusfile import CorpusFile
+from screening_core.decisionlog import DecisionLog, replay
+from screening_core.startup import preload_in_background
+
+KEEP_KEYS = ('2', 'k')
+DISCARD_KEYS = ('1', 'd')
+NEXT_KEYS = ('right', 'n')
+PREVIOUS_KEYS = ('left', 'p')
+FOOTER = "2/k keep · 1/d discard · ←/→ move · u undo · o open · e export · q quit"
+
+# Terminal escape sequences
+BOLD, DIM, RESET = '\x1b[1m', '\x1b[2m', '\x1b[0m'
+GREEN, RED, YELLOW = '\x1b[32m', '\x1b[31m', '\x1b[33m'
+CLEAR = '\x1b[H\x1b[J'
+ENTER_SCREEN, LEAVE_SCREEN = '\x1b[?1049h\x1b[?25l', '\x1b[?25h\x1b[?1049l'
+DECISION_COLOURS = {'keep': GREEN, 'discard': RED, 'maybe': YELLOW}
+ESCAPE_KEYS = {'\x1b[C': 'right', '\x1b[D': 'left', '\x1bOC': 'right', '\x1bOD': 'left'}
+WINDOWS_KEYS = {'M': 'right', 'K': 'left'}
+MAX_ABSTRACT_LINES = 12
+
+
+def default_log_path(path):
+    """The decision log kept next to the (first) corpus file."""
+    return f"{os.path.splitext(path)[0]}.screening_log.jsonl"
+
+
+class Keyboard:
+    """Reads single keypresses (arrows as 'left'/'right') without waiting for Enter."""
+
+    def __enter__(self):
+        if os.name == 'nt':
+            import msvcrt
+            self._msvcrt = msvcrt
+            os.system('')  # turns on escape-sequence handling in the Windows console
+        else:
+            import termios
+            import tty
+            self._fd = sys.stdin.fileno()
+            self._saved = termios.tcgetattr(self._fd)
+            tty.setcbreak(self._fd)
+        return self
+
+    def read(self):
+        if os.name == 'nt':
+            key = self._msvcrt.getwch()
+            if key in ('\x00', '\xe0'):
+                return WINDOWS_KEYS.get(self._msvcrt.getwch(), '')
+            return key.lower()
+        key = os.read(self._fd, 8).decode('utf-8', 'ignore')
+        return ESCAPE_KEYS.get(key, key.lower())
+
+    def __exit__(self, *exc):
+        if os.name != 'nt':
+            import termios
+            termios.tcsetattr(self._fd, termios.TCSADRAIN, self._saved)
+
+
+def render_card(record, position, queue_length, decision=None, counts=None, width=80, status=''):
+    """The whole screen for one paper as a single string."""
+    width = max(40, width)
+    lines = []
+    header = f"Paper {position + 1:,} of {queue_length:,}"
+    if counts:
+        header += f"   {counts.kept:,} kept · {counts.discarded:,} discarded"
+        if counts.maybe:
+            header += f" · {counts.maybe:,} maybe"
+        header += f" · {counts.reviewed:,}/{counts.total:,} reviewed"
+    lines.append(f"{DIM}{header}{RESET}")
+    if decision:
+        lines.append(f"{DECISION_COLOURS[decision]}Previously marked as: {decision.upper()}{RESET}")
+    lines.append('')
+    lines.extend(f"{BOLD}{line}{RESET}" for line in textwrap.wrap(record['title'], width))
+    lines.append('')
+    lines.extend(textwrap.wrap(f"Authors: {record['authors']}", width))
+    lines.append(f"Year: {record['year']} · Source: {record['source']} · "
+                 f"Cited by: {record.get('cited_by', 0):,} · Versions: {record.get('versions', 0):,}")
+    lines.append('')
+    abstract = textwrap.wrap(record['abstract'], width)
+    if len(abstract) > MAX_ABSTRACT_LINES:
+        abstract = abstract[:MAX_ABSTRACT_LINES - 1] + [abstract[MAX_ABSTRACT_LINES - 1][:width - 1] + '…']
+    lines.extend(abstract)
+    lines.append('')
+    lines.append(f"{DIM}{record['link']}{RESET}")
+    lines.append('')
+    lines.append(f"{DIM}{FOOTER}{RESET}")
+    if status:
+        lines.append(status)
+    return '\n'.join(lines)
+
+
+def render_completion(queue_length, counts, status=''):
+    lines = [f"{BOLD}All {queue_length:,} papers reviewed{RESET}",
+             f"{counts.kept:,} kept, {counts.discarded:,} discarded"
+             f"{f', {counts.maybe:,} maybe' if counts.maybe else ''}.", '',
+             f"{DIM}← review the last paper · u undo · e export · q quit{RESET}"]
+    if status:
+        lines.append(status)
+    return '\n'.join(lines)
+
+
+class TerminalScreener:
+    """The screening loop: current position in the queue, decisions, the log and undo history."""
+
+    def __init__(self, corpus, queue, decisions, log, export_dir='.'):
+        self.corpus, self.queue, self.decisions, self.log = corpus, queue, decisions, log
+        self.export_dir = export_dir
+        self.history = []  # (position, record index, decision before) for undo
+        self.status = ''
+        self._current = (None, None)  # (record index, record) of the card on screen
+        # Resume at the first unscreened paper
+        self.position = next((p for p, idx in enumerate(queue) if idx not in decisions), len(queue))
+
+    def record(self, idx):
+        """The record at `idx`, parsed from disk unless it is the one already on screen."""
+        if self._current[0] != idx:
+            self._current = (idx, self.corpus[idx])
+        return self._current[1]
+
+    def draw(self):
+        counts = tally(self.decisions, len(self.corpus))
+        if self.position >= len(self.queue):
+            return render_completion(len(self.queue), counts, self.status)
+        start = time.perf_counter()
+        idx = self.queue[self.position]
+        screen = render_card(self.record(idx), self.position, len(self.queue), self.decisions.get(idx), counts,
+                             shutil.get_terminal_size().columns - 1, self.status)
+        return screen + f"\n{DIM}card drawn in {(time.perf_counter() - start) * 1000:.2f} ms{RESET}"
+
+    def decide(self, decision):
+        if self.position >= len(self.queue):
+            return
+        idx = self.queue[self.position]
+        self.history.append((self.position, idx, self.decisions.get(idx)))
+        self.decisions.set(idx, decision)
+        self.log.append(idx, self.record(idx)['paper_id'], decision)
+        self.position += 1
+
+    def undo(self):
+        if not self.history:
+            self.status = "Nothing to undo."
+            return
+        self.position, idx, previous = self.history.pop()
+        if previous:
+            self.decisions.set(idx, previous)
+        else:
+            self.decisions.clear(idx)
+        self.log.append(idx, self.record(idx)['paper_id'], previous)
+
+    def handle(self, key):
+        """Applies one keypress; returns False to quit."""
+        self.status = ''
+        if key in KEEP_KEYS:
+            self.decide('keep')
+        elif key in DISCARD_KEYS:
+            self.decide('discard')
+        elif key in NEXT_KEYS:
+            self.position = min(self.position + 1, len(self.queue))
+        elif key in PREVIOUS_KEYS:
+            self.position = max(self.position - 1, 0)
+        elif key == 'u':
+            self.undo()
+        elif key == 'o' and self.position < len(self.queue):
+            link = self.record(self.queue[self.position])['link']
+            if link not in ('N/A', '#'):
+                webbrowser.open(link)
+        elif key == 'e':
+            if len(self.decisions):
+                csv_filename, json_filename = write_exports(self.corpus, self.decisions, directory=self.export_dir)
+                self.status = f"{GREEN}Exported to {csv_filename} and {json_filename}{RESET}"
+            else:
+                self.status = "No decisions to export yet."
+        elif key == 'q':
+            return False
+        return True
+
+    def run(self):
+        with Keyboard() as keyboard:
+            sys.stdout.write(ENTER_SCREEN)
+            try:
+                while True:
+                    sys.stdout.write(CLEAR + self.draw())
+                    sys.stdout.flush()
+                    if not self.handle(keyboard.read()):
+                        break
+            finally:
+                sys.stdout.write(LEAVE_SCREEN)
+                sys.stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('corpus', nargs='+', help="Harvest JSON file(s), merged in order as in the web screeners")
+    parser.add_argument('--order', choices=list(QUEUE_ORDERS), default='file', help="Queue order")
+    parser.add_argument('--min-cited-by', type=int, default=0, help="Only screen papers cited at least this often")
+    parser.add_argument('--log', help="Decision log (default: <corpus>.screening_log.jsonl next to the first file)")
+    parser.add_argument('--import', dest='imports', nargs='+', default=[], metavar='EXPORT',
+                        help="screening_decisions_*.csv / kept_papers_*.json from earlier sessions to merge in")
+    parser.add_argument('--export-dir', default='.', help="Where the E key writes its exports")
+    parser.add_argument('--no-fsync', action='store_true', help="Flush the log without fsync (faster, less durable)")
+    args = parser.parse_args()
+
+    if not sys.stdin.isatty():
+        parser.error("the terminal screener needs an interactive terminal")
+
+    # Source lookups and exports need tldextract and pandas; load them while the corpus is scanned
+    preload = preload_in_background()
+    start = time.perf_counter()
+    corpus = CorpusFile(args.corpus)
+    log_path = args.log or default_log_path(args.corpus[0])
+    decisions, stale = replay(log_path, corpus)
+    log = DecisionLog(log_path, fsync=not args.no_fsync)
+    notes = [f"Opened {len(corpus):,} papers in {time.perf_counter() - start:.2f} s; "
+             f"{len(decisions):,} decisions from {os.path.basename(log_path)}"]
+    if stale:
+        notes.append(f"{stale:,} logged decisions did not match this corpus and were ignored")
+
+    if args.imports:
+        files = [(os.path.basename(path), open(path, 'rb')) for path in args.imports]
+        try:
+            imported, report = import_decisions(corpus, files, decisions)
+        finally:
+            for _, f in files:
+                f.close()
+        # Imported decisions go through the log too, so they survive a restart
+        log.append_many([(idx, corpus[idx]['paper_id'], decision) for idx, decision in decisions.diff(imported).items()])
+        decisions = imported
+        notes.append(report.summary())
+
+    screener = TerminalScreener(corpus, corpus.queue(args.order, args.min_cited_by), decisions, log, args.export_dir)
+    screener.status = '\n'.join(notes)
+    preload.join()
+    try:
+        screener.run()
+    finally:
+        log.close()
+        corpus.close()
+    counts = tally(decisions, len(corpus))
+    print(f"{counts.reviewed:,} of {len(corpus):,} papers screened ({counts.kept:,} kept, {counts.discarded:,} discarded). "
+          f"Decisions are in {log_path}")
+
+
+if __name__ == '__main__':
+    main()
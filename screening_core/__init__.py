@@ -0,0 +1,27 @@
+"""
+Front-end-agnostic screening engine shared by the Dash and Streamlit screeners.
+"""
+from screening_core.schema import detect_schema, flatten
+from screening_core.records import SOURCE_MAP, extract_source, fingerprint, normalize_paper, RecordStore
+from screening_core.columns import QUEUE_ORDERS
+from screening_core.loader import LoadReport, describe_load, load_many, load_papers, load_records
+from screening_core.corpusfile import CorpusFile
+from screening_core.decisions import DecisionStore
+from screening_core.decisionlog import DecisionLog
+from screening_core.counters import Tally, tally
+from screening_core.exporter import build_export_rows, export_bytes, write_exports
+from screening_core.importer import ImportReport, import_decisions
+from screening_core.similarity import SimilarityIndex
+
+__all__ = [
+    'SOURCE_MAP', 'extract_source', 'fingerprint', 'normalize_paper', 'RecordStore',
+    'detect_schema', 'flatten',
+    'QUEUE_ORDERS',
+    'LoadReport', 'describe_load', 'load_many', 'load_papers', 'load_records',
+    'CorpusFile',
+    'DecisionStore', 'DecisionLog',
+    'Tally', 'tally',
+    'build_export_rows', 'export_bytes', 'write_exports',
+    'ImportReport', 'import_decisions',
+    'SimilarityIndex',
+]
@@ -0,0 +1,250 @@
+"""
+Full-abstract enrichment from a metadata service, replacing the truncated Scholar
+snippet on the card when one can be found.
+
+The endpoint is configurable; it defaults to nothing, so no network calls happen
+unless SCREENER_METADATA_ENDPOINT is set, for example:
+
+    SCREENER_METADATA_ENDPOINT=https://api.crossref.org/works/{doi}
+    SCREENER_METADATA_LINK_ENDPOINT=https://metadata.example.org/lookup?url={url}   (optional)
+    SCREENER_ABSTRACT_FIELD=message.abstract                                       (JSON path, default)
+
+Requests go through a small keep-alive connection pool, on a thread pool that
+caps concurrency. Results are kept in an on-disk SQLite cache keyed by DOI or
+URL, so each paper is only fetched once. A "no abstract" answer is cached too,
+but expires after SCREENER_ABSTRACT_MISS_TTL seconds (default: a week), so one
+bad response does not hide an abstract for good.
+"""
+import html
+import http.client
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+
+DOI_PATTERN = re.compile(r'10\.\d{4,9}/[^\s?#&]+')
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+DEFAULT_CACHE_PATH = 'abstract_cache.sqlite3'
+DEFAULT_ABSTRACT_FIELD = 'message.abstract'
+DEFAULT_CONCURRENCY = 8
+DEFAULT_MISS_TTL = 7 * 24 * 60 * 60  # seconds a cached "no abstract" is trusted before asking again
+PREFETCH_AHEAD = 5
+
+
+def find_doi(link):
+    """Pulls a DOI out of a publisher link, if it contains one."""
+    if not isinstance(link, str):
+        return None
+    match = DOI_PATTERN.search(link)
+    return match.group(0).rstrip('.').lower() if match else None
+
+
+def cache_key(record):
+    """'doi:<doi>' when the link carries a DOI, else 'url:<link>'; None if there is nothing to look up."""
+    doi = find_doi(record.get('link'))
+    if doi:
+        return f"doi:{doi}"
+    link = record.get('link')
+    if isinstance(link, str) and link.startswith('http'):
+        return f"url:{link}"
+    return None
+
+
+def clean_abstract(text):
+    """Strips JATS/HTML markup and collapses whitespace."""
+    return ' '.join(html.unescape(TAG_PATTERN.sub(' ', text)).split())
+
+
+class AbstractCache:
+    """Persistent key -> abstract map. An empty string records a confirmed miss, kept for `miss_ttl` seconds."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, miss_ttl=DEFAULT_MISS_TTL):
+        self.miss_ttl = miss_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS abstracts (key TEXT PRIMARY KEY, abstract TEXT NOT NULL, fetched_at REAL NOT NULL)")
+        self._conn.commit()
+
+    def get_many(self, keys):
+        """Returns {key: abstract} for the keys that are cached (misses only until they expire), in one query per 500 keys."""
+        keys = list(keys)
+        found = {}
+        misses_since = time.time() - self.miss_ttl
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                found.update(self._conn.execute(f"SELECT key, abstract FROM abstracts WHERE key IN ({placeholders}) "
+                                                f"AND (abstract != '' OR fetched_at >= ?)", batch + [misses_since]))
+        return found
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO abstracts (key, abstract, fetched_at) VALUES (?, ?, ?)",
+                                   [(key, abstract, now) for key, abstract in items])
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections, reused per host across requests."""
+
+    def __init__(self, size=DEFAULT_CONCURRENCY, timeout=10):
+        self.size = size
+        self.timeout = timeout
+        self._idle = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def _connect(self, scheme, netloc):
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return connection_class(netloc, timeout=self.timeout)
+
+    def get(self, url):
+        """Returns (status, body bytes). Retries once on a fresh connection if a pooled one had gone stale."""
+        parts = urlsplit(url)
+        host = (parts.scheme, parts.netloc)
+        path = parts.path + (f"?{parts.query}" if parts.query else '')
+        for attempt in range(2):
+            with self._lock:
+                connection = self._idle[host].pop() if self._idle[host] else None
+            reused = connection is not None
+            connection = connection or self._connect(*host)
+            try:
+                connection.request('GET', path or '/', headers={'Accept': 'application/json',
+                                                                 'User-Agent': 'ResearchScreener/1.0'})
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                with self._lock:
+                    if len(self._idle[host]) < self.size:
+                        self._idle[host].append(connection)
+                    else:
+                        connection.close()
+            return response.status, body
+
+    def close(self):
+        with self._lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+
+class AbstractResolver:
+    """Looks up full abstracts through the cache first and the metadata endpoint second."""
+
+    def __init__(self, endpoint, link_endpoint=None, cache=None, abstract_field=DEFAULT_ABSTRACT_FIELD,
+                 concurrency=DEFAULT_CONCURRENCY, timeout=10):
+        self.endpoint = endpoint
+        self.link_endpoint = link_endpoint
+        self.cache = cache or AbstractCache()
+        self.abstract_field = abstract_field.split('.')
+        self.pool = ConnectionPool(size=concurrency, timeout=timeout)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='abstracts')
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    def _url_for(self, key):
+        kind, value = key.split(':', 1)
+        if kind == 'doi':
+            return self.endpoint.format(doi=quote(value, safe='/'))
+        if self.link_endpoint:
+            return self.link_endpoint.format(url=quote(value, safe=''))
+        return None
+
+    def _fetch(self, key):
+        """Returns the abstract ('' when the service has none), or None if the request failed and should be retried later."""
+        url = self._url_for(key)
+        if url is None:
+            return ''
+        try:
+            status, body = self.pool.get(url)
+        except (OSError, http.client.HTTPException):
+            return None
+        if status == 404:
+            return ''
+        if status != 200:
+            return None
+        try:
+            value = json.loads(body)
+            for part in self.abstract_field:
+                value = value.get(part) if isinstance(value, dict) else None
+        except ValueError:
+            return ''
+        return clean_abstract(value) if isinstance(value, str) else ''
+
+    def _fetch_and_store(self, keys):
+        try:
+            results = list(zip(keys, self._executor.map(self._fetch, keys)))
+            self.cache.put_many([(key, abstract) for key, abstract in results if abstract is not None])
+            return dict(results)
+        finally:
+            with self._lock:
+                self._in_flight.difference_update(keys)
+
+    def cached(self, record):
+        """Non-blocking: the full abstract if it is already cached, else None."""
+        key = cache_key(record)
+        return (self.cache.get(key) or None) if key else None
+
+    def resolve_many(self, records):
+        """Blocking batch lookup: returns {cache key: abstract or ''} for every record that has a key."""
+        keys = {cache_key(record) for record in records} - {None}
+        found = self.cache.get_many(keys)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            found.update((key, abstract or '') for key, abstract in self._fetch_and_store(missing).items())
+        return found
+
+    def prefetch(self, records):
+        """Starts fetching any uncached abstracts for `records` in the background and returns immediately."""
+        keys = {cache_key(record) for record in records} - {None}
+        with self._lock:
+            keys -= self._in_flight
+        keys -= set(self.cache.get_many(keys))
+        if not keys:
+            return
+        keys = list(keys)
+        with self._lock:
+            self._in_flight.update(keys)
+        threading.Thread(target=self._fetch_and_store, args=(keys,), daemon=True, name='abstracts-prefetch').start()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.pool.close()
+        self.cache.close()
+
+
+def resolver_from_env():
+    """Builds the resolver configured by the SCREENER_* environment variables, or None if enrichment is off."""
+    endpoint = os.environ.get('SCREENER_METADATA_ENDPOINT')
+    if not endpoint:
+        return None
+    return AbstractResolver(
+        endpoint,
+        link_endpoint=os.environ.get('SCREENER_METADATA_LINK_ENDPOINT'),
+        cache=AbstractCache(os.environ.get('SCREENER_ABSTRACT_CACHE', DEFAULT_CACHE_PATH),
+                            miss_ttl=float(os.environ.get('SCREENER_ABSTRACT_MISS_TTL', DEFAULT_MISS_TTL))),
+        abstract_field=os.environ.get('SCREENER_ABSTRACT_FIELD', DEFAULT_ABSTRACT_FIELD),
+        concurrency=int(os.environ.get('SCREENER_METADATA_CONCURRENCY', DEFAULT_CONCURRENCY)),
+    )
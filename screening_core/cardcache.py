@@ -0,0 +1,68 @@
+"""
+Bounded LRU cache of rendered paper cards, shared by both front ends.
+
+A card is a pure function of the paper's displayed fields, its decision, the
+theme, its place in the queue and the full abstract, if one was found, so the
+key is exactly those plus the corpus: a new decision, theme, upload or
+re-harvested citation count is simply a different key, and nothing has to be
+cleared. The next few cards can be warmed on a background thread while the
+reviewer reads the current one.
+"""
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_CARDS = 256
+WARM_AHEAD = 3
+
+# Record fields shown on a card; the paper ID only covers title and link
+CARD_FIELDS = ('title', 'authors', 'year', 'source', 'cited_by', 'versions', 'abstract', 'link')
+
+
+def card_key(record, decision, theme, position, total, abstract=None, corpus=None):
+    """Everything a rendered card depends on, and the corpus (records.corpus_key) it belongs to."""
+    return (tuple([record.get(field) for field in CARD_FIELDS]), decision, theme, position, total, abstract, corpus)
+
+
+class CardCache:
+    """Thread-safe LRU map of card key -> rendered payload."""
+
+    def __init__(self, max_cards=DEFAULT_MAX_CARDS):
+        self.max_cards = max_cards
+        self.hits = 0
+        self.misses = 0
+        self._cards = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, render):
+        """The cached payload for `key`, calling `render()` and caching the result on a miss."""
+        with self._lock:
+            if key in self._cards:
+                self._cards.move_to_end(key)
+                self.hits += 1
+                return self._cards[key]
+            self.misses += 1
+        payload = render()
+        self._put(key, payload)
+        return payload
+
+    def _put(self, key, payload):
+        with self._lock:
+            self._cards[key] = payload
+            self._cards.move_to_end(key)
+            while len(self._cards) > self.max_cards:
+                self._cards.popitem(last=False)
+
+    def warm(self, jobs):
+        """Renders any uncached (key, render) pairs on a background thread."""
+        with self._lock:
+            jobs = [(key, render) for key, render in jobs if key not in self._cards]
+        if jobs:
+            threading.Thread(target=lambda: [self._put(key, render()) for key, render in jobs],
+                             daemon=True, name='card-warm').start()
+
+    def clear(self):
+        with self._lock:
+            self._cards.clear()
+
+    def __len__(self):
+        return len(self._cards)
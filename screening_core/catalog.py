@@ -0,0 +1,251 @@
+"""
+Persistent project catalog: every corpus loaded, the harvest queries behind it
+and every decision made, keyed by stable paper ID, in one SQLite file.
+
+Answers "have we ever screened this paper, and what did we decide?" across
+projects, and PRISMA-style counts, without grepping old export files. The
+number of papers and the decision tallies are kept up to date by triggers, so
+counts never scan the papers or decisions tables.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from screening_core.decisions import DECISIONS, DISCARD, KEEP, MAYBE
+from screening_core.records import corpus_key, normalize_link, normalize_text
+
+DEFAULT_CATALOG_PATH = 'screening_catalog.sqlite3'
+UNNAMED_CORPUS = 'Unnamed corpus'
+PAPER_ID_PATTERN = re.compile(r'^[0-9a-f]{16}$')
+
+PrismaCounts = namedtuple('PrismaCounts', ['identified', 'duplicates_removed', 'screened', 'included', 'excluded', 'maybe'])
+CatalogHit = namedtuple('CatalogHit', ['paper_id', 'title', 'year', 'corpus', 'query', 'decision', 'decided_at'])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS corpora (
+    corpus_id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    records INTEGER NOT NULL,
+    unique_papers INTEGER NOT NULL,
+    loaded_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS queries (
+    query_id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS papers (
+    paper_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    link_key TEXT NOT NULL,
+    year TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS papers_title_key ON papers (title_key);
+CREATE INDEX IF NOT EXISTS papers_link_key ON papers (link_key);
+CREATE TABLE IF NOT EXISTS paper_count (
+    papers INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS papers_insert AFTER INSERT ON papers BEGIN
+    UPDATE paper_count SET papers = papers + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS papers_delete AFTER DELETE ON papers BEGIN
+    UPDATE paper_count SET papers = papers - 1;
+END;
+CREATE TABLE IF NOT EXISTS corpus_papers (
+    corpus_id INTEGER NOT NULL REFERENCES corpora,
+    position INTEGER NOT NULL,
+    paper_id TEXT NOT NULL,
+    query_id INTEGER REFERENCES queries,
+    PRIMARY KEY (corpus_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS corpus_papers_paper ON corpus_papers (paper_id);
+CREATE TABLE IF NOT EXISTS decisions (
+    corpus_id INTEGER NOT NULL REFERENCES corpora,
+    paper_id TEXT NOT NULL,
+    decision TEXT NOT NULL,
+    decided_at REAL NOT NULL,
+    PRIMARY KEY (corpus_id, paper_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS decisions_paper ON decisions (paper_id);
+CREATE TABLE IF NOT EXISTS decision_counts (
+    corpus_id INTEGER NOT NULL,
+    decision TEXT NOT NULL,
+    papers INTEGER NOT NULL,
+    PRIMARY KEY (corpus_id, decision)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS decisions_insert AFTER INSERT ON decisions BEGIN
+    INSERT INTO decision_counts VALUES (NEW.corpus_id, NEW.decision, 1)
+        ON CONFLICT (corpus_id, decision) DO UPDATE SET papers = papers + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS decisions_delete AFTER DELETE ON decisions BEGIN
+    UPDATE decision_counts SET papers = papers - 1 WHERE corpus_id = OLD.corpus_id AND decision = OLD.decision;
+END;
+CREATE TRIGGER IF NOT EXISTS decisions_update AFTER UPDATE OF decision ON decisions BEGIN
+    UPDATE decision_counts SET papers = papers - 1 WHERE corpus_id = OLD.corpus_id AND decision = OLD.decision;
+    INSERT INTO decision_counts VALUES (NEW.corpus_id, NEW.decision, 1)
+        ON CONFLICT (corpus_id, decision) DO UPDATE SET papers = papers + 1;
+END;
+"""
+
+
+def harvest_query(record):
+    """The search query a record was harvested with (the R scraper's source_query column), if recorded."""
+    query = (record.get('original_data') or {}).get('source_query')
+    return query if isinstance(query, str) and query else None
+
+
+class Catalog:
+    """SQLite-backed record of corpora, harvest queries and decisions across screening sessions."""
+
+    def __init__(self, path=DEFAULT_CATALOG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA cache_size=-65536")  # 64 MB, enough to keep the indexes hot while a corpus is recorded
+        self._conn.executescript(SCHEMA)
+        with self._conn:
+            # The one row of paper_count; a catalog from before the counter is counted once here
+            if self._conn.execute("SELECT 1 FROM paper_count").fetchone() is None:
+                self._conn.execute("INSERT INTO paper_count SELECT COUNT(*) FROM papers")
+        self._corpus_ids = {}
+        # Writes from the UIs are queued here, in order, so a click never waits on SQLite
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='catalog')
+
+    def submit(self, func, *args):
+        """Runs a catalog write (e.g. self.record_corpus) on the background writer; returns its Future."""
+        return self._writer.submit(func, *args)
+
+    def record_corpus(self, records, name):
+        """Registers a corpus (once per distinct set of paper IDs) with its papers and queries; returns its id."""
+        fingerprint = corpus_key(records)
+        if fingerprint in self._corpus_ids:
+            return self._corpus_ids[fingerprint]
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT corpus_id FROM corpora WHERE fingerprint = ?", (fingerprint,)).fetchone()
+            if row:
+                corpus_id = row[0]
+            else:
+                queries = {query for query in map(harvest_query, records) if query}
+                self._conn.executemany("INSERT OR IGNORE INTO queries (text) VALUES (?)", [(query,) for query in queries])
+                query_ids = dict(self._conn.execute("SELECT text, query_id FROM queries")) if queries else {}
+                corpus_id = self._conn.execute(
+                    "INSERT INTO corpora (fingerprint, name, records, unique_papers, loaded_at) VALUES (?, ?, ?, ?, ?)",
+                    (fingerprint, name, len(records), len({record['paper_id'] for record in records}), time.time())).lastrowid
+                # Inserting in key order keeps the B-tree writes sequential
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO papers (paper_id, title, title_key, link_key, year) VALUES (?, ?, ?, ?, ?)",
+                    sorted((r['paper_id'], r['title'], normalize_text(r['title']), normalize_link(r['link']), str(r['year']))
+                           for r in records))
+                self._conn.executemany(
+                    "INSERT INTO corpus_papers (corpus_id, position, paper_id, query_id) VALUES (?, ?, ?, ?)",
+                    ((corpus_id, position, r['paper_id'], query_ids.get(harvest_query(r)))
+                     for position, r in enumerate(records)))
+        self._corpus_ids[fingerprint] = corpus_id
+        return corpus_id
+
+    def corpus_id(self, records):
+        """The id of an already-recorded corpus, or None."""
+        fingerprint = corpus_key(records)
+        if fingerprint not in self._corpus_ids:
+            with self._lock:
+                row = self._conn.execute("SELECT corpus_id FROM corpora WHERE fingerprint = ?", (fingerprint,)).fetchone()
+            if not row:
+                return None
+            self._corpus_ids[fingerprint] = row[0]
+        return self._corpus_ids[fingerprint]
+
+    def record_paper_decision(self, records, index, decision):
+        """record_decision for record `index` of a corpus identified by its records (recorded first if new)."""
+        corpus_id = self.corpus_id(records) or self.record_corpus(records, UNNAMED_CORPUS)
+        self.record_decision(corpus_id, records[index]['paper_id'], decision)
+
+    def record_corpus_decisions(self, records, changes):
+        """record_decisions for a corpus identified by its records (recorded first if new)."""
+        corpus_id = self.corpus_id(records) or self.record_corpus(records, UNNAMED_CORPUS)
+        self.record_decisions(corpus_id, records, changes)
+
+    def record_decision(self, corpus_id, paper_id, decision):
+        """Stores (or with decision=None, removes) one paper's decision in a corpus."""
+        with self._lock, self._conn:
+            if decision is None:
+                self._conn.execute("DELETE FROM decisions WHERE corpus_id = ? AND paper_id = ?", (corpus_id, paper_id))
+            elif decision in DECISIONS:
+                self._conn.execute(
+                    "INSERT INTO decisions (corpus_id, paper_id, decision, decided_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (corpus_id, paper_id) DO UPDATE SET decision = excluded.decision, decided_at = excluded.decided_at "
+                    "WHERE decision != excluded.decision",
+                    (corpus_id, paper_id, decision, time.time()))
+            else:
+                raise ValueError(f"Unknown decision '{decision}'")
+
+    def record_decisions(self, corpus_id, records, changes):
+        """Applies {record index: decision or None} (e.g. DecisionStore.diff) in one transaction."""
+        now = time.time()
+        upserts = [(corpus_id, records[idx]['paper_id'], decision, now) for idx, decision in changes.items() if decision]
+        deletes = [(corpus_id, records[idx]['paper_id']) for idx, decision in changes.items() if not decision]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO decisions (corpus_id, paper_id, decision, decided_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (corpus_id, paper_id) DO UPDATE SET decision = excluded.decision, decided_at = excluded.decided_at "
+                "WHERE decision != excluded.decision", upserts)
+            self._conn.executemany("DELETE FROM decisions WHERE corpus_id = ? AND paper_id = ?", deletes)
+
+    def lookup(self, text, limit=50):
+        """
+        Every corpus a paper appears in, with the query that found it and any decision,
+        newest corpus first. `text` is a paper ID, a link or a title.
+        """
+        text = text.strip()
+        if PAPER_ID_PATTERN.match(text):
+            where, key = "p.paper_id = ?", text
+        elif text.lower().startswith(('http', 'www.')):
+            where, key = "p.link_key = ?", normalize_link(text)
+        else:
+            where, key = "p.title_key = ?", normalize_text(text)
+        with self._lock:
+            rows = self._conn.execute(f"""
+                SELECT p.paper_id, p.title, p.year, c.name, q.text, d.decision, d.decided_at
+                FROM papers p
+                JOIN corpus_papers cp ON cp.paper_id = p.paper_id
+                JOIN corpora c ON c.corpus_id = cp.corpus_id
+                LEFT JOIN queries q ON q.query_id = cp.query_id
+                LEFT JOIN decisions d ON d.corpus_id = cp.corpus_id AND d.paper_id = p.paper_id
+                WHERE {where}
+                ORDER BY c.loaded_at DESC
+                LIMIT ?""", (key, limit)).fetchall()
+        return [CatalogHit(*row) for row in rows]
+
+    def prisma(self, corpus_id=None):
+        """
+        PRISMA-style screening counts for one corpus, or over every corpus in the
+        catalog (a paper decided in two projects then counts as screened twice).
+        """
+        corpus_filter, params = ("WHERE corpus_id = ?", (corpus_id,)) if corpus_id is not None else ("", ())
+        with self._lock:
+            identified, unique = self._conn.execute(
+                f"SELECT COALESCE(SUM(records), 0), COALESCE(SUM(unique_papers), 0) FROM corpora {corpus_filter}", params).fetchone()
+            if corpus_id is None:
+                # Across projects, a paper harvested by several corpora is one paper
+                unique = self._conn.execute("SELECT papers FROM paper_count").fetchone()[0]
+            counts = dict(self._conn.execute(
+                f"SELECT decision, SUM(papers) FROM decision_counts {corpus_filter} GROUP BY decision", params))
+        included, excluded, maybe = counts.get(KEEP, 0), counts.get(DISCARD, 0), counts.get(MAYBE, 0)
+        return PrismaCounts(identified, identified - unique, included + excluded + maybe, included, excluded, maybe)
+
+    def close(self):
+        self._writer.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
+
+
+def catalog_from_env():
+    """The catalog at SCREENER_CATALOG (default: screening_catalog.sqlite3 in the working directory); None if set empty."""
+    path = os.environ.get('SCREENER_CATALOG', DEFAULT_CATALOG_PATH)
+    return Catalog(path) if path else None
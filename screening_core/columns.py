@@ -0,0 +1,45 @@
+"""
+Typed numeric columns (citation and version counts) used to order and filter the
+screening queue.
+
+numpy and pandas are imported on first use so that they are not paid for before
+the first page is served.
+"""
+from screening_core.schema import compile_plan
+
+NUMERIC_FIELDS = ('cited_by', 'versions')
+
+QUEUE_ORDERS = {
+    'file': 'File order',
+    'cited_by': 'Most cited first',
+    'versions': 'Most versions first',
+}
+
+
+def to_int_column(values):
+    """Converts raw JSON values (ints, numeric strings, None) to an int64 array in one step; missing -> 0."""
+    import numpy as np
+    import pandas as pd
+    numbers = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+    # NaN (missing, non-numeric) and 'inf' have no int64 value
+    return numbers.where(np.isfinite(numbers), 0).to_numpy(dtype=np.int64)
+
+
+def extract_numeric_columns(papers, schema):
+    """Returns {field: int64 array} for every field in NUMERIC_FIELDS."""
+    getters = compile_plan(schema, NUMERIC_FIELDS)
+    return {field: to_int_column([get(p) for p in papers]) for field, get in zip(NUMERIC_FIELDS, getters)}
+
+
+def queue_order(columns, total, order='file', min_cited_by=0):
+    """
+    Returns the record indices to screen, filtered to papers cited at least
+    `min_cited_by` times and sorted by `order` (descending, ties in file order).
+    """
+    import numpy as np
+    indices = np.arange(total)
+    if order in columns:
+        indices = np.argsort(-columns[order], kind='stable')
+    if min_cited_by:
+        indices = indices[columns['cited_by'][indices] >= min_cited_by]
+    return indices.tolist()
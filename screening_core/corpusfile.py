@@ -0,0 +1,191 @@
+"""
+Random access to harvest files on disk, for screening without loading the corpus.
+
+Opening a file is one streaming pass that keeps only the byte span of each paper
+in the top-level JSON array; the file itself is memory-mapped. A record is built
+on request by decoding that one span and normalizing it exactly as load_records
+would, so records[i] (and anything exported from it) is identical to the record
+from loading the whole file.
+"""
+import codecs
+import json
+import mmap
+from array import array
+from bisect import bisect_right
+
+from screening_core.columns import NUMERIC_FIELDS, queue_order, to_int_column
+from screening_core.importer import ELEMENT_END
+from screening_core.loader import load_papers
+from screening_core.records import make_record, compile_extractor
+from screening_core.schema import SCHEMA_MIXED, compile_plan, detect_schema
+
+CHUNK_SIZE = 1 << 20
+SCHEMA_SAMPLE = 20  # papers detect_schema looks at, as in load_many
+
+
+def _byte_length(text):
+    return len(text) if text.isascii() else len(text.encode('utf-8'))
+
+
+def iter_array_spans(stream, chunk_size=CHUNK_SIZE):
+    """
+    Yields (item, start byte, end byte) for each element of a top-level JSON array
+    in a binary stream, reading it in chunks. Raises ValueError if the file is not an array.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    head = stream.read(len(codecs.BOM_UTF8))
+    byte_mark = len(head) if head == codecs.BOM_UTF8 else 0
+    buffer = text_decoder.decode(head[byte_mark:], final=not head)
+    # byte_mark is the byte offset of buffer[char_mark]
+    position = char_mark = 0
+    opened = exhausted = False
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position < len(buffer):
+            if not opened:
+                if buffer[position] != '[':
+                    raise ValueError("Expected a JSON array")
+                opened, position = True, position + 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                end = None
+            # An item not yet followed by ',' or ']' (e.g. a number) may continue in the next chunk
+            if end is not None and (exhausted or ELEMENT_END.match(buffer, end)):
+                start = byte_mark + _byte_length(buffer[char_mark:position])
+                char_mark, byte_mark = end, start + _byte_length(buffer[position:end])
+                position = end
+                yield item, start, byte_mark
+                continue
+        if exhausted:
+            raise ValueError("Unexpected end of file inside the JSON array")
+        chunk = stream.read(chunk_size)
+        exhausted = not chunk
+        byte_mark += _byte_length(buffer[char_mark:position])
+        buffer, position, char_mark = buffer[position:] + text_decoder.decode(chunk, final=exhausted), 0, 0
+
+
+def _to_int(value):
+    """One value of to_int_column, without building a Series for the common cases."""
+    if type(value) is int:
+        return value
+    if value is None:
+        return 0
+    return int(to_int_column([value])[0])
+
+
+class _SourceFile:
+    """One memory-mapped harvest file: the byte spans of its papers and the extractors for its schema."""
+
+    def __init__(self, path):
+        self.path = path
+        self.starts, self.ends = array('q'), array('q')
+        self.papers = None  # set instead of spans when the file is not a plain array
+        sample = []
+        with open(path, 'rb') as f:
+            try:
+                for item, start, end in iter_array_spans(f):
+                    self.starts.append(start)
+                    self.ends.append(end)
+                    if len(sample) < SCHEMA_SAMPLE:
+                        sample.append(item)
+            except ValueError:
+                # A single SerpApi response ({"organic_results": [...]}) is small; keep it in memory
+                f.seek(0)
+                self.papers = sample = load_papers(f.read())
+        self.schema = detect_schema(sample)
+        self.extract = compile_extractor(self.schema)
+        self.numeric = compile_plan(self.schema, NUMERIC_FIELDS)
+        self._file = self._map = None
+        if self.papers is None and len(self.starts):
+            self._file = open(path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self.papers) if self.papers is not None else len(self.starts)
+
+    def paper(self, index):
+        if self.papers is not None:
+            return self.papers[index]
+        return json.loads(self._map[self.starts[index]:self.ends[index]])
+
+    def record(self, index):
+        paper = self.paper(index)
+        record = make_record(paper, *self.extract(paper))
+        for field, get in zip(NUMERIC_FIELDS, self.numeric):
+            record[field] = _to_int(get(paper))
+        return record
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = self._file = None
+
+
+class CorpusFile:
+    """
+    A read-only, index-addressable corpus of one or more harvest files (merged in
+    order, like load_many) whose records are parsed on demand. Usable wherever
+    a RecordStore is read by index, e.g. build_export_rows and write_exports.
+    """
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self._sources = [_SourceFile(path) for path in self.paths]
+        self._offsets = [0]
+        for source in self._sources:
+            self._offsets.append(self._offsets[-1] + len(source))
+        schemas = {source.schema for source in self._sources}
+        self.schema = schemas.pop() if len(schemas) == 1 else SCHEMA_MIXED
+        self._columns = None
+
+    def _locate(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        source = bisect_right(self._offsets, index) - 1
+        return self._sources[source], index - self._offsets[source]
+
+    def __getitem__(self, index):
+        source, local = self._locate(index)
+        return source.record(local)
+
+    def __len__(self):
+        return self._offsets[-1]
+
+    def __iter__(self):
+        for source in self._sources:
+            for local in range(len(source)):
+                yield source.record(local)
+
+    def column(self, field):
+        """The int64 array for a numeric field; the first call reads every paper once."""
+        if self._columns is None:
+            import numpy as np
+            values = {field: [] for field in NUMERIC_FIELDS}
+            for source in self._sources:
+                for local in range(len(source)):
+                    paper = source.paper(local)
+                    for name, get in zip(NUMERIC_FIELDS, source.numeric):
+                        values[name].append(get(paper))
+            self._columns = {name: to_int_column(column) if column else np.zeros(0, dtype=np.int64)
+                             for name, column in values.items()}
+        return self._columns[field]
+
+    def queue(self, order='file', min_cited_by=0):
+        """The record indices to screen, as RecordStore.queue; file order without a filter reads nothing."""
+        if order not in NUMERIC_FIELDS and not min_cited_by:
+            return list(range(len(self)))
+        columns = {field: self.column(field) for field in NUMERIC_FIELDS}
+        return queue_order(columns, len(self), order, min_cited_by)
+
+    def close(self):
+        for source in self._sources:
+            source.close()
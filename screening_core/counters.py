@@ -0,0 +1,16 @@
+"""
+Progress counters derived from a DecisionStore.
+"""
+from collections import namedtuple
+
+from screening_core.decisions import KEEP, DISCARD, MAYBE
+
+Tally = namedtuple('Tally', ['total', 'reviewed', 'kept', 'discarded', 'progress', 'maybe'])
+
+
+def tally(decisions, total):
+    """Counts kept/discarded/maybe papers and the percentage reviewed."""
+    counts = decisions.counts()
+    reviewed = sum(counts.values())
+    progress = (reviewed / total) * 100 if total > 0 else 0
+    return Tally(total, reviewed, counts[KEEP], counts[DISCARD], progress, counts[MAYBE])
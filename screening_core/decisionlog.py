@@ -0,0 +1,61 @@
+"""
+Append-only, fsynced log of screening decisions, one JSON object per line.
+
+Every keypress is on disk before the next card is shown, so a crash or a closed
+terminal loses nothing. Replaying the log rebuilds the DecisionStore; entries
+are checked against the paper ID at their index so a log is never applied to
+a different corpus by mistake.
+"""
+import json
+import os
+import time
+
+from screening_core.decisions import DecisionStore
+
+
+class DecisionLog:
+    """Appends {"index", "paper_id", "decision", "at"} lines; decision null clears a paper."""
+
+    def __init__(self, path, fsync=True):
+        self.path = path
+        self.fsync = fsync
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def append(self, index, paper_id, decision):
+        self.append_many([(index, paper_id, decision)])
+
+    def append_many(self, entries):
+        """Writes several (index, paper_id, decision) entries with a single fsync."""
+        now = round(time.time(), 3)
+        self._file.write(''.join(json.dumps({'index': index, 'paper_id': paper_id, 'decision': decision, 'at': now}) + '\n'
+                                 for index, paper_id, decision in entries))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def replay(path, records):
+    """
+    Returns (DecisionStore, stale entries) from the log at `path` (empty if it does
+    not exist). Only the last entry per index counts; it is applied if the record at
+    that index still has the logged paper ID, and counted as stale otherwise.
+    """
+    latest = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash mid-write
+                latest[entry['index']] = (entry['paper_id'], entry['decision'])
+    decisions, stale = DecisionStore(), 0
+    for index, (paper_id, decision) in sorted(latest.items()):
+        if index >= len(records) or records[index]['paper_id'] != paper_id:
+            stale += 1
+        elif decision:
+            decisions.set(index, decision)
+    return decisions, stale
@@ -0,0 +1,124 @@
+"""
+Screening decisions keyed by record index.
+
+Decisions are packed two bits per paper (0 unscreened, 1 keep, 2 discard, 3 maybe),
+four papers to a byte, so a 100k-paper screening state is 25 KB. The browser
+copy in the Dash `decision-store` is that byte array, base64-encoded.
+"""
+import base64
+import re
+
+KEEP = 'keep'
+DISCARD = 'discard'
+MAYBE = 'maybe'
+DECISIONS = (KEEP, DISCARD, MAYBE)
+
+# 2-bit code for each decision; code 0 means unscreened
+CODES = {KEEP: 1, DISCARD: 2, MAYBE: 3}
+NAMES = (None, KEEP, DISCARD, MAYBE)
+
+NONZERO_BYTE = re.compile(b'[^\x00]')
+
+
+# int.bit_count is Python 3.10+
+_popcount = getattr(int, 'bit_count', None) or (lambda value: bin(value).count('1'))
+
+
+class DecisionStore:
+    """Maps record index -> 'keep' | 'discard' | 'maybe', packed two bits per paper."""
+
+    def __init__(self, decisions=None):
+        self._bits = bytearray()
+        for idx, decision in (decisions or {}).items():
+            self.set(int(idx), decision)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds a store from the JSON dict form ({'<str index>': decision})."""
+        return cls(data)
+
+    @classmethod
+    def from_bytes(cls, packed):
+        store = cls()
+        store._bits = bytearray(packed)
+        return store
+
+    @classmethod
+    def decode(cls, data):
+        """Builds a store from the browser copy: a base64 string, or a dict from older sessions; None is empty."""
+        if isinstance(data, dict):
+            return cls.from_dict(data)
+        return cls.from_bytes(base64.b64decode(data or ''))
+
+    def to_dict(self):
+        return {str(idx): decision for idx, decision in self.items()}
+
+    def to_bytes(self):
+        """The packed decisions, without trailing unscreened papers."""
+        return bytes(self._bits.rstrip(b'\0'))
+
+    def encode(self):
+        """The base64 string kept in the browser."""
+        return base64.b64encode(self.to_bytes()).decode('ascii')
+
+    def get(self, index, default=None):
+        byte, shift = index >> 2, (index & 3) * 2
+        if byte >= len(self._bits):
+            return default
+        return NAMES[(self._bits[byte] >> shift) & 3] or default
+
+    def _set_code(self, index, code):
+        byte, shift = index >> 2, (index & 3) * 2
+        if byte >= len(self._bits):
+            if not code:
+                return
+            self._bits.extend(bytes(byte + 1 - len(self._bits)))
+        self._bits[byte] = (self._bits[byte] & ~(3 << shift)) | (code << shift)
+
+    def set(self, index, decision):
+        if decision not in CODES:
+            raise ValueError(f"Unknown decision '{decision}'")
+        self._set_code(index, CODES[decision])
+
+    def clear(self, index):
+        self._set_code(index, 0)
+
+    def counts(self):
+        """{decision: number of papers}, from popcounts over the packed bits."""
+        packed = int.from_bytes(self._bits, 'little')
+        low_bits = int.from_bytes(b'\x55' * len(self._bits), 'little')
+        low, high = packed & low_bits, (packed >> 1) & low_bits
+        return {KEEP: _popcount(low & ~high), DISCARD: _popcount(high & ~low), MAYBE: _popcount(low & high)}
+
+    def diff(self, other):
+        """{index: decision or None} for every paper whose decision in `other` differs from this store's."""
+        size = max(len(self._bits), len(other._bits))
+        mine, theirs = int.from_bytes(self._bits, 'little'), int.from_bytes(other._bits, 'little')
+        changed = (mine ^ theirs).to_bytes(size, 'little')
+        changes = {}
+        for match in NONZERO_BYTE.finditer(changed):
+            byte = match.start()
+            for slot in range(4):
+                if (changed[byte] >> (slot * 2)) & 3:
+                    changes[byte * 4 + slot] = other.get(byte * 4 + slot)
+        return changes
+
+    def items(self):
+        """Yields (index, decision) pairs in index order."""
+        for match in NONZERO_BYTE.finditer(self._bits):
+            byte, value = match.start(), self._bits[match.start()]
+            for slot in range(4):
+                code = (value >> (slot * 2)) & 3
+                if code:
+                    yield byte * 4 + slot, NAMES[code]
+
+    def values(self):
+        return (decision for _, decision in self.items())
+
+    def __contains__(self, index):
+        return self.get(index) is not None
+
+    def __len__(self):
+        packed = int.from_bytes(self._bits, 'little')
+        low_bits = int.from_bytes(b'\x55' * len(self._bits), 'little')
+        return _popcount((packed | (packed >> 1)) & low_bits)
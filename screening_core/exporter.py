@@ -0,0 +1,62 @@
+"""
+Export of screening decisions: a flat CSV of every decision plus a JSON file of
+the kept papers in their original structure.
+"""
+import json
+import os
+from datetime import datetime
+
+from screening_core.decisions import KEEP
+
+CSV_COLUMNS = ['index', 'decision', 'title', 'authors', 'year', 'source', 'cited_by', 'versions', 'link', 'snippet']
+
+
+def build_export_rows(records, decisions):
+    """Returns (flat CSV rows, kept papers in original structure) for every decided record."""
+    flat_export_data = []
+    kept_papers_original = []
+    for idx, decision in decisions.items():
+        if idx >= len(records):
+            continue
+        record = records[idx]
+        flat_export_data.append({
+            'index': idx,
+            'decision': decision,
+            'title': record['title'],
+            'authors': record['authors'],
+            'year': record['year'],
+            'source': record['source'],
+            'cited_by': record.get('cited_by', 0),
+            'versions': record.get('versions', 0),
+            'link': record['link'],
+            'snippet': record['abstract'],
+        })
+        if decision == KEEP:
+            paper_copy = dict(record['original_data'])
+            paper_copy['decision'] = decision
+            kept_papers_original.append(paper_copy)
+    return flat_export_data, kept_papers_original
+
+
+def export_bytes(records, decisions):
+    """Returns the CSV and kept-papers JSON as bytes, for download buttons."""
+    import pandas as pd  # only needed at export time
+    flat_export_data, kept_papers_original = build_export_rows(records, decisions)
+    df = pd.DataFrame(flat_export_data, columns=CSV_COLUMNS)
+    csv_bytes = df.to_csv(index=False).encode('utf-8')
+    json_bytes = json.dumps(kept_papers_original, indent=4).encode('utf-8')
+    return csv_bytes, json_bytes
+
+
+def write_exports(records, decisions, directory='.', timestamp=None):
+    """Writes screening_decisions_<ts>.csv and kept_papers_<ts>.json and returns their names."""
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+    csv_bytes, json_bytes = export_bytes(records, decisions)
+
+    csv_filename = f"screening_decisions_{timestamp}.csv"
+    json_filename = f"kept_papers_{timestamp}.json"
+    with open(os.path.join(directory, csv_filename), 'wb') as f:
+        f.write(csv_bytes)
+    with open(os.path.join(directory, json_filename), 'wb') as f:
+        f.write(json_bytes)
+    return csv_filename, json_filename
@@ -0,0 +1,192 @@
+"""
+Import of decisions from earlier sessions' exports (screening_decisions_<ts>.csv
+and kept_papers_<ts>.json) into the current corpus.
+
+Files are streamed row by row and matched through hash indexes over the corpus:
+first by stable paper ID (if the file has one), then by the title/link
+fingerprint, then by normalized title or link alone when that is unambiguous.
+Nothing depends on the legacy `index` column, which refers to whatever order
+the old session happened to use.
+"""
+import csv
+import io
+import json
+import re
+from collections import defaultdict
+
+from screening_core.decisions import DECISIONS, KEEP, DecisionStore
+from screening_core.records import fingerprint, normalize_link, normalize_text
+
+TIMESTAMP_PATTERN = re.compile(r'(\d{8}_\d{6})')
+MAX_REPORTED = 50
+# What follows a complete array element; a number cut by a chunk boundary is followed by more digits instead
+ELEMENT_END = re.compile(r'[ \t\r\n]*[,\]]')
+
+
+class ImportReport:
+    """What happened to each imported row: matched (and how), applied, conflicting, unmatched or skipped."""
+
+    def __init__(self):
+        self.files = []
+        self.rows = 0
+        self.matched = defaultdict(int)  # match method -> rows
+        self.applied = 0
+        self.unchanged = 0
+        self.skipped = 0
+        self.unmatched = 0
+        self.conflicts = []         # (record index, title, kept decision, other decision, file)
+        self.unmatched_titles = []  # (file, title) for the first MAX_REPORTED unmatched rows
+
+    @property
+    def matched_rows(self):
+        return sum(self.matched.values())
+
+    def summary(self):
+        """One-line, user-facing summary."""
+        methods = ', '.join(f"{count} by {method}" for method, count in self.matched.items())
+        return (f"Read {self.rows:,} rows from {len(self.files)} file(s): matched {self.matched_rows:,}"
+                f"{f' ({methods})' if methods else ''}, applied {self.applied:,} decisions, "
+                f"{len(self.conflicts):,} conflicts, {self.unmatched:,} unmatched, {self.skipped:,} skipped.")
+
+
+class CorpusIndex:
+    """
+    Hash indexes from paper ID (= title/link fingerprint), normalized title and
+    normalized link to record indices. The title and link indexes are only built
+    once a row misses on its fingerprint.
+    """
+
+    def __init__(self, records):
+        self.records = records
+        self.by_id = defaultdict(list)
+        for idx, record in enumerate(records):
+            self.by_id[record['paper_id']].append(idx)
+        self._by_title = self._by_link = None
+
+    def _build_fallbacks(self):
+        self._by_title, self._by_link = defaultdict(list), defaultdict(list)
+        for idx, record in enumerate(self.records):
+            self._by_title[normalize_text(record['title'])].append(idx)
+            link = normalize_link(record['link'])
+            if link:
+                self._by_link[link].append(idx)
+
+    def match(self, paper_id, title, link):
+        """Returns (record indices, match method), or ([], None) when nothing matches unambiguously."""
+        if paper_id and paper_id in self.by_id:
+            return self.by_id[paper_id], 'paper ID'
+        matches = self.by_id.get(fingerprint(title, link))
+        if matches:
+            return matches, 'fingerprint'
+        if self._by_title is None:
+            self._build_fallbacks()
+        matches = self._by_title.get(normalize_text(title)) if title else None
+        if matches and len(matches) == 1:
+            return matches, 'title'
+        link = normalize_link(link)
+        matches = self._by_link.get(link) if link else None
+        if matches and len(matches) == 1:
+            return matches, 'link'
+        return [], None
+
+
+def iter_json_array(stream, chunk_size=1 << 16):
+    """Yields the elements of a top-level JSON array from a text stream without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buffer, position = '', 0
+    opened = exhausted = False
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position < len(buffer):
+            if not opened:
+                if buffer[position] != '[':
+                    raise ValueError("Expected a JSON array")
+                opened, position = True, position + 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+                end = None
+            if end is not None and (exhausted or ELEMENT_END.match(buffer, end)):
+                yield item
+                position = end
+                continue
+        if exhausted:
+            raise ValueError("Unexpected end of file inside the JSON array")
+        chunk = stream.read(chunk_size)
+        exhausted = not chunk
+        buffer, position = buffer[position:] + chunk, 0
+
+
+def iter_legacy_rows(name, stream):
+    """Yields (paper_id, title, link, decision) from one export file (CSV or kept-papers JSON), streaming."""
+    if name.lower().endswith('.csv'):
+        for row in csv.DictReader(stream):
+            yield row.get('paper_id'), row.get('title') or '', row.get('link') or '', (row.get('decision') or '').strip().lower()
+    else:
+        for paper in iter_json_array(stream):
+            # Kept-papers files hold the original structure (title and link are top level in every known
+            # shape); older ones have no decision field because every paper in them was kept
+            if isinstance(paper, dict):
+                yield paper.get('paper_id'), paper.get('title') or '', paper.get('link') or '', str(paper.get('decision', KEEP)).lower()
+
+
+def _file_order(item):
+    """Oldest export first, so a later session's decision is the one that is kept."""
+    match = TIMESTAMP_PATTERN.search(item[0])
+    return (match.group(1) if match else '', item[0])
+
+
+def import_decisions(records, files, decisions=None, overwrite=False):
+    """
+    Matches the rows of `files` ([(filename, binary or text stream)]) to `records`
+    and applies their decisions. Files are applied oldest first (by the timestamp
+    in the filename), so later sessions win between files. Decisions already in
+    `decisions` are kept unless `overwrite` is set; either way a disagreement is
+    reported as a conflict. Returns (DecisionStore, ImportReport).
+    """
+    decisions = DecisionStore.from_bytes((decisions or DecisionStore()).to_bytes())
+    imported = {}  # record index -> file that set it during this import
+    index = CorpusIndex(records)
+    report = ImportReport()
+
+    for name, stream in sorted(files, key=_file_order):
+        report.files.append(name)
+        if isinstance(stream, (bytes, bytearray)):
+            stream = io.BytesIO(stream)
+        text = stream if isinstance(stream, io.TextIOBase) else io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        for paper_id, title, link, decision in iter_legacy_rows(name, text):
+            report.rows += 1
+            if decision not in DECISIONS:
+                report.skipped += 1
+                continue
+            matches, method = index.match(paper_id, title, link)
+            if not matches:
+                report.unmatched += 1
+                if len(report.unmatched_titles) < MAX_REPORTED:
+                    report.unmatched_titles.append((name, title))
+                continue
+            report.matched[method] += 1
+            for idx in matches:
+                current = decisions.get(idx)
+                if current == decision:
+                    report.unchanged += 1
+                    continue
+                if current is not None:
+                    # Between import files the later one wins; against the session, only with overwrite
+                    replace = idx in imported or overwrite
+                    kept, other = (decision, current) if replace else (current, decision)
+                    report.conflicts.append((idx, records[idx]['title'], kept, other, name))
+                    if not replace:
+                        continue
+                decisions.set(idx, decision)
+                imported[idx] = name
+                report.applied += 1
+        if text is not stream:
+            text.detach()  # leave the caller's stream open
+    return decisions, report
@@ -0,0 +1,90 @@
+"""
+Rolling timing and payload-size metrics for the screeners' hot paths.
+"""
+import functools
+import math
+import threading
+import time
+from collections import defaultdict, deque
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of an unsorted sequence; 0.0 when empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class MetricsRegistry:
+    """Keeps the last `window` samples per metric name; safe to share between server threads."""
+
+    def __init__(self, window=500):
+        self.window = window
+        self._timings = defaultdict(lambda: deque(maxlen=self.window))
+        self._payloads = defaultdict(lambda: deque(maxlen=self.window))
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            self._timings[name].append(seconds)
+            self._counts[name] += 1
+
+    def record_payload(self, name, request_bytes, response_bytes):
+        with self._lock:
+            self._payloads[name].append((request_bytes, response_bytes))
+
+    def timed(self, name=None):
+        """Decorator recording the wall-clock time of every call under `name` (default: function name)."""
+        def decorator(func):
+            metric = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(metric, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def summary(self):
+        """Returns {name: {...}} with call count, p50/p95/max latency (ms) and p50/p95 payload sizes (bytes)."""
+        with self._lock:
+            timings = {name: list(samples) for name, samples in self._timings.items()}
+            payloads = {name: list(samples) for name, samples in self._payloads.items()}
+            counts = dict(self._counts)
+        summary = {}
+        for name in sorted(set(timings) | set(payloads)):
+            samples = timings.get(name, [])
+            entry = {
+                'calls': counts.get(name, 0),
+                'p50_ms': round(percentile(samples, 50) * 1000, 2),
+                'p95_ms': round(percentile(samples, 95) * 1000, 2),
+                'max_ms': round(max(samples, default=0.0) * 1000, 2),
+            }
+            if name in payloads:
+                requests = [request for request, _ in payloads[name]]
+                responses = [response for _, response in payloads[name]]
+                entry.update({
+                    'request_p50_bytes': percentile(requests, 50),
+                    'request_p95_bytes': percentile(requests, 95),
+                    'response_p50_bytes': percentile(responses, 50),
+                    'response_p95_bytes': percentile(responses, 95),
+                })
+            summary[name] = entry
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._timings.clear()
+            self._payloads.clear()
+            self._counts.clear()
+
+
+# Process-wide registry used by both front ends
+REGISTRY = MetricsRegistry()
+timed = REGISTRY.timed
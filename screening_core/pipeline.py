@@ -0,0 +1,98 @@
+"""
+Chunked, multi-core normalization for large (and merged) harvests.
+
+The parent process does the cheap part: it pulls the raw field values out of each
+paper with the schema's precompiled extractor. The CPU-heavy part runs in a process
+pool: author parsing, the year regex, source resolution and fingerprinting. Workers
+receive plain tuples rather than whole SerpApi dicts and send back tuples. Results
+are reassembled in input order, so the output is the same as a serial run.
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from screening_core.columns import NUMERIC_FIELDS, extract_numeric_columns
+from screening_core.records import RECORD_FIELDS, RecordStore, compile_extractor, derive_fields
+from screening_core.schema import SCHEMA_MIXED
+
+# Below this many records a process pool costs more to start than it saves
+PARALLEL_THRESHOLD = 20_000
+MIN_CHUNK_SIZE = 2_000
+
+
+def _derive_chunk(rows):
+    return [derive_fields(*row) for row in rows]
+
+
+@contextmanager
+def _main_hidden_from_spawn():
+    """
+    Where workers are spawned (Windows, macOS), each one first re-runs the parent's
+    __main__ script, which for the screeners builds the whole app. Workers only need
+    this module, so the script's path and module spec are hidden while they start.
+    """
+    main = sys.modules['__main__']
+    saved = {key: main.__dict__[key] for key in ('__file__', '__spec__') if key in main.__dict__}
+    main.__dict__.pop('__file__', None)
+    main.__spec__ = None
+    try:
+        yield
+    finally:
+        main.__dict__.update(saved)
+
+
+def derive_records(rows, workers=None, progress=None):
+    """
+    Turns raw field tuples into normalized record dicts, in order.
+    `workers` defaults to the CPU count; `progress(done, total)` is called after each chunk.
+    """
+    total = len(rows)
+    workers = workers or os.cpu_count() or 1
+    parallel = workers > 1 and total >= PARALLEL_THRESHOLD
+    # A few chunks per worker keeps the pool busy without drowning it in tiny tasks
+    chunk_size = max(MIN_CHUNK_SIZE, -(-total // (workers * 4))) if parallel else MIN_CHUNK_SIZE * 5
+    chunks = [rows[start:start + chunk_size] for start in range(0, total, chunk_size)]
+
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(chunks))) if parallel else None
+    try:
+        if executor:
+            # map submits every chunk up front, so all the workers start inside this block
+            with _main_hidden_from_spawn():
+                results = executor.map(_derive_chunk, chunks)
+        else:
+            results = map(_derive_chunk, chunks)
+        records = []
+        for derived in results:
+            records.extend(dict(zip(RECORD_FIELDS, values)) for values in derived)
+            if progress:
+                progress(len(records), total)
+    finally:
+        if executor:
+            executor.shutdown()
+    return records
+
+
+def build_store(sources, workers=None, progress=None):
+    """
+    Normalizes one or more (papers, schema) sources into a single RecordStore, in
+    order. Each source keeps its own schema, so harvests of different shapes can be merged.
+    """
+    import numpy as np
+
+    rows, originals, column_parts = [], [], []
+    for papers, schema in sources:
+        extract = compile_extractor(schema)
+        rows.extend(map(extract, papers))
+        originals.extend(papers)
+        column_parts.append(extract_numeric_columns(papers, schema))
+
+    records = derive_records(rows, workers, progress)
+    for record, paper in zip(records, originals):
+        record['original_data'] = paper
+
+    schemas = {schema for _, schema in sources}
+    store = RecordStore(records, schema=schemas.pop() if len(schemas) == 1 else SCHEMA_MIXED)
+    store.attach_columns({field: np.concatenate([part[field] for part in column_parts]) if column_parts
+                          else np.zeros(0, dtype=np.int64) for field in NUMERIC_FIELDS})
+    return store
@@ -0,0 +1,206 @@
+"""
+Normalized paper records: one clean dictionary per paper, whatever the input shape.
+"""
+import hashlib
+import re
+from functools import lru_cache
+
+from screening_core.columns import NUMERIC_FIELDS, queue_order
+from screening_core.schema import compile_plan
+
+# A map for custom, clean names of common publishers.
+SOURCE_MAP = {
+    'taylorfrancis': 'Taylor & Francis',
+    'springer': 'Springer',
+    'wiley': 'Wiley',
+    'sagepub': 'SAGE Publications',
+    'cambridge': 'Cambridge University Press',
+    'mdpi': 'MDPI',
+    'ncbi': 'PubMed Central',
+    'jstor': 'JSTOR',
+    'proquest': 'ProQuest',
+    'csiro': 'CSIRO Publishing',
+    'lww': 'Lippincott Williams & Wilkins',
+    'healio': 'Healio',
+    'degruyterbrill': 'De Gruyter Brill',
+    'sciencedirect': 'ScienceDirect',
+    'elsevier': 'Elsevier',
+    'informit': 'Informit',
+    'jamanetwork': 'JAMA Network',
+    'healthaffairs': 'Health Affairs',
+    'academicradiology': 'Academic Radiology',
+    'researchgate': 'ResearchGate'
+}
+
+YEAR_PATTERN = re.compile(r'\b(19|20)\d{2}\b')
+NON_ALNUM_PATTERN = re.compile(r'[^0-9a-z]+')
+
+# Raw values pulled out of each paper, and the fields of the normalized record built from them
+RAW_FIELDS = ('title', 'authors', 'summary', 'year', 'abstract', 'link')
+RECORD_FIELDS = ('paper_id', 'title', 'authors', 'year', 'abstract', 'link', 'source')
+
+NO_TITLE = 'No title'
+NO_AUTHORS = 'No authors listed'
+NO_ABSTRACT = 'No snippet available'
+
+
+@lru_cache(maxsize=None)
+def _domain_extractor():
+    # Imported on first use, and using the bundled suffix-list snapshot so the
+    # first lookup never waits on a network fetch.
+    import tldextract
+    return tldextract.TLDExtract(suffix_list_urls=())
+
+
+# Everything before the path, query or fragment: all tldextract looks at
+LINK_HOST_PATTERN = re.compile(r'[^/?#]*(?://)?[^/?#]*')
+
+
+def extract_source(link):
+    if not isinstance(link, str) or link in ('', 'N/A', '#'):
+        return 'Source unknown'
+    # A harvest has far fewer hosts than links, so the lookup is cached per host
+    return _host_source(LINK_HOST_PATTERN.match(link).group(0))
+
+
+@lru_cache(maxsize=4096)
+def _host_source(link):
+    try:
+        extracted = _domain_extractor()(link)
+        domain = extracted.domain
+        if domain in SOURCE_MAP:
+            return SOURCE_MAP[domain]
+        return domain.title()
+    except Exception:
+        try:
+            domain_part = link.split('/')[2]
+            return domain_part.replace('www.', '').title()
+        except IndexError:
+            return 'Invalid link'
+
+
+def parse_authors(authors_list, summary):
+    """Joins author names, falling back to the part of the summary before the first ' - '."""
+    if authors_list and isinstance(authors_list, list):
+        names = [a.get('name') if isinstance(a, dict) else a for a in authors_list]
+        names = [name for name in names if name]
+        if names:
+            return ', '.join(names)
+    if summary:
+        return summary.split(' - ')[0].replace('…', '').strip()
+    return NO_AUTHORS
+
+
+def parse_year(summary):
+    year_match = YEAR_PATTERN.search(summary or '')
+    return year_match.group(0) if year_match else 'N/A'
+
+
+def normalize_text(text):
+    """Lowercased alphanumeric words, single-spaced: the form titles are compared in."""
+    return ' '.join(NON_ALNUM_PATTERN.sub(' ', (text or '').lower()).split())
+
+
+def normalize_link(link):
+    """A link lowercased, without scheme, 'www.' or trailing slash; '' for the N/A and # placeholders."""
+    if not isinstance(link, str) or link in ('N/A', '#'):
+        return ''
+    link = link.strip().lower().split('://', 1)[-1]
+    return link[4:].rstrip('/') if link.startswith('www.') else link.rstrip('/')
+
+
+def fingerprint(title, link):
+    """
+    Stable paper ID from the normalized title and link. The same harvested result
+    gets the same ID whether it arrives nested, flattened or simplified.
+    """
+    key = f"{normalize_text(title)}|{normalize_link(link)}"
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def corpus_key(records):
+    """Identifies a corpus by its paper IDs, so the same upload always maps to the same key."""
+    return hashlib.blake2b('\x1f'.join(record.get('paper_id', '') for record in records).encode(), digest_size=16).hexdigest()
+
+
+def derive_fields(title, authors_list, summary, year, abstract, link):
+    """
+    Returns the values for RECORD_FIELDS from raw field values. Pure CPU work with
+    picklable inputs and outputs, so it can run in worker processes.
+    """
+    return (
+        fingerprint(title, link),
+        title or NO_TITLE,
+        parse_authors(authors_list, summary),
+        str(year) if year else parse_year(summary),
+        abstract or NO_ABSTRACT,
+        link or 'N/A',
+        extract_source(link),
+    )
+
+
+def make_record(paper, title, authors_list, summary, year, abstract, link):
+    """Builds the normalized record from already-extracted raw field values."""
+    record = dict(zip(RECORD_FIELDS, derive_fields(title, authors_list, summary, year, abstract, link)))
+    record['original_data'] = paper
+    return record
+
+
+def normalize_paper(paper: dict) -> dict:
+    """
+    Returns a standardized, clean dictionary for a single paper in any of the
+    known input shapes, checking every known location for each field. Loads do
+    not use it: they resolve each file's accessors once with compile_extractor.
+    """
+    pub_info = paper.get('publication_info')
+    if not isinstance(pub_info, dict):
+        pub_info = {}
+    summary = pub_info.get('summary') or paper.get('publication_info.summary') or ''
+    authors_list = pub_info.get('authors') or paper.get('publication_info.authors') or paper.get('authors')
+    return make_record(paper, paper.get('title'), authors_list, summary, paper.get('year'),
+                       paper.get('snippet') or paper.get('abstract'), paper.get('link'))
+
+
+def compile_extractor(schema):
+    """Returns extract(paper) -> tuple of RAW_FIELDS values, with the accessors for `schema` resolved up front."""
+    getters = compile_plan(schema, RAW_FIELDS)
+    return lambda paper: tuple([get(paper) for get in getters])
+
+
+class RecordStore:
+    """An ordered, index-addressable collection of normalized paper records."""
+
+    def __init__(self, records=None, schema=None):
+        self.records = list(records or [])
+        self.schema = schema
+        self.report = None
+        self._columns = {}
+
+    def attach_columns(self, columns):
+        """Sets the numeric columns and copies their values onto each record."""
+        self._columns = dict(columns)
+        for field, column in self._columns.items():
+            for record, value in zip(self.records, column.tolist()):
+                record[field] = value
+
+    def column(self, field):
+        """Returns the int64 array for a numeric field, rebuilding it from the records if needed."""
+        if field not in self._columns:
+            import numpy as np
+            self._columns[field] = np.fromiter((r.get(field, 0) for r in self.records),
+                                               dtype=np.int64, count=len(self.records))
+        return self._columns[field]
+
+    def queue(self, order='file', min_cited_by=0):
+        """Returns the record indices to screen, in screening order."""
+        columns = {field: self.column(field) for field in NUMERIC_FIELDS}
+        return queue_order(columns, len(self.records), order, min_cited_by)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def __iter__(self):
+        return iter(self.records)
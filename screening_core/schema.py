@@ -0,0 +1,132 @@
+"""
+Input-shape detection and precompiled field-accessor plans for the SerpApi variants.
+
+The same Google Scholar result reaches us in three shapes:
+  nested     - SerpApi as returned: {'publication_info': {'summary': ..., 'authors': [...]}}
+  flattened  - R jsonlite/bind_rows output: {'publication_info.summary': ..., 'inline_links.cited_by.total': 48}
+  simplified - scholar_results.json: {'authors': [...], 'year': ..., 'abstract': ...}
+"""
+from operator import methodcaller
+
+SCHEMA_NESTED = 'nested'
+SCHEMA_FLATTENED = 'flattened'
+SCHEMA_SIMPLIFIED = 'simplified'
+SCHEMA_UNKNOWN = 'unknown'
+SCHEMA_MIXED = 'mixed'  # several files of different shapes merged into one corpus
+
+SCHEMA_LABELS = {
+    SCHEMA_NESTED: 'nested SerpApi results',
+    SCHEMA_FLATTENED: 'flattened SerpApi export (R jsonlite)',
+    SCHEMA_SIMPLIFIED: 'simplified results',
+    SCHEMA_UNKNOWN: 'unrecognised format',
+    SCHEMA_MIXED: 'a mix of formats',
+}
+
+# Where each logical field lives in each shape. A tuple is a path through nested dicts.
+FIELD_PATHS = {
+    SCHEMA_NESTED: {
+        'title': 'title',
+        'authors': ('publication_info', 'authors'),
+        'summary': ('publication_info', 'summary'),
+        'year': None,
+        'abstract': 'snippet',
+        'link': 'link',
+        'cited_by': ('inline_links', 'cited_by', 'total'),
+        'versions': ('inline_links', 'versions', 'total'),
+    },
+    SCHEMA_FLATTENED: {
+        'title': 'title',
+        'authors': 'publication_info.authors',
+        'summary': 'publication_info.summary',
+        'year': None,
+        'abstract': 'snippet',
+        'link': 'link',
+        'cited_by': 'inline_links.cited_by.total',
+        'versions': 'inline_links.versions.total',
+    },
+    SCHEMA_SIMPLIFIED: {
+        'title': 'title',
+        'authors': 'authors',
+        'summary': None,
+        'year': 'year',
+        'abstract': 'abstract',
+        'link': 'link',
+        'cited_by': 'cited_by',
+        'versions': 'versions',
+    },
+}
+
+
+def detect_schema(papers, sample_size=20):
+    """Guesses the input shape by majority vote over the first few records."""
+    votes = {SCHEMA_NESTED: 0, SCHEMA_FLATTENED: 0, SCHEMA_SIMPLIFIED: 0}
+    for paper in papers[:sample_size]:
+        if not isinstance(paper, dict):
+            continue
+        if isinstance(paper.get('publication_info'), dict):
+            votes[SCHEMA_NESTED] += 1
+        elif 'publication_info.summary' in paper or 'publication_info.authors' in paper:
+            votes[SCHEMA_FLATTENED] += 1
+        elif 'abstract' in paper or 'year' in paper or 'authors' in paper:
+            votes[SCHEMA_SIMPLIFIED] += 1
+    schema, count = max(votes.items(), key=lambda item: item[1])
+    return schema if count else SCHEMA_UNKNOWN
+
+
+def _missing(paper):
+    return None
+
+
+def compile_getter(path):
+    """Turns a key or key path into a single callable, resolved once per schema rather than per record."""
+    if path is None:
+        return _missing
+    if isinstance(path, str):
+        return methodcaller('get', path)
+    head, *rest = path
+
+    def getter(paper):
+        value = paper.get(head)
+        for key in rest:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+    return getter
+
+
+def _first_of(getters):
+    def getter(paper):
+        for get in getters:
+            value = get(paper)
+            if value is not None:
+                return value
+        return None
+    return getter
+
+
+def compile_plan(schema, fields):
+    """
+    Returns one getter per requested field for the given schema, in the same order.
+    For an unknown schema each getter tries every known location in turn.
+    """
+    if schema not in FIELD_PATHS:
+        return tuple(_first_of([compile_getter(paths.get(field)) for paths in FIELD_PATHS.values()])
+                     for field in fields)
+    paths = FIELD_PATHS[schema]
+    return tuple(compile_getter(paths.get(field)) for field in fields)
+
+
+def flatten(paper, prefix=''):
+    """Flattens nested dicts into dotted keys the way jsonlite does; lists are left as values."""
+    flat = {}
+    stack = [(prefix, paper)]
+    while stack:
+        key_prefix, node = stack.pop()
+        for key, value in node.items():
+            full_key = f"{key_prefix}{key}"
+            if isinstance(value, dict) and value:
+                stack.append((f"{full_key}.", value))
+            else:
+                flat[full_key] = value
+    return flat
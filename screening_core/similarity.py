@@ -0,0 +1,144 @@
+"""
+"More like this": a nearest-neighbour index over title + snippet, used to surface
+papers similar to the one on screen so they can be decided consistently.
+
+Each record becomes a hashed TF-IDF vector (sublinear term frequency, features
+hashed with CRC32 so they are stable across processes) with an L2-normalized
+row. The matrix is kept as NumPy arrays in both row (CSR) and column (CSC)
+layout: a query takes its own row from the CSR arrays and scores it against
+the corpus column by column, so only the postings of the query's own terms
+are touched.
+
+numpy is imported on first use so that it is not paid for before the first page
+is served.
+"""
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from itertools import chain
+
+from screening_core.records import corpus_key
+
+N_FEATURES = 2 ** 18
+TOKEN_PATTERN = re.compile(r'[a-z0-9]{3,}')
+STOP_WORDS = frozenset(
+    'the and for with from that this are was were been has have had not but its their our these those '
+    'into onto among between within than then also such can may using use used based study studies '
+    'results paper article journal abstract snippet available'.split()
+)
+
+
+def tokenize(text):
+    """Lowercased alphanumeric tokens of three or more characters, minus stop words."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class SimilarityIndex:
+    """Row-normalized hashed TF-IDF matrix over a corpus, answering top-k cosine queries."""
+
+    def __init__(self, indptr, indices, data, n_features=N_FEATURES):
+        import numpy as np
+        self.n_features = n_features
+        self.indptr, self.indices, self.data = indptr, indices, data
+        # Column layout: for every feature, the rows containing it and their weights
+        order = np.argsort(indices, kind='stable')
+        rows = np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+        self.col_rows = rows[order]
+        self.col_data = data[order]
+        self.col_ptr = np.zeros(n_features + 1, dtype=np.int64)
+        np.cumsum(np.bincount(indices, minlength=n_features), out=self.col_ptr[1:])
+
+    @classmethod
+    def build(cls, records, n_features=N_FEATURES):
+        """Builds the index from normalized records (title + abstract/snippet)."""
+        import numpy as np
+        token_rows = [tokenize(f"{record.get('title', '')} {record.get('abstract', '')}") for record in records]
+        tokens = list(chain.from_iterable(token_rows))
+        feature_of = {token: zlib.crc32(token.encode()) % n_features for token in set(tokens)}
+        rows = np.repeat(np.arange(len(token_rows), dtype=np.int64), [len(row) for row in token_rows])
+        features = np.fromiter(map(feature_of.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+        # One sort over (row, feature) pairs gives the CSR layout and the term counts together
+        cells, counts = np.unique(rows * n_features + features, return_counts=True)
+        indices = (cells % n_features).astype(np.int32)
+        indptr = np.zeros(len(token_rows) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells // n_features, minlength=len(token_rows)), out=indptr[1:])
+        total = len(indptr) - 1
+        document_frequency = np.bincount(indices, minlength=n_features)
+        idf = np.log((1 + total) / (1 + document_frequency)) + 1
+        data = (1 + np.log(counts)) * idf[indices]
+        rows = np.repeat(np.arange(total), np.diff(indptr))
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=total))
+        data /= np.where(norms > 0, norms, 1)[rows]
+        return cls(indptr, indices, data.astype(np.float32), n_features)
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def scores(self, index):
+        """Cosine similarity of record `index` against every record (float32 array)."""
+        import numpy as np
+        start, end = self.indptr[index], self.indptr[index + 1]
+        scores = np.zeros(len(self), dtype=np.float32)
+        # Rows are unique within a feature's postings, so a scatter-add per query term is exact
+        for feature, weight in zip(self.indices[start:end].tolist(), self.data[start:end].tolist()):
+            low, high = self.col_ptr[feature], self.col_ptr[feature + 1]
+            scores[self.col_rows[low:high]] += weight * self.col_data[low:high]
+        return scores
+
+    def neighbours(self, index, k=5, allowed=None):
+        """
+        Returns up to `k` (record index, score) pairs most similar to record `index`,
+        best first, excluding itself and anything with no terms in common. `allowed`
+        optionally restricts results to a collection of record indices.
+        """
+        import numpy as np
+        scores = self.scores(index)
+        scores[index] = 0
+        if allowed is not None:
+            mask = np.zeros(len(self), dtype=bool)
+            mask[np.asarray(allowed, dtype=np.int64)] = True
+            scores[~mask] = 0
+        k = min(k, len(self) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(i), float(scores[i])) for i in top if scores[i] > 0]
+
+
+class IndexCache:
+    """Builds indexes on a background thread and keeps the few most recently used."""
+
+    def __init__(self, max_corpora=2):
+        self.max_corpora = max_corpora
+        self._indexes = OrderedDict()
+        self._building = set()
+        self._lock = threading.Lock()
+
+    def get(self, records, key=None):
+        """
+        The index for `records` if it is ready; otherwise starts building it and returns None.
+        `key` is the corpus_key of `records`, if the caller already has it.
+        """
+        key = key or corpus_key(records)
+        with self._lock:
+            if key in self._indexes:
+                self._indexes.move_to_end(key)
+                return self._indexes[key]
+            if key in self._building:
+                return None
+            self._building.add(key)
+        threading.Thread(target=self._build, args=(key, records), daemon=True, name='similarity-index').start()
+        return None
+
+    def _build(self, key, records):
+        try:
+            index = SimilarityIndex.build(records)
+            with self._lock:
+                self._indexes[key] = index
+                while len(self._indexes) > self.max_corpora:
+                    self._indexes.popitem(last=False)
+        finally:
+            with self._lock:
+                self._building.discard(key)
@@ -0,0 +1,26 @@
+"""
+Start-up helpers: heavy dependencies (pandas, numpy, tldextract) are imported
+lazily by the modules that need them, then warmed in the background once the
+server is up so the first upload does not pay for them either.
+"""
+import importlib
+import threading
+
+HEAVY_MODULES = ('numpy', 'pandas', 'tldextract')
+
+
+def _preload():
+    for name in HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    from screening_core.records import _domain_extractor
+    _domain_extractor()
+
+
+def preload_in_background():
+    """Imports the heavy modules on a daemon thread; returns the thread."""
+    thread = threading.Thread(target=_preload, name='screener-preload', daemon=True)
+    thread.start()
+    return thread
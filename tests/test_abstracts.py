@@ -0,0 +1,125 @@
+"""Abstract enrichment against the local stand-in metadata server."""
+import os
+import sys
+import time
+
+import pytest
+
+from screening_core.abstracts import AbstractCache, AbstractResolver, cache_key
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from metadata_server import start_server  # noqa: E402
+
+MISSING_EVERY = 7
+
+
+def doi(missing, start=0):
+    """A DOI the stand-in server answers with 404 (missing) or with an abstract."""
+    n = start
+    while (sum(map(ord, f"10.1000/{n}")) % MISSING_EVERY == 0) != missing:
+        n += 1
+    return f"10.1000/{n}"
+
+
+def record(paper_doi):
+    return {'title': paper_doi, 'link': f"https://doi.org/{paper_doi}"}
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def server():
+    server = start_server(latency=0, missing_every=MISSING_EVERY)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_resolver(server, tmp_path):
+    resolvers = []
+
+    def make(**cache_options):
+        resolver = AbstractResolver(server.endpoint, cache=AbstractCache(str(tmp_path / 'abstracts.sqlite3'), **cache_options),
+                                    concurrency=2, timeout=5)
+        resolvers.append(resolver)
+        return resolver
+    yield make
+    for resolver in resolvers:
+        resolver.close()
+
+
+def test_hit(server, make_resolver):
+    paper = record(doi(missing=False))
+    found = make_resolver().resolve_many([paper])
+    assert found[cache_key(paper)] == f"Abstract Full abstract for {doi(missing=False)}. This stand-in text is longer than a search snippet."
+    assert server.request_count == 1
+
+
+def test_404_is_cached_as_a_miss(server, make_resolver):
+    resolver = make_resolver()
+    paper = record(doi(missing=True))
+    assert resolver.resolve_many([paper]) == {cache_key(paper): ''}
+    assert resolver.resolve_many([paper]) == {cache_key(paper): ''}
+    assert resolver.cached(paper) is None
+    assert server.request_count == 1
+
+
+def test_misses_expire(server, make_resolver):
+    resolver = make_resolver(miss_ttl=60)
+    paper = record(doi(missing=True))
+    resolver.resolve_many([paper])
+    resolver.cache.put_many([('doi:kept', 'An abstract')])
+    assert resolver.cache.get(cache_key(paper)) == ''
+    # An hour later the miss is asked for again; a found abstract never expires
+    resolver.cache._conn.execute("UPDATE abstracts SET fetched_at = fetched_at - 3600")
+    assert resolver.cache.get(cache_key(paper)) is None
+    assert resolver.cache.get('doi:kept') == 'An abstract'
+    resolver.resolve_many([paper])
+    assert server.request_count == 2
+
+
+def test_retries_after_a_stale_keep_alive_connection(server, make_resolver):
+    resolver = make_resolver()
+    connects = []
+    connect = resolver.pool._connect
+    resolver.pool._connect = lambda *host: connects.append(host) or connect(*host)
+    # The server now drops idle keep-alive connections after 0.1 s
+    server.RequestHandlerClass.timeout = 0.1
+    first, second = record(doi(missing=False)), record(doi(missing=False, start=100))
+    assert resolver.resolve_many([first])[cache_key(first)]
+    time.sleep(0.3)
+    assert resolver.resolve_many([second])[cache_key(second)]
+    assert len(connects) == 2 and server.request_count == 2
+
+
+def test_failed_requests_are_not_cached(make_resolver, tmp_path):
+    resolver = AbstractResolver('http://127.0.0.1:9/works/{doi}', cache=AbstractCache(str(tmp_path / 'down.sqlite3')), timeout=1)
+    paper = record(doi(missing=False))
+    try:
+        assert resolver.resolve_many([paper]) == {cache_key(paper): ''}
+        assert resolver.cache.get(cache_key(paper)) is None
+    finally:
+        resolver.close()
+
+
+def test_cache_survives_a_new_resolver(server, make_resolver):
+    paper = record(doi(missing=False))
+    abstract = make_resolver().resolve_many([paper])[cache_key(paper)]
+    assert make_resolver().cached(paper) == abstract
+    assert server.request_count == 1
+
+
+def test_prefetch_fills_the_cache(server, make_resolver):
+    resolver = make_resolver()
+    papers = [record(doi(missing=False, start=n * 100)) for n in range(5)] + [record(doi(missing=True))]
+    resolver.prefetch(papers)
+    resolver.prefetch(papers)  # already in flight: no second round of requests
+    wait_for(lambda: len(resolver.cache.get_many(cache_key(paper) for paper in papers)) == len(papers))
+    assert all(resolver.cached(paper) for paper in papers[:5]) and resolver.cached(papers[5]) is None
+    assert server.request_count == len(papers)
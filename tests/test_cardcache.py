@@ -0,0 +1,98 @@
+"""Rendered-card cache: LRU eviction, what the key covers, and warming the next cards in the Dash app."""
+import importlib
+import os
+import sys
+import threading
+
+import pytest
+
+from screening_core import DecisionStore, load_records
+from screening_core.abstracts import AbstractCache, AbstractResolver, cache_key
+from screening_core.cardcache import CARD_FIELDS, CardCache, card_key
+from screening_core.records import corpus_key
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from dash_client import DashCallbackClient, prop  # noqa: E402
+from synthetic import corpus_bytes  # noqa: E402
+
+
+def wait_for_warming():
+    for thread in threading.enumerate():
+        if thread.name == 'card-warm':
+            thread.join()
+
+
+def test_least_recently_used_card_is_evicted():
+    cards, rendered = CardCache(max_cards=2), []
+    render = lambda name: lambda: rendered.append(name) or name.upper()
+    assert cards.get('a', render('a')) == 'A'
+    cards.get('b', render('b'))
+    cards.get('a', render('a'))  # 'b' is now the least recently used
+    cards.get('c', render('c'))
+    assert len(cards) == 2
+    assert cards.get('a', render('a')) == 'A' and cards.get('b', render('b')) == 'B'
+    assert rendered == ['a', 'b', 'c', 'b'] and (cards.hits, cards.misses) == (2, 4)
+
+
+def test_key_covers_everything_a_card_shows():
+    record = {field: f"{field} value" for field in CARD_FIELDS}
+    record.update(paper_id='0123456789abcdef', original_data={'position': 1})
+    base = card_key(record, 'keep', 'light', 3, 10, 'Full abstract', 'corpus-a')
+    for field in CARD_FIELDS:
+        assert card_key({**record, field: 'changed'}, 'keep', 'light', 3, 10, 'Full abstract', 'corpus-a') != base, field
+    for changed in [('discard', 'light', 3, 10, 'Full abstract', 'corpus-a'), ('keep', 'dark', 3, 10, 'Full abstract', 'corpus-a'),
+                    ('keep', 'light', 4, 10, 'Full abstract', 'corpus-a'), ('keep', 'light', 3, 11, 'Full abstract', 'corpus-a'),
+                    ('keep', 'light', 3, 10, None, 'corpus-a'), ('keep', 'light', 3, 10, 'Full abstract', 'corpus-b')]:
+        assert card_key(record, *changed) != base, changed
+    # Fields the card does not show do not split the cache
+    assert card_key({**record, 'original_data': {'position': 2}}, 'keep', 'light', 3, 10, 'Full abstract', 'corpus-a') == base
+
+
+def test_warming_renders_only_missing_cards():
+    cards, rendered = CardCache(), []
+    cards.get('cached', lambda: 'old')
+    cards.warm([(key, lambda key=key: rendered.append(key) or key) for key in ('cached', 'next', 'after next')])
+    wait_for_warming()
+    assert rendered == ['next', 'after next']
+    assert [cards.get(key, lambda: 'rendered again') for key in ('cached', 'next', 'after next')] == ['old', 'next', 'after next']
+    assert (cards.hits, cards.misses) == (3, 1)
+
+
+@pytest.fixture
+def screener(monkeypatch, tmp_path):
+    monkeypatch.delenv('SCREENER_METADATA_ENDPOINT', raising=False)
+    rs = importlib.import_module('research_screener')
+    records = load_records(corpus_bytes(8, seed=5)).records
+    # Every abstract is already cached, so the resolver never goes to its (unreachable) endpoint
+    cache = AbstractCache(str(tmp_path / 'abstracts.sqlite3'))
+    cache.put_many([(cache_key(record), f"Full abstract number {i}") for i, record in enumerate(records)])
+    resolver = AbstractResolver('http://127.0.0.1:9/works/{doi}', cache=cache)
+    monkeypatch.setattr(rs, 'SERVICES', {'abstracts': resolver, 'catalog': None})
+    monkeypatch.setattr(rs, 'CARDS', CardCache())
+    yield rs, records
+    resolver.close()
+
+
+def click_next(rs, client, records, position, corpus):
+    inputs = [prop('current-index', 'children', position), prop('keep-btn', 'n_clicks', None),
+              prop('discard-btn', 'n_clicks', None), prop('prev-btn', 'n_clicks', None),
+              prop('next-btn', 'n_clicks', position + 1), prop('queue-store', 'data', list(range(len(records)))), [], []]
+    state = [prop('stored-data', 'data', records), prop('decision-store', 'data', DecisionStore().encode()),
+             prop('corpus-key', 'data', corpus)]
+    response = client.call('paper-display.children', inputs, state, changed=['next-btn.n_clicks'])
+    wait_for_warming()
+    return response
+
+
+def test_warmed_cards_are_the_ones_next_shows(screener):
+    rs, records = screener
+    client = DashCallbackClient.for_test_client(rs.app.server.test_client())
+    corpus = corpus_key(records)
+    click_next(rs, client, records, 0, corpus)
+    assert (rs.CARDS.hits, rs.CARDS.misses, len(rs.CARDS)) == (0, 1, 4)  # the card shown and the next three
+    response = click_next(rs, client, records, 1, corpus)
+    assert (rs.CARDS.hits, rs.CARDS.misses) == (1, 1)
+    assert 'Full abstract number 2' in str(response['paper-display']['children'])
+    # The same papers uploaded again as another corpus do not reuse its cards
+    click_next(rs, client, records, 1, 'another corpus')
+    assert (rs.CARDS.hits, rs.CARDS.misses) == (1, 2)
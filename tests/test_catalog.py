@@ -0,0 +1,114 @@
+"""Project catalog: trigger-maintained counts, cross-project lookups and PRISMA numbers."""
+import sqlite3
+
+import pytest
+
+from screening_core.catalog import Catalog
+from screening_core.records import normalize_paper
+
+
+def paper(n, query='rural recruitment'):
+    return {'title': f'Scholarships and Rural Recruitment, Part {n}', 'link': f'https://www.example.org/paper/{n}/',
+            'year': '2020', 'source_query': query}
+
+
+def corpus(numbers, query='rural recruitment'):
+    return [normalize_paper(paper(n, query)) for n in numbers]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = Catalog(str(tmp_path / 'catalog.sqlite3'))
+    yield catalog
+    catalog.close()
+
+
+def stored_counts(catalog):
+    """(decision_counts as maintained by the triggers, the same counts from a scan of decisions)."""
+    conn = catalog._conn
+    maintained = {row[:2]: row[2] for row in conn.execute("SELECT corpus_id, decision, papers FROM decision_counts") if row[2]}
+    scanned = {row[:2]: row[2] for row in conn.execute("SELECT corpus_id, decision, COUNT(*) FROM decisions GROUP BY 1, 2")}
+    return maintained, scanned
+
+
+def test_decision_counts_follow_upserts_and_deletes(catalog):
+    records = corpus(range(6))
+    first, second = catalog.record_corpus(records, 'first'), catalog.record_corpus(corpus(range(3, 9)), 'second')
+    catalog.record_decision(first, records[0]['paper_id'], 'keep')
+    catalog.record_decision(first, records[0]['paper_id'], 'keep')      # same decision again: no change
+    catalog.record_decision(first, records[1]['paper_id'], 'discard')
+    catalog.record_decision(first, records[1]['paper_id'], 'maybe')     # changed: moves between tallies
+    catalog.record_decision(first, records[2]['paper_id'], 'discard')
+    catalog.record_decision(first, records[2]['paper_id'], None)        # undone
+    catalog.record_decision(first, records[5]['paper_id'], None)        # never decided: nothing to remove
+    catalog.record_decisions(second, corpus(range(3, 9)), {0: 'keep', 1: 'keep', 2: 'discard'})
+    catalog.record_decisions(second, corpus(range(3, 9)), {0: 'discard', 1: None, 2: 'discard'})
+    maintained, scanned = stored_counts(catalog)
+    assert maintained == scanned == {(first, 'keep'): 1, (first, 'maybe'): 1, (second, 'discard'): 2}
+    with pytest.raises(ValueError):
+        catalog.record_decision(first, records[3]['paper_id'], 'unsure')
+
+
+def test_paper_count_is_maintained(catalog, tmp_path):
+    catalog.record_corpus(corpus(range(5)), 'first')
+    catalog.record_corpus(corpus(range(3, 10)), 'overlapping')
+    catalog.record_corpus(corpus(range(5)), 'the first again')  # same corpus: not recorded twice
+    count = lambda: catalog._conn.execute("SELECT papers FROM paper_count").fetchone()[0]
+    assert count() == catalog._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0] == 10
+    with catalog._conn:
+        catalog._conn.execute("DELETE FROM papers WHERE paper_id = ?", (corpus([0])[0]['paper_id'],))
+    assert count() == 9
+
+
+def test_catalog_from_before_the_counter(tmp_path):
+    path = str(tmp_path / 'old.sqlite3')
+    Catalog(path).record_corpus(corpus(range(4)), 'old')
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("DROP TABLE paper_count")
+    conn.close()
+    reopened = Catalog(path)
+    try:
+        assert reopened.prisma().duplicates_removed == 0
+        reopened.record_corpus(corpus(range(2, 6)), 'new')
+        assert reopened.prisma() == (8, 2, 0, 0, 0, 0)
+    finally:
+        reopened.close()
+
+
+def test_lookup_by_id_title_and_link(catalog):
+    older = catalog.record_corpus(corpus(range(3)), 'older')
+    newer = catalog.record_corpus(corpus(range(1, 4), query='loan forgiveness'), 'newer')
+    target = corpus([1])[0]
+    catalog.record_decision(older, target['paper_id'], 'keep')
+    catalog.record_decision(newer, target['paper_id'], 'discard')
+    for text in (target['paper_id'], '  scholarships and rural recruitment: part 1 ', 'http://example.org/paper/1',
+                 'www.example.org/paper/1/'):
+        hits = catalog.lookup(text)
+        assert [(hit.corpus, hit.query, hit.decision) for hit in hits] == [
+            ('newer', 'loan forgiveness', 'discard'), ('older', 'rural recruitment', 'keep')], text
+        assert {hit.paper_id for hit in hits} == {target['paper_id']}
+    assert [hit.decision for hit in catalog.lookup('https://example.org/paper/3')] == [None]
+    assert catalog.lookup('A paper nobody harvested') == []
+    assert len(catalog.lookup(target['paper_id'], limit=1)) == 1
+
+
+def test_prisma(catalog):
+    first = catalog.record_corpus(corpus([0, 1, 2, 2]), 'with a duplicate')
+    second = catalog.record_corpus(corpus(range(1, 5)), 'overlapping')
+    catalog.record_decisions(first, corpus([0, 1, 2, 2]), {0: 'keep', 1: 'discard', 2: 'maybe'})
+    catalog.record_decision(second, corpus([4])[0]['paper_id'], 'keep')
+    assert catalog.prisma(first) == (4, 1, 3, 1, 1, 1)
+    assert catalog.prisma(second) == (4, 0, 1, 1, 0, 0)
+    # Across projects: 8 records of 5 distinct papers
+    assert catalog.prisma() == (8, 3, 4, 2, 1, 1)
+    assert catalog.prisma(999) == (0, 0, 0, 0, 0, 0)
+
+
+def test_background_writes_in_order(catalog):
+    records = corpus(range(3))
+    catalog.submit(catalog.record_corpus, records, 'queued')
+    for decision in ('keep', 'discard', None, 'maybe'):
+        catalog.submit(catalog.record_paper_decision, records, 0, decision)
+    catalog.submit(lambda: None).result()
+    assert [hit.decision for hit in catalog.lookup(records[0]['paper_id'])] == ['maybe']
@@ -0,0 +1,67 @@
+"""Citation and version counts: parsing, queue order and the min-cited-by filter."""
+import json
+
+import pytest
+
+from screening_core import load_records
+from screening_core.columns import queue_order, to_int_column
+from screening_core.records import RecordStore
+
+
+@pytest.mark.parametrize('value, expected', [
+    (None, 0), ('', 0), (' ', 0), ('n/a', 0), ({}, 0), ([], 0),
+    (48, 48), ('48', 48), (' 48 ', 48), ('12.0', 12), ('3.7', 3), (2.9, 2), ('-1', -1), ('1e3', 1000),
+    (float('nan'), 0), ('inf', 0), ('-inf', 0),
+])
+def test_to_int_column(value, expected):
+    assert to_int_column([value]).tolist() == [expected]
+
+
+def test_to_int_column_keeps_order_and_dtype():
+    column = to_int_column(['3', None, 5, 'x'])
+    assert column.dtype == 'int64' and column.tolist() == [3, 0, 5, 0]
+    assert to_int_column([]).tolist() == []
+
+
+def store(cited_by, versions):
+    papers = [{'title': f'Paper {n}', 'link': f'https://example.org/{n}', 'cited_by': c, 'versions': v, 'year': '2020'}
+              for n, (c, v) in enumerate(zip(cited_by, versions))]
+    return load_records(json.dumps(papers).encode('utf-8'))
+
+
+CITED_BY = [5, '12', None, 12, 'n/a', 40, '3']
+VERSIONS = [2, 1, 9, '9', 1, None, 4]
+
+
+def test_file_order():
+    assert store(CITED_BY, VERSIONS).queue() == list(range(7))
+
+
+def test_most_cited_first_with_ties_in_file_order():
+    assert store(CITED_BY, VERSIONS).queue('cited_by') == [5, 1, 3, 0, 6, 2, 4]
+
+
+def test_most_versions_first():
+    assert store(CITED_BY, VERSIONS).queue('versions') == [2, 3, 6, 0, 1, 4, 5]
+
+
+@pytest.mark.parametrize('order, expected', [('file', [0, 1, 3, 5]), ('cited_by', [5, 1, 3, 0]), ('versions', [3, 0, 1, 5])])
+def test_min_cited_by(order, expected):
+    assert store(CITED_BY, VERSIONS).queue(order, min_cited_by=5) == expected
+
+
+def test_filter_can_empty_the_queue():
+    assert store(CITED_BY, VERSIONS).queue('cited_by', min_cited_by=1000) == []
+    assert store([], []).queue('cited_by', min_cited_by=1) == []
+
+
+def test_counts_are_copied_onto_records():
+    records = store(CITED_BY, VERSIONS).records
+    assert [r['cited_by'] for r in records] == [5, 12, 0, 12, 0, 40, 3]
+    # A store built from records alone rebuilds its columns from them
+    assert RecordStore(records).queue('cited_by', 5) == [5, 1, 3, 0]
+
+
+def test_queue_order_unknown_order_is_file_order():
+    columns = {'cited_by': to_int_column([1, 2]), 'versions': to_int_column([2, 1])}
+    assert queue_order(columns, 2, 'title') == [0, 1]
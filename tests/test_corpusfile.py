@@ -0,0 +1,101 @@
+"""Lazy corpus files: byte spans across chunk boundaries, and records identical to load_records."""
+import codecs
+import io
+import json
+import os
+
+import pytest
+
+from screening_core import CorpusFile, DecisionLog, DecisionStore, build_export_rows, load_records
+from screening_core.corpusfile import iter_array_spans
+from screening_core.decisionlog import replay
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HARVESTS = ['scholar_results.json', 'scholar_results_paginated_api_2025-08-06_13-14-09.json']
+
+ITEMS = [
+    {'title': 'Ünïcödé résumé — 日本語の論文 📚', 'link': 'https://example.org/ü', 'snippet': 'quote " and ] , [ inside'},
+    {'title': 'Plain ASCII', 'cited_by': 12345},
+    'a string item',
+    1234567,
+    -2.5e10,
+    None,
+    [1, [2, {'x': 'ß'}]],
+    {},
+]
+
+
+def encode(items, bom, ensure_ascii):
+    body = '\r\n[\n  ' + ',\n  '.join(json.dumps(item, ensure_ascii=ensure_ascii) for item in items) + '\n]\n'
+    return (codecs.BOM_UTF8 if bom else b'') + body.encode('utf-8')
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 64, 1 << 20])
+@pytest.mark.parametrize('bom', [False, True])
+@pytest.mark.parametrize('ensure_ascii', [False, True])
+def test_spans_are_byte_offsets(chunk_size, bom, ensure_ascii):
+    data = encode(ITEMS, bom, ensure_ascii)
+    spans = list(iter_array_spans(io.BytesIO(data), chunk_size))
+    assert [item for item, _, _ in spans] == ITEMS
+    for item, start, end in spans:
+        assert json.loads(data[start:end]) == item
+
+
+@pytest.mark.parametrize('data', [b'[]', codecs.BOM_UTF8 + b'[ ]', b' \n[\n]\n'])
+def test_empty_array(data):
+    assert list(iter_array_spans(io.BytesIO(data), 1)) == []
+
+
+@pytest.mark.parametrize('data', [b'{"organic_results": []}', b'[{"title": "cut short"}', b''])
+def test_not_an_array(data):
+    with pytest.raises(ValueError):
+        list(iter_array_spans(io.BytesIO(data), 4))
+
+
+@pytest.mark.parametrize('name', HARVESTS)
+def test_records_match_load_records(name):
+    path = os.path.join(REPO, name)
+    with open(path, 'rb') as f:
+        loaded = load_records(f.read())
+    corpus = CorpusFile([path])
+    try:
+        assert len(corpus) == len(loaded)
+        assert list(corpus) == loaded.records
+        assert [corpus[idx] for idx in (0, -1)] == [loaded[0], loaded[-1]]
+        assert corpus.queue('cited_by', 5) == loaded.queue('cited_by', 5)
+        decisions = DecisionStore({0: 'keep', 2: 'discard', len(loaded) - 1: 'maybe'})
+        assert build_export_rows(corpus, decisions) == build_export_rows(loaded, decisions)
+    finally:
+        corpus.close()
+
+
+def test_multibyte_file_on_disk(tmp_path):
+    papers = [dict(ITEMS[0], title=f"{ITEMS[0]['title']} {n}") for n in range(3)] + [ITEMS[1]]
+    path = tmp_path / 'harvest.json'
+    path.write_bytes(encode(papers, bom=True, ensure_ascii=False))
+    corpus = CorpusFile([str(path)])
+    try:
+        assert list(corpus) == load_records(path.read_bytes()).records
+    finally:
+        corpus.close()
+
+
+def test_decision_log_replay(tmp_path):
+    path = os.path.join(REPO, HARVESTS[0])
+    corpus = CorpusFile([path])
+    log_path = str(tmp_path / 'screening_log.jsonl')
+    try:
+        log = DecisionLog(log_path, fsync=False)
+        log.append(0, corpus[0]['paper_id'], 'keep')
+        log.append(1, corpus[1]['paper_id'], 'discard')
+        log.append(0, corpus[0]['paper_id'], None)   # undone
+        log.append(2, 'not-this-corpus', 'keep')     # logged against another corpus
+        log.append(3, corpus[3]['paper_id'], 'maybe')
+        log.close()
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write('{"index": 4, "paper_id"')      # cut short by a crash
+        decisions, stale = replay(log_path, corpus)
+        assert dict(decisions.items()) == {1: 'discard', 3: 'maybe'}
+        assert stale == 1
+    finally:
+        corpus.close()
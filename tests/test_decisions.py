@@ -0,0 +1,59 @@
+"""DecisionStore: the packed 2-bit decisions against a plain dict."""
+import random
+
+import pytest
+
+from screening_core.decisions import DECISIONS, DISCARD, KEEP, MAYBE, DecisionStore
+
+
+def random_decisions(seed, size=500):
+    rng = random.Random(seed)
+    return {idx: rng.choice(DECISIONS) for idx in rng.sample(range(size), size // 3)}
+
+
+def test_set_get_and_overwrite():
+    store = DecisionStore()
+    for idx, decision in enumerate([KEEP, DISCARD, MAYBE, KEEP, DISCARD]):
+        store.set(idx, decision)
+    store.set(1, MAYBE)
+    assert [store.get(idx) for idx in range(6)] == [KEEP, MAYBE, MAYBE, KEEP, DISCARD, None]
+    assert store.get(10_000) is None
+    with pytest.raises(ValueError):
+        store.set(0, 'unsure')
+
+
+def test_clear_only_touches_its_own_slot():
+    store = DecisionStore({0: KEEP, 1: DISCARD, 2: MAYBE, 3: KEEP})
+    store.clear(1)
+    store.clear(50)  # past the end: nothing to clear
+    assert dict(store.items()) == {0: KEEP, 2: MAYBE, 3: KEEP}
+    assert 1 not in store and 2 in store
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_a_dict(seed):
+    reference = random_decisions(seed)
+    store = DecisionStore(reference)
+    for idx in random.Random(seed).sample(sorted(reference), len(reference) // 4):
+        store.clear(idx)
+        del reference[idx]
+    assert dict(store.items()) == reference
+    assert list(store.items()) == sorted(reference.items())
+    assert store.counts() == {decision: list(reference.values()).count(decision) for decision in DECISIONS}
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_round_trips(seed):
+    store = DecisionStore(random_decisions(seed))
+    assert dict(DecisionStore.decode(store.encode()).items()) == dict(store.items())
+    assert dict(DecisionStore.from_bytes(store.to_bytes()).items()) == dict(store.items())
+    assert dict(DecisionStore.decode(store.to_dict()).items()) == dict(store.items())
+    assert DecisionStore.decode(None).counts() == {KEEP: 0, DISCARD: 0, MAYBE: 0}
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_diff(seed):
+    before, after = random_decisions(seed), random_decisions(seed + 100, size=700)
+    expected = {idx: after.get(idx) for idx in set(before) | set(after) if before.get(idx) != after.get(idx)}
+    assert DecisionStore(before).diff(DecisionStore(after)) == expected
+    assert DecisionStore(after).diff(DecisionStore(after)) == {}
@@ -0,0 +1,105 @@
+"""Decision import: match precedence, conflicts between files and the session, and streamed JSON arrays."""
+import io
+import json
+
+import pytest
+
+from screening_core.decisions import DecisionStore
+from screening_core.importer import CorpusIndex, import_decisions, iter_json_array
+from screening_core.records import fingerprint, normalize_paper
+
+PAPERS = [
+    {'title': 'Deep Learning for Screening', 'link': 'https://example.org/a'},
+    {'title': 'Shared Title', 'link': 'https://example.org/b'},
+    {'title': 'Shared Title', 'link': 'https://example.org/c'},
+    {'title': 'A Unique Title', 'link': 'https://example.org/d'},
+    {'title': 'Linked Paper', 'link': 'https://www.example.org/e/'},
+]
+
+
+@pytest.fixture
+def records():
+    return [normalize_paper(paper) for paper in PAPERS]
+
+
+def csv_file(name, rows):
+    lines = ['paper_id,title,link,decision'] + [','.join(row) for row in rows]
+    return name, io.BytesIO('\r\n'.join(lines).encode('utf-8'))
+
+
+def test_match_precedence(records):
+    index = CorpusIndex(records)
+    # A known paper ID wins over a title and link that point elsewhere
+    assert index.match(records[3]['paper_id'], 'Shared Title', 'https://example.org/b') == ([3], 'paper ID')
+    # An unknown ID falls through to the fingerprint of title and link
+    assert index.match('0000000000000000', 'Shared Title', 'https://example.org/c') == ([2], 'fingerprint')
+    assert index.match(None, 'deep learning, for screening!', 'http://example.org/a/') == ([0], 'fingerprint')
+    # Title alone only when exactly one paper has it
+    assert index.match(None, 'A unique title', 'https://elsewhere.org') == ([3], 'title')
+    assert index.match(None, 'Shared Title', 'https://elsewhere.org') == ([], None)
+    # Link alone, likewise
+    assert index.match(None, 'Retitled', 'example.org/e') == ([4], 'link')
+    assert index.match(None, 'Retitled', 'https://elsewhere.org') == ([], None)
+
+
+def test_rows_are_counted_by_outcome(records):
+    files = [csv_file('screening_decisions_20250101_000000.csv', [
+        (records[0]['paper_id'], 'x', 'x', 'keep'),
+        ('', 'A Unique Title', '', 'Discard'),
+        ('', 'Nothing like it', '', 'keep'),
+        ('', 'Linked Paper', 'https://example.org/e', 'later'),
+    ])]
+    decisions, report = import_decisions(records, files)
+    assert dict(decisions.items()) == {0: 'keep', 3: 'discard'}
+    assert (report.rows, report.applied, report.unmatched, report.skipped) == (4, 2, 1, 1)
+    assert dict(report.matched) == {'paper ID': 1, 'title': 1}
+    assert report.unmatched_titles == [('screening_decisions_20250101_000000.csv', 'Nothing like it')]
+
+
+def test_later_file_wins(records):
+    paper_id = records[1]['paper_id']
+    # Passed newest first: the timestamp in the name decides the order, not the argument order
+    files = [csv_file('screening_decisions_20250302_000000.csv', [(paper_id, '', '', 'discard')]),
+             csv_file('screening_decisions_20250301_000000.csv', [(paper_id, '', '', 'keep')])]
+    decisions, report = import_decisions(records, files)
+    assert decisions.get(1) == 'discard'
+    assert report.conflicts == [(1, 'Shared Title', 'discard', 'keep', 'screening_decisions_20250302_000000.csv')]
+
+
+@pytest.mark.parametrize('overwrite, expected', [(False, 'keep'), (True, 'discard')])
+def test_session_decisions_kept_unless_overwrite(records, overwrite, expected):
+    session = DecisionStore({1: 'keep', 3: 'maybe'})
+    files = [csv_file('screening_decisions_20250101_000000.csv', [
+        (records[1]['paper_id'], '', '', 'discard'),
+        (records[3]['paper_id'], '', '', 'maybe'),
+    ])]
+    decisions, report = import_decisions(records, files, session, overwrite=overwrite)
+    assert decisions.get(1) == expected
+    assert (report.applied, report.unchanged, len(report.conflicts)) == (int(overwrite), 1, 1)
+    assert dict(session.items()) == {1: 'keep', 3: 'maybe'}  # the caller's store is left alone
+
+
+def test_kept_papers_json(records):
+    kept = [dict(PAPERS[3]), {'title': 'Linked Paper', 'link': 'https://example.org/e', 'decision': 'maybe'}, 'not a paper']
+    decisions, report = import_decisions(records, [('kept_papers_20250101_000000.json', json.dumps(kept).encode('utf-8-sig'))])
+    assert dict(decisions.items()) == {3: 'keep', 4: 'maybe'}
+    assert report.rows == 2
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 5, 64, 1 << 16])
+def test_iter_json_array_across_chunks(chunk_size):
+    items = [{'title': 'Ünïcödé ✓', 'n': [1, 2, {'deep': '] , ['}]}, 'text', 3, 123456789, -2.5e10, True, None, [], {}]
+    text = '  \n[ ' + ' ,\n '.join(json.dumps(item, ensure_ascii=False) for item in items) + ' ]\n'
+    assert list(iter_json_array(io.StringIO(text), chunk_size)) == items
+    assert list(iter_json_array(io.StringIO('[]'), chunk_size)) == []
+
+
+def test_iter_json_array_rejects_other_json():
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('{"organic_results": []}')))
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('[{"title": "cut short"'), 4))
+
+
+def test_fingerprint_ignores_case_punctuation_and_scheme():
+    assert fingerprint('Shared Title', 'https://www.example.org/b/') == fingerprint('shared  title.', 'http://example.org/b')
@@ -0,0 +1,73 @@
+"""Rolling metrics: percentile maths, the registry's windows and the gated /metrics endpoint."""
+import importlib
+
+import pytest
+
+from screening_core.metrics import MetricsRegistry, percentile
+
+
+@pytest.mark.parametrize('q, expected', [(0, 1), (1, 1), (10, 1), (11, 2), (50, 5), (51, 6), (95, 10), (100, 10)])
+def test_nearest_rank_percentile(q, expected):
+    values = [7, 3, 10, 1, 5, 2, 9, 4, 8, 6]
+    assert percentile(values, q) == expected
+
+
+def test_percentile_edge_cases():
+    assert percentile([], 50) == 0.0
+    assert percentile([4.2], 1) == percentile([4.2], 99) == 4.2
+    assert percentile([1, 2], 50) == 1 and percentile([1, 2], 51) == 2
+
+
+def test_summary_keeps_a_rolling_window():
+    registry = MetricsRegistry(window=4)
+    for ms in (100, 1, 2, 3, 4):
+        registry.record('render', ms / 1000)
+    entry = registry.summary()['render']
+    # The 100 ms sample has rolled out of the window; the call count has not
+    assert entry == {'calls': 5, 'p50_ms': 2.0, 'p95_ms': 4.0, 'max_ms': 4.0}
+
+
+def test_payload_sizes():
+    registry = MetricsRegistry()
+    for size in range(1, 21):
+        registry.record_payload('upload', size, size * 100)
+    entry = registry.summary()['upload']
+    assert entry['calls'] == 0 and entry['p50_ms'] == 0.0
+    assert (entry['request_p50_bytes'], entry['request_p95_bytes']) == (10, 19)
+    assert (entry['response_p50_bytes'], entry['response_p95_bytes']) == (1000, 1900)
+
+
+def test_timed_records_failures_too():
+    registry = MetricsRegistry()
+
+    @registry.timed()
+    def works(value):
+        return value * 2
+
+    @registry.timed('named')
+    def fails():
+        raise RuntimeError
+
+    assert works(21) == 42 and works.__name__ == 'works'
+    with pytest.raises(RuntimeError):
+        fails()
+    assert {name: entry['calls'] for name, entry in registry.summary().items()} == {'works': 1, 'named': 1}
+    registry.reset()
+    assert registry.summary() == {}
+
+
+@pytest.fixture
+def dash_app(monkeypatch, tmp_path):
+    monkeypatch.setenv('SCREENER_CATALOG', str(tmp_path / 'catalog.sqlite3'))
+    monkeypatch.delenv('SCREENER_METADATA_ENDPOINT', raising=False)
+    return importlib.import_module('research_screener')
+
+
+def test_metrics_endpoint_is_off_outside_debug(dash_app, monkeypatch):
+    client = dash_app.app.server.test_client()
+    monkeypatch.setattr(dash_app, 'EXPOSE_METRICS', False)
+    monkeypatch.setattr(dash_app.app.server, 'debug', False)
+    assert client.get('/metrics').status_code == 404
+    monkeypatch.setattr(dash_app, 'EXPOSE_METRICS', True)
+    response = client.get('/metrics')
+    assert response.status_code == 200 and isinstance(response.get_json(), dict)
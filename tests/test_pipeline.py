@@ -0,0 +1,76 @@
+"""Normalization on the process pool: same records, in the same order, as a serial run."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from screening_core import load_many, load_records, pipeline
+from screening_core.schema import SCHEMA_FLATTENED, SCHEMA_NESTED, SCHEMA_SIMPLIFIED
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from synthetic import corpus_bytes  # noqa: E402
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    """Sends even a small corpus through a 2-process pool in several chunks."""
+    monkeypatch.setattr(pipeline, 'PARALLEL_THRESHOLD', 0)
+    monkeypatch.setattr(pipeline, 'MIN_CHUNK_SIZE', 50)
+
+
+def snapshot(store):
+    return store.records, {field: store.column(field).tolist() for field in ('cited_by', 'versions')}, store.schema
+
+
+@pytest.mark.parametrize('schema', [SCHEMA_NESTED, SCHEMA_FLATTENED, SCHEMA_SIMPLIFIED])
+def test_pool_matches_serial(small_pool, schema):
+    raw = corpus_bytes(1000, schema, seed=7)
+    progress = []
+    pooled = load_records(raw, workers=2, progress=lambda done, total: progress.append((done, total)))
+    assert snapshot(pooled) == snapshot(load_records(raw, workers=1))
+    # One report per chunk, in order
+    assert len(progress) > 2 and progress == sorted(progress) and progress[-1] == (1000, 1000)
+
+
+def test_pool_keeps_merged_files_in_order(small_pool):
+    raws = [corpus_bytes(300, SCHEMA_NESTED, seed=1), corpus_bytes(200, SCHEMA_FLATTENED, seed=2)]
+    pooled = load_many(raws, workers=2)
+    assert snapshot(pooled) == snapshot(load_many(raws, workers=1))
+    assert pooled.schema == 'mixed'
+
+
+def test_below_threshold_stays_serial(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("a small corpus should not start a process pool")
+    monkeypatch.setattr(pipeline, 'ProcessPoolExecutor', no_pool)
+    assert len(load_records(corpus_bytes(100), workers=8)) == 100
+
+
+def test_importing_the_screener_creates_nothing(tmp_path):
+    env = {key: value for key, value in os.environ.items() if not key.startswith('SCREENER_')}
+    env['PYTHONPATH'] = REPO
+    subprocess.run([sys.executable, '-c', 'import research_screener'], cwd=tmp_path, env=env, check=True)
+    assert os.listdir(tmp_path) == []
+
+
+SPAWN_SCRIPT = '''
+import multiprocessing
+print("script body ran", flush=True)
+from screening_core import pipeline
+if __name__ == "__main__":
+    multiprocessing.set_start_method("spawn")
+    pipeline.PARALLEL_THRESHOLD, pipeline.MIN_CHUNK_SIZE = 0, 50
+    rows = [(f"Title {i}", None, "A Author - Journal, 2001", None, None, None) for i in range(400)]
+    assert [r["title"] for r in pipeline.derive_records(rows, workers=2)] == [row[0] for row in rows]
+'''
+
+
+def test_spawned_workers_do_not_rerun_the_script(tmp_path):
+    script = tmp_path / 'launcher.py'
+    script.write_text(SPAWN_SCRIPT)
+    env = dict(os.environ, PYTHONPATH=REPO)
+    output = subprocess.run([sys.executable, str(script)], env=env, check=True, capture_output=True, text=True).stdout
+    assert output.count("script body ran") == 1
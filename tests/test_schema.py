@@ -0,0 +1,83 @@
+"""Schema detection and the per-shape accessor plans."""
+import json
+
+import pytest
+
+from screening_core import load_records, normalize_paper
+from screening_core.columns import NUMERIC_FIELDS
+from screening_core.records import compile_extractor, make_record
+from screening_core.schema import (SCHEMA_FLATTENED, SCHEMA_NESTED, SCHEMA_SIMPLIFIED, SCHEMA_UNKNOWN,
+                                   compile_plan, detect_schema, flatten)
+
+
+def nested(n):
+    return {
+        'title': f'Scholarships and rural recruitment {n}',
+        'link': f'https://onlinelibrary.wiley.com/doi/10.1111/{n}',
+        'snippet': f'… loan forgiveness and retention {n} …',
+        'publication_info': {
+            'summary': f'J Smith, K Patel - The Journal of Rural Health, 20{10 + n} - Wiley Online Library',
+            'authors': [{'name': 'J Smith', 'author_id': 'a1'}, {'name': 'K Patel', 'author_id': 'a2'}],
+        },
+        'inline_links': {'cited_by': {'total': 10 * n, 'link': 'x'}, 'versions': {'total': n + 1}},
+    }
+
+
+def simplified(n):
+    paper = nested(n)
+    return {'title': paper['title'], 'authors': ['J Smith', 'K Patel'], 'year': f'20{10 + n}',
+            'abstract': paper['snippet'], 'link': paper['link'],
+            'cited_by': str(10 * n), 'versions': n + 1}
+
+
+SHAPES = {
+    SCHEMA_NESTED: [nested(n) for n in range(5)],
+    SCHEMA_FLATTENED: [flatten(nested(n)) for n in range(5)],
+    SCHEMA_SIMPLIFIED: [simplified(n) for n in range(5)],
+}
+
+
+def without_originals(records):
+    return [{key: value for key, value in record.items() if key != 'original_data'} for record in records]
+
+
+@pytest.mark.parametrize('schema', list(SHAPES))
+def test_detects_each_shape(schema):
+    assert detect_schema(SHAPES[schema]) == schema
+
+
+def test_majority_vote():
+    papers = SHAPES[SCHEMA_FLATTENED][:3] + SHAPES[SCHEMA_NESTED][:2] + ['not a paper', None]
+    assert detect_schema(papers) == SCHEMA_FLATTENED
+    # Only the sample counts
+    assert detect_schema(SHAPES[SCHEMA_NESTED][:2] + SHAPES[SCHEMA_FLATTENED], sample_size=2) == SCHEMA_NESTED
+
+
+@pytest.mark.parametrize('papers', [[], [{'title': 'only a title', 'link': 'x'}], ['text', 1, None]])
+def test_undetectable(papers):
+    assert detect_schema(papers) == SCHEMA_UNKNOWN
+
+
+def test_shapes_give_identical_records():
+    stores = {schema: load_records(json.dumps(papers).encode('utf-8')) for schema, papers in SHAPES.items()}
+    assert {schema: store.schema for schema, store in stores.items()} == {schema: schema for schema in SHAPES}
+    expected = without_originals(stores[SCHEMA_NESTED].records)
+    assert expected[3]['year'] == '2013' and expected[3]['cited_by'] == 30
+    for store in stores.values():
+        assert without_originals(store.records) == expected
+
+
+@pytest.mark.parametrize('schema', list(SHAPES))
+def test_unknown_plan_matches_known_plan(schema):
+    known, fallback = compile_extractor(schema), compile_extractor(SCHEMA_UNKNOWN)
+    known_numeric, fallback_numeric = compile_plan(schema, NUMERIC_FIELDS), compile_plan(SCHEMA_UNKNOWN, NUMERIC_FIELDS)
+    for paper in SHAPES[schema]:
+        assert make_record(paper, *fallback(paper)) == make_record(paper, *known(paper)) == normalize_paper(paper)
+        assert [get(paper) for get in fallback_numeric] == [get(paper) for get in known_numeric]
+
+
+def test_missing_nested_values():
+    paper = {'title': 'T', 'publication_info': 'not a dict', 'inline_links': {'cited_by': None}}
+    title, authors, summary, year, abstract, link = compile_extractor(SCHEMA_NESTED)(paper)
+    assert (title, authors, summary, year, abstract, link) == ('T', None, None, None, None, None)
+    assert [get(paper) for get in compile_plan(SCHEMA_NESTED, NUMERIC_FIELDS)] == [None, None]
@@ -0,0 +1,88 @@
+"""Similar papers: the index against a brute-force cosine over the same hashed TF-IDF vectors."""
+import math
+import os
+import sys
+import time
+import zlib
+from collections import Counter
+
+import pytest
+
+from screening_core import load_records
+from screening_core.records import corpus_key
+from screening_core.similarity import N_FEATURES, IndexCache, SimilarityIndex, tokenize
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from synthetic import corpus_bytes  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def records():
+    records = load_records(corpus_bytes(300, seed=3)).records
+    records[10]['title'], records[10]['abstract'] = 'the and for', 'No snippet available'  # no terms at all
+    return records
+
+
+def brute_force_vectors(records, n_features=N_FEATURES):
+    """Hashed, sublinear-tf, smoothed-idf, L2-normalized vectors as {feature: weight} dicts."""
+    counts = [Counter(zlib.crc32(token.encode()) % n_features for token in tokenize(f"{r['title']} {r['abstract']}"))
+              for r in records]
+    document_frequency = Counter(feature for row in counts for feature in row)
+    vectors = []
+    for row in counts:
+        vector = {feature: (1 + math.log(count)) * (math.log((1 + len(records)) / (1 + document_frequency[feature])) + 1)
+                  for feature, count in row.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1
+        vectors.append({feature: weight / norm for feature, weight in vector.items()})
+    return vectors
+
+
+def cosine(a, b):
+    return sum(weight * b.get(feature, 0.0) for feature, weight in a.items())
+
+
+def test_scores_match_brute_force(records):
+    index = SimilarityIndex.build(records)
+    vectors = brute_force_vectors(records)
+    for i in (0, 1, 10, 150, 299):
+        expected = [cosine(vectors[i], vector) for vector in vectors]
+        assert index.scores(i).tolist() == pytest.approx(expected, abs=1e-5)
+
+
+@pytest.mark.parametrize('k', [1, 5, 20])
+def test_neighbours_match_brute_force(records, k):
+    index = SimilarityIndex.build(records)
+    vectors = brute_force_vectors(records)
+    allowed = range(0, 300, 2)
+    for i in (0, 7, 150):
+        for restrict in (None, allowed):
+            candidates = [j for j in (restrict or range(len(records))) if j != i]
+            expected = sorted(((cosine(vectors[i], vectors[j]), j) for j in candidates), key=lambda item: (-item[0], item[1]))
+            expected = [(j, score) for score, j in expected[:k] if score > 0]
+            found = index.neighbours(i, k, allowed=restrict)
+            assert [j for j, _ in found] == [j for j, _ in expected]
+            assert [score for _, score in found] == pytest.approx([score for _, score in expected], abs=1e-5)
+
+
+def test_paper_without_terms_has_no_neighbours(records):
+    assert SimilarityIndex.build(records).neighbours(10) == []
+
+
+def test_tiny_corpora():
+    assert SimilarityIndex.build([{'title': 'rural nursing scholarships', 'abstract': ''}]).neighbours(0) == []
+    assert len(SimilarityIndex.build([])) == 0
+
+
+def test_index_cache_uses_the_given_key(records, monkeypatch):
+    cache = IndexCache(max_corpora=1)
+    key = corpus_key(records)
+    monkeypatch.setattr('screening_core.similarity.corpus_key', lambda records: pytest.fail("key recomputed"))
+    assert cache.get(records, key) is None
+    deadline = time.monotonic() + 10
+    while cache.get(records, key) is None:
+        assert time.monotonic() < deadline, "index was not built"
+        time.sleep(0.01)
+    assert len(cache.get(records, key)) == len(records)
+    monkeypatch.undo()
+    # Without a key it is computed, and finds the same index
+    assert cache.get(records) is cache.get(records, key)